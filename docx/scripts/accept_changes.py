@@ -1,41 +1,68 @@
-"""Accept all tracked changes in a DOCX file using LibreOffice.
+"""Accept tracked changes in a DOCX file.
 
-Requires LibreOffice (soffice) to be installed.
+Accepts w:ins, w:del, w:moveFrom, w:moveTo and formatting revisions
+(w:rPrChange, w:pPrChange, ...) in every story part (body, headers,
+footers, footnotes, endnotes, comments) and in styles/numbering. Parts are
+streamed from the source zip to the destination zip; nothing is extracted
+to disk and LibreOffice is not needed.
+
+Usage:
+    python accept_changes.py input.docx output.docx [--author NAME ...]
 """
 
 import argparse
-import logging
+import re
 import shutil
-import subprocess
+import zipfile
 from pathlib import Path
 
-from office.soffice import get_soffice_env
+import lxml.etree
+
+WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+_W = f"{{{WORD_NS}}}"
+_AUTHOR = f"{_W}author"
 
-logger = logging.getLogger(__name__)
+PROPERTY_CHANGE_TAGS = {
+    "rPrChange",
+    "pPrChange",
+    "sectPrChange",
+    "tblPrChange",
+    "tblPrExChange",
+    "trPrChange",
+    "tcPrChange",
+    "tblGridChange",
+    "numberingChange",
+}
 
-LIBREOFFICE_PROFILE = "/tmp/libreoffice_docx_profile"
-MACRO_DIR = f"{LIBREOFFICE_PROFILE}/user/basic/Standard"
+RANGE_MARKER_TAGS = {
+    "moveFromRangeStart",
+    "moveFromRangeEnd",
+    "moveToRangeStart",
+    "moveToRangeEnd",
+    "customXmlInsRangeStart",
+    "customXmlInsRangeEnd",
+    "customXmlDelRangeStart",
+    "customXmlDelRangeEnd",
+    "customXmlMoveFromRangeStart",
+    "customXmlMoveFromRangeEnd",
+    "customXmlMoveToRangeStart",
+    "customXmlMoveToRangeEnd",
+}
 
-ACCEPT_CHANGES_MACRO = """<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE script:module PUBLIC "-//OpenOffice.org//DTD OfficeDocument 1.0//EN" "module.dtd">
-<script:module xmlns:script="http://openoffice.org/2000/script" script:name="Module1" script:language="StarBasic">
-    Sub AcceptAllTrackedChanges()
-        Dim document As Object
-        Dim dispatcher As Object
+MARKER_PARENTS = {"rPr", "trPr", "numPr"}
 
-        document = ThisComponent.CurrentController.Frame
-        dispatcher = createUnoService("com.sun.star.frame.DispatchHelper")
+_REVISION_RE = re.compile(
+    rb"<(?:\w+:)?(?:ins|del|moveFrom|moveTo|cellIns|cellDel|\w+Change|\w+RangeStart)\b"
+)
 
-        dispatcher.executeDispatch(document, ".uno:AcceptAllTrackedChanges", "", 0, Array())
-        ThisComponent.store()
-        ThisComponent.close(True)
-    End Sub
-</script:module>"""
+_PARSER = lxml.etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
 
 
 def accept_changes(
     input_file: str,
     output_file: str,
+    authors: list[str] | None = None,
 ) -> tuple[None, str]:
     input_path = Path(input_file)
     output_path = Path(output_file)
@@ -46,76 +73,173 @@ def accept_changes(
     if not input_path.suffix.lower() == ".docx":
         return None, f"Error: Input file is not a DOCX file: {input_file}"
 
-    try:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(input_path, output_path)
-    except Exception as e:
-        return None, f"Error: Failed to copy input file to output location: {e}"
-
-    if not _setup_libreoffice_macro():
-        return None, "Error: Failed to setup LibreOffice macro"
-
-    cmd = [
-        "soffice",
-        "--headless",
-        f"-env:UserInstallation=file://{LIBREOFFICE_PROFILE}",
-        "--norestore",
-        "vnd.sun.star.script:Standard.Module1.AcceptAllTrackedChanges?language=Basic&location=application",
-        str(output_path.absolute()),
-    ]
+    if input_path.resolve() == output_path.resolve():
+        return None, "Error: Output file must differ from input file"
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30,
-            check=False,
-            env=get_soffice_env(),
-        )
-    except subprocess.TimeoutExpired:
-        return (
-            None,
-            f"Successfully accepted all tracked changes: {input_file} -> {output_file}",
-        )
-
-    if result.returncode != 0:
-        return None, f"Error: LibreOffice failed: {result.stderr}"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with (
+            zipfile.ZipFile(input_path, "r") as zin,
+            zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zout,
+        ):
+            accepted = 0
+            for info in zin.infolist():
+                if _is_revisable_part(info.filename):
+                    data, count = accept_changes_in_xml(zin.read(info), authors)
+                    accepted += count
+                    zout.writestr(info, data)
+                else:
+                    with zin.open(info) as src, zout.open(info, "w") as dst:
+                        shutil.copyfileobj(src, dst)
+    except zipfile.BadZipFile:
+        return None, f"Error: {input_file} is not a valid DOCX file"
+    except lxml.etree.XMLSyntaxError as e:
+        return None, f"Error: Failed to parse XML: {e}"
 
+    who = f" by {', '.join(authors)}" if authors else ""
     return (
         None,
-        f"Successfully accepted all tracked changes: {input_file} -> {output_file}",
+        f"Successfully accepted {accepted} tracked changes{who}: {input_file} -> {output_file}",
     )
 
 
-def _setup_libreoffice_macro() -> bool:
-    macro_dir = Path(MACRO_DIR)
-    macro_file = macro_dir / "Module1.xba"
-
-    if macro_file.exists() and "AcceptAllTrackedChanges" in macro_file.read_text():
-        return True
-
-    if not macro_dir.exists():
-        subprocess.run(
-            [
-                "soffice",
-                "--headless",
-                f"-env:UserInstallation=file://{LIBREOFFICE_PROFILE}",
-                "--terminate_after_init",
-            ],
-            capture_output=True,
-            timeout=10,
-            check=False,
-            env=get_soffice_env(),
+def accept_changes_in_xml(xml: bytes, authors: list[str] | None = None) -> tuple[bytes, int]:
+    """Accept revisions in one WordprocessingML part.
+
+    Returns the new part bytes and the number of revisions accepted. The
+    original bytes are returned untouched when nothing was accepted.
+    """
+    if not _REVISION_RE.search(xml):
+        return xml, 0
+
+    tree = lxml.etree.ElementTree(lxml.etree.fromstring(xml, _PARSER))
+    root = tree.getroot()
+    wanted = set(authors) if authors else None
+
+    def matches(elem):
+        return wanted is None or elem.get(_AUTHOR) in wanted
+
+    count = _merge_deleted_paragraph_marks(root, matches)
+
+    for elem in list(root.iter(f"{_W}del", f"{_W}moveFrom")):
+        if not matches(elem):
+            continue
+        parent = elem.getparent()
+        if parent is None:
+            continue
+        parent_name = lxml.etree.QName(parent).localname
+        if parent_name == "trPr":
+            row = parent.getparent()
+            _remove(row)
+        elif parent_name in MARKER_PARENTS:
+            parent.remove(elem)
+        else:
+            _remove(elem)
+        count += 1
+
+    for elem in list(root.iter(f"{_W}ins", f"{_W}moveTo")):
+        if not matches(elem):
+            continue
+        parent = elem.getparent()
+        if parent is None:
+            continue
+        if lxml.etree.QName(parent).localname in MARKER_PARENTS:
+            parent.remove(elem)
+        else:
+            _unwrap(elem)
+        count += 1
+
+    for elem in list(root.iter(f"{_W}cellIns", f"{_W}cellDel")):
+        if not matches(elem):
+            continue
+        if lxml.etree.QName(elem).localname == "cellDel":
+            _remove(elem.getparent().getparent())
+        else:
+            elem.getparent().remove(elem)
+        count += 1
+
+    accepted_ranges = set()
+    tags = [f"{_W}{name}" for name in PROPERTY_CHANGE_TAGS | RANGE_MARKER_TAGS]
+    for elem in list(root.iter(*tags)):
+        name = lxml.etree.QName(elem).localname
+        if name in PROPERTY_CHANGE_TAGS:
+            if not matches(elem):
+                continue
+            count += 1
+        elif name.endswith("RangeStart"):
+            if not matches(elem):
+                continue
+            accepted_ranges.add((name[: -len("Start")], elem.get(f"{_W}id")))
+        elif wanted is not None:
+            if (name[: -len("End")], elem.get(f"{_W}id")) not in accepted_ranges:
+                continue
+        _remove(elem)
+
+    if not count:
+        return xml, 0
+
+    data = lxml.etree.tostring(
+        tree,
+        xml_declaration=True,
+        encoding="UTF-8",
+        standalone=tree.docinfo.standalone,
+    )
+    return data, count
+
+
+def _merge_deleted_paragraph_marks(root, matches) -> int:
+    merged = 0
+    paragraphs = [
+        p
+        for p in root.iter(f"{_W}p")
+        if any(
+            matches(mark)
+            for mark in p.findall(f"{_W}pPr/{_W}rPr/*")
+            if mark.tag in (f"{_W}del", f"{_W}moveFrom")
         )
-        macro_dir.mkdir(parents=True, exist_ok=True)
+    ]
 
-    try:
-        macro_file.write_text(ACCEPT_CHANGES_MACRO)
-        return True
-    except Exception as e:
-        logger.warning(f"Failed to setup LibreOffice macro: {e}")
-        return False
+    for p in reversed(paragraphs):
+        following = p.getnext()
+        if following is None or following.tag != f"{_W}p":
+            continue
+
+        anchor = following.find(f"{_W}pPr")
+        index = following.index(anchor) + 1 if anchor is not None else 0
+        for child in list(p):
+            if child.tag == f"{_W}pPr":
+                continue
+            following.insert(index, child)
+            index += 1
+        _remove(p)
+        merged += 1
+
+    return merged
+
+
+def _unwrap(elem) -> None:
+    parent = elem.getparent()
+    index = parent.index(elem)
+    for offset, child in enumerate(list(elem)):
+        parent.insert(index + offset, child)
+    _remove(elem)
+
+
+def _remove(elem) -> None:
+    parent = elem.getparent()
+    if parent is None:
+        return
+    if elem.tail:
+        previous = elem.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + elem.tail
+        else:
+            parent.text = (parent.text or "") + elem.tail
+    parent.remove(elem)
+
+
+def _is_revisable_part(name: str) -> bool:
+    return name.startswith("word/") and name.endswith(".xml")
 
 
 if __name__ == "__main__":
@@ -126,9 +250,15 @@ if __name__ == "__main__":
     parser.add_argument(
         "output_file", help="Output DOCX file (clean, no tracked changes)"
     )
+    parser.add_argument(
+        "--author",
+        action="append",
+        dest="authors",
+        help="Only accept changes by this author (repeatable; default: all authors)",
+    )
     args = parser.parse_args()
 
-    _, message = accept_changes(args.input_file, args.output_file)
+    _, message = accept_changes(args.input_file, args.output_file, args.authors)
     print(message)
 
     if "Error" in message:
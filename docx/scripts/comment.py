@@ -3,10 +3,27 @@
 Usage:
     python comment.py unpacked/ 0 "Comment text"
     python comment.py unpacked/ 1 "Reply text" --parent 0
+    python comment.py unpacked/ --batch comments.json
+
+comments.json is a list of {"id": 0, "text": "...", "author": "...",
+"initials": "...", "parent": 0, "anchor": "..."}; only "text" is required, and
+replies may refer to comments earlier in the list. Entries without "id" get
+the next unused comment ID. Each comment part is
+read and written once for the whole batch.
 
 Text should be pre-escaped XML (e.g., &amp; for &, &#x2019; for smart quotes).
 
-After running, add markers to document.xml:
+Comments can be anchored automatically with --anchor "target text" or, in a
+batch entry, with "anchor" (plain document text, plus an optional 1-based
+"occurrence") or "paragraph" with optional "start"/"end" character offsets.
+A reply without its own anchor shares its parent's range; if the parent was
+added earlier, the reply's markers are nested inside the parent's markers
+already in document.xml, and replies whose parent has none are reported.
+All markers are inserted in one pass over document.xml, splitting runs at
+the range edges. Reference runs always go directly in w:p, after any
+hyperlink or other inline container the range ends in.
+
+Otherwise, add markers to document.xml:
   <w:commentRangeStart w:id="0"/>
   ... commented content ...
   <w:commentRangeEnd w:id="0"/>
@@ -14,13 +31,18 @@ After running, add markers to document.xml:
 """
 
 import argparse
-import random
+import copy
+import json
 import shutil
 import sys
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone
 from pathlib import Path
 
 import defusedxml.minidom
+import lxml.etree
+
+from office.helpers.ids import IdAllocator
 
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 NS = {
@@ -49,6 +71,19 @@ COMMENT_XML = """\
   </w:p>
 </w:comment>"""
 
+_W = f"{{{NS['w']}}}"
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+_RUN_TEXT = {f"{_W}tab": "\t", f"{_W}br": "\n", f"{_W}cr": "\n"}
+_DELETED = {f"{_W}del", f"{_W}moveFrom"}
+_PARSER = lxml.etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+
+COMMENT_PARTS = [
+    ("comments.xml", "w:comments"),
+    ("commentsExtended.xml", "w15:commentsEx"),
+    ("commentsIds.xml", "w16cid:commentsIds"),
+    ("commentsExtensible.xml", "w16cex:commentsExtensible"),
+]
+
 COMMENT_MARKER_TEMPLATE = """
 Add to document.xml (markers must be direct children of w:p, never inside w:r):
   <w:commentRangeStart w:id="{cid}"/>
@@ -65,10 +100,6 @@ Nest markers inside parent {pid}'s markers (markers must be direct children of w
   <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:commentReference w:id="{cid}"/></w:r>"""
 
 
-def _generate_hex_id() -> str:
-    return f"{random.randint(0, 0x7FFFFFFE):08X}"
-
-
 SMART_QUOTE_ENTITIES = {
     "\u201c": "&#x201C;",  
     "\u201d": "&#x201D;",  
@@ -95,14 +126,213 @@ def _append_xml(xml_path: Path, root_tag: str, content: str) -> None:
     xml_path.write_text(output, encoding="utf-8")
 
 
-def _find_para_id(comments_path: Path, comment_id: int) -> str | None:
+def _comment_para_ids(comments_path: Path) -> dict[str, str]:
+    """Map each existing comment id to the paraId of its first paragraph."""
     dom = defusedxml.minidom.parseString(comments_path.read_text(encoding="utf-8"))
+    para_ids = {}
     for c in dom.getElementsByTagName("w:comment"):
-        if c.getAttribute("w:id") == str(comment_id):
-            for p in c.getElementsByTagName("w:p"):
-                if pid := p.getAttribute("w14:paraId"):
-                    return pid
-    return None
+        para_ids[c.getAttribute("w:id")] = next(
+            (
+                pid
+                for p in c.getElementsByTagName("w:p")
+                if (pid := p.getAttribute("w14:paraId"))
+            ),
+            None,
+        )
+    return para_ids
+
+
+class _TextIndex:
+    """Character offsets of the text runs in a document body.
+
+    Paragraphs are joined with "\n", so offsets into ``text`` map to runs by
+    bisecting the sorted run start/end offsets. Anchor text itself is found
+    with a linear scan of ``text``; the offsets found for each anchor are
+    kept, so a batch scans the document at most once per distinct anchor.
+    Text boxes and deleted text are not indexed.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.runs, self.starts, self.ends = [], [], []
+        self.paragraphs = []
+        self._occurrences = {}
+        parts = []
+        offset = 0
+        for p in body.iter(f"{_W}p"):
+            if any(a.tag == f"{_W}txbxContent" for a in p.iterancestors()):
+                continue
+            if self.paragraphs:
+                parts.append("\n")
+                offset += 1
+            p_start = offset
+            for r in p.iter(f"{_W}r"):
+                if next(r.iterancestors(f"{_W}p")) is not p or r.getparent().tag in _DELETED:
+                    continue
+                text = _run_text(r)
+                if not text:
+                    continue
+                self.runs.append(r)
+                self.starts.append(offset)
+                offset += len(text)
+                self.ends.append(offset)
+                parts.append(text)
+            self.paragraphs.append((p_start, offset))
+        self.text = "".join(parts)
+
+    def locate(self, entry: dict, comment_id: int) -> tuple[int, int]:
+        """Return the (start, end) offsets an anchored batch entry refers to."""
+        if "anchor" in entry:
+            target = entry["anchor"]
+            occurrence = int(entry.get("occurrence", 1))
+            if not target or occurrence < 1:
+                raise ValueError(f"Invalid anchor for comment {comment_id}")
+            found = self._occurrences.setdefault(target, [])
+            while len(found) < occurrence:
+                start = self.text.find(target, found[-1] + 1 if found else 0)
+                if start < 0:
+                    raise ValueError(
+                        f"Anchor text not found for comment {comment_id}: {target!r}"
+                        + (f" (occurrence {occurrence})" if occurrence > 1 else "")
+                    )
+                found.append(start)
+            start = found[occurrence - 1]
+            end = start + len(target)
+        else:
+            index = int(entry["paragraph"])
+            if not 0 <= index < len(self.paragraphs):
+                raise ValueError(f"Paragraph {index} out of range for comment {comment_id}")
+            p_start, p_end = self.paragraphs[index]
+            if p_start == p_end:
+                raise ValueError(f"Paragraph {index} has no text for comment {comment_id}")
+            start = p_start + int(entry.get("start", 0))
+            end = p_start + int(entry.get("end", p_end - p_start))
+            if not p_start <= start < end <= p_end:
+                raise ValueError(
+                    f"Character range {start - p_start}-{end - p_start} is outside "
+                    f"paragraph {index} for comment {comment_id}"
+                )
+
+        first = bisect_right(self.ends, start)
+        if first == len(self.runs) or self.starts[first] >= end:
+            raise ValueError(f"Anchor for comment {comment_id} covers no text")
+        return start, end
+
+    def insert_markers(self, ranges: dict[int, tuple[int, int]]) -> None:
+        """Wrap each range in comment markers and add its reference run."""
+        for offset in sorted({o for r in ranges.values() for o in r}, reverse=True):
+            i = bisect_right(self.starts, offset) - 1
+            if i >= 0 and self.starts[i] < offset < self.ends[i]:
+                _split_run(self.runs[i], offset - self.starts[i])
+
+        index = _TextIndex(self.body)
+        ends = []
+        for comment_id, (start, end) in ranges.items():
+            first = index.runs[bisect_left(index.starts, start)]
+            last = index.runs[bisect_right(index.ends, end) - 1]
+            first.addprevious(_marker("commentRangeStart", comment_id))
+            last.addnext(_marker("commentRangeEnd", comment_id))
+            ends.append((comment_id, last))
+
+        # References follow all range ends at the same point, in comment order,
+        # outside any hyperlink, w:ins or other container the range ends in
+        for comment_id, last in ends:
+            pos = last
+            while pos.getparent().tag != f"{_W}p":
+                pos = pos.getparent()
+            while (following := pos.getnext()) is not None and (
+                following.tag == f"{_W}commentRangeEnd"
+                or following.find(f"{_W}commentReference") is not None
+            ):
+                pos = following
+            pos.addnext(_reference_run(comment_id))
+
+
+def _existing_markers(body) -> dict[tuple[str, str], object]:
+    """The comment markers already in a document, keyed by (tag, w:id)."""
+    markers = {}
+    tags = ("commentRangeStart", "commentRangeEnd", "commentReference")
+    for elem in body.iter(*(f"{_W}{tag}" for tag in tags)):
+        key = (lxml.etree.QName(elem).localname, elem.get(f"{_W}id"))
+        markers.setdefault(key, elem)
+    return markers
+
+
+def _nest_reply(markers: dict, parent_id: int, comment_id: int) -> bool:
+    """Nest a reply's markers inside its parent's, as Word does.
+
+    Returns False if the parent has no complete set of markers.
+    """
+    pid, cid = str(parent_id), str(comment_id)
+    start = markers.get(("commentRangeStart", pid))
+    end = markers.get(("commentRangeEnd", pid))
+    reference = markers.get(("commentReference", pid))
+    if start is None or end is None or reference is None:
+        return False
+
+    markers[("commentRangeStart", cid)] = _marker("commentRangeStart", comment_id)
+    start.addnext(markers[("commentRangeStart", cid)])
+    markers[("commentRangeEnd", cid)] = _marker("commentRangeEnd", comment_id)
+    end.addprevious(markers[("commentRangeEnd", cid)])
+
+    pos = reference.getparent()
+    while (following := pos.getnext()) is not None and (
+        following.find(f"{_W}commentReference") is not None
+    ):
+        pos = following
+    run = _reference_run(comment_id)
+    pos.addnext(run)
+    markers[("commentReference", cid)] = run.find(f"{_W}commentReference")
+    return True
+
+
+def _run_text(run) -> str:
+    return "".join(_item_text(child) for child in run)
+
+
+def _item_text(child) -> str:
+    if child.tag == f"{_W}t":
+        return child.text or ""
+    return _RUN_TEXT.get(child.tag, "")
+
+
+def _split_run(run, offset: int) -> None:
+    """Split run at a character offset; the second half follows it."""
+    tail = lxml.etree.Element(run.tag, run.attrib)
+    rpr = run.find(f"{_W}rPr")
+    if rpr is not None:
+        tail.append(copy.deepcopy(rpr))
+
+    pos = 0
+    for child in list(run):
+        if child.tag == f"{_W}rPr":
+            continue
+        length = len(_item_text(child))
+        if pos >= offset:
+            tail.append(child)
+        elif pos + length > offset:
+            text = child.text
+            child.text = text[: offset - pos]
+            child.set(_XML_SPACE, "preserve")
+            rest = lxml.etree.SubElement(tail, f"{_W}t")
+            rest.text = text[offset - pos :]
+            rest.set(_XML_SPACE, "preserve")
+        pos += length
+    run.addnext(tail)
+
+
+def _marker(tag: str, comment_id: int):
+    marker = lxml.etree.Element(f"{_W}{tag}")
+    marker.set(f"{_W}id", str(comment_id))
+    return marker
+
+
+def _reference_run(comment_id: int):
+    run = lxml.etree.Element(f"{_W}r")
+    rpr = lxml.etree.SubElement(run, f"{_W}rPr")
+    lxml.etree.SubElement(rpr, f"{_W}rStyle").set(f"{_W}val", "CommentReference")
+    run.append(_marker("commentReference", comment_id))
+    return run
 
 
 def _get_next_rid(rels_path: Path) -> int:
@@ -222,95 +452,222 @@ def add_comment(
     author: str = "Claude",
     initials: str = "C",
     parent_id: int | None = None,
+    anchor: str | None = None,
 ) -> tuple[str, str]:
+    entry = _comment_entry(comment_id, text, author, initials, parent_id, anchor)
+    para_ids, anchoring, msg = add_comments(unpacked_dir, [entry])
+    if not para_ids:
+        return "", msg
+    return para_ids[0], _added_message(entry, para_ids[0], anchoring)
+
+
+def _comment_entry(comment_id, text, author, initials, parent_id, anchor) -> dict:
+    entry = {
+        "id": comment_id,
+        "text": text,
+        "author": author,
+        "initials": initials,
+        "parent": parent_id,
+    }
+    if anchor is not None:
+        entry["anchor"] = anchor
+    return entry
+
+
+def _added_message(entry: dict, para_id: str, anchoring: dict[int, bool]) -> str:
+    comment_id, parent_id = entry["id"], entry["parent"]
+    action = "reply" if parent_id is not None else "comment"
+    msg = f"Added {action} {comment_id} (para_id={para_id})"
+    if anchoring.get(comment_id):
+        msg += " anchored in document.xml"
+    elif comment_id in anchoring:
+        msg += f"; not anchored (parent {parent_id} has no markers in document.xml)"
+    return msg
+
+
+def add_comments(
+    unpacked_dir: str, comments: list[dict]
+) -> tuple[list[str], dict[int, bool], str]:
+    """Add comments and replies, reading and writing each comment part once.
+
+    Returns the new paraIds in input order, {comment ID: anchored} for every
+    comment that was to be anchored (False for a reply whose parent has no
+    markers in document.xml), and a summary. Every entry is checked before
+    anything is written, so an invalid entry leaves the package untouched.
+    paraIds, durableIds and missing comment IDs come from one IdAllocator
+    scan of the package, so they never collide with IDs already in use.
+    """
     word = Path(unpacked_dir) / "word"
     if not word.exists():
-        return "", f"Error: {word} not found"
-
-    para_id, durable_id = _generate_hex_id(), _generate_hex_id()
+        return [], {}, f"Error: {word} not found"
+
+    comments_path = word / "comments.xml"
+    para_ids = _comment_para_ids(comments_path) if comments_path.exists() else {}
+    ids = IdAllocator.scan(unpacked_dir, "word/*.xml")
+    for entry in comments:
+        if isinstance(entry, dict) and isinstance(entry.get("id"), int):
+            ids.reserve("annotation", entry["id"])
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    comments = word / "comments.xml"
-    first_comment = not comments.exists()
-    if first_comment:
-        shutil.copy(TEMPLATE_DIR / "comments.xml", comments)
-        _ensure_comment_relationships(Path(unpacked_dir))
-        _ensure_comment_content_types(Path(unpacked_dir))
-    _append_xml(
-        comments,
-        "w:comments",
-        COMMENT_XML.format(
-            id=comment_id,
-            author=author,
-            date=ts,
-            initials=initials,
-            para_id=para_id,
-            text=text,  
-        ),
-    )
-
-    ext = word / "commentsExtended.xml"
-    if not ext.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsExtended.xml", ext)
-    if parent_id is not None:
-        parent_para = _find_para_id(comments, parent_id)
-        if not parent_para:
-            return "", f"Error: Parent comment {parent_id} not found"
-        _append_xml(
-            ext,
-            "w15:commentsEx",
-            f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para}" w15:done="0"/>',
+    fragments = {name: [] for name, _ in COMMENT_PARTS}
+    added = []
+    replies = 0
+    document = word / "document.xml"
+    tree = index = None
+    ranges = {}
+    nested = {}
+    batch_ids = set()
+    for entry in comments:
+        try:
+            comment_id = int(entry["id"]) if "id" in entry else ids.next_id("annotation")
+            text = entry["text"]
+            parent_id = entry.get("parent")
+            parent_id = int(parent_id) if parent_id is not None else None
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return [], {}, f"Error: Invalid comment entry: {entry!r}"
+
+        if str(comment_id) in para_ids:
+            return [], {}, f"Error: Comment {comment_id} already exists"
+
+        parent_attr = ""
+        if parent_id is not None:
+            parent_para = para_ids.get(str(parent_id))
+            if not parent_para:
+                return [], {}, f"Error: Parent comment {parent_id} not found"
+            parent_attr = f' w15:paraIdParent="{parent_para}"'
+            replies += 1
+
+        if "anchor" in entry or "paragraph" in entry:
+            if index is None:
+                if not document.exists():
+                    return [], {}, f"Error: {document} not found"
+                tree = lxml.etree.parse(str(document), _PARSER)
+                index = _TextIndex(tree.getroot().find(f"{_W}body"))
+            try:
+                ranges[comment_id] = index.locate(entry, comment_id)
+            except (TypeError, ValueError) as e:
+                return [], {}, f"Error: {e}"
+        elif parent_id in ranges:
+            ranges[comment_id] = ranges[parent_id]
+        elif parent_id is not None and (parent_id not in batch_ids or parent_id in nested):
+            # Parent added by an earlier run: nest inside its existing markers
+            nested[comment_id] = parent_id
+        batch_ids.add(comment_id)
+
+        para_id, durable_id = ids.para_id(), ids.durable_id()
+        para_ids[str(comment_id)] = para_id
+        added.append(para_id)
+
+        fragments["comments.xml"].append(
+            COMMENT_XML.format(
+                id=comment_id,
+                author=entry.get("author") or "Claude",
+                date=ts,
+                initials=entry.get("initials") or "C",
+                para_id=para_id,
+                text=text,
+            )
         )
-    else:
-        _append_xml(
-            ext,
-            "w15:commentsEx",
-            f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>',
+        fragments["commentsExtended.xml"].append(
+            f'<w15:commentEx w15:paraId="{para_id}"{parent_attr} w15:done="0"/>'
+        )
+        fragments["commentsIds.xml"].append(
+            f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
+        )
+        fragments["commentsExtensible.xml"].append(
+            f'<w16cex:commentExtensible w16cex:durableId="{durable_id}" w16cex:dateUtc="{ts}"/>'
         )
 
-    ids = word / "commentsIds.xml"
-    if not ids.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsIds.xml", ids)
-    _append_xml(
-        ids,
-        "w16cid:commentsIds",
-        f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>',
-    )
+    if not added:
+        return [], {}, "No comments to add"
 
-    extensible = word / "commentsExtensible.xml"
-    if not extensible.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsExtensible.xml", extensible)
-    _append_xml(
-        extensible,
-        "w16cex:commentsExtensible",
-        f'<w16cex:commentExtensible w16cex:durableId="{durable_id}" w16cex:dateUtc="{ts}"/>',
-    )
+    if not comments_path.exists():
+        shutil.copy(TEMPLATE_DIR / "comments.xml", comments_path)
+        _ensure_comment_relationships(Path(unpacked_dir))
+        _ensure_comment_content_types(Path(unpacked_dir))
 
-    action = "reply" if parent_id is not None else "comment"
-    return para_id, f"Added {action} {comment_id} (para_id={para_id})"
+    for name, root_tag in COMMENT_PARTS:
+        path = word / name
+        if not path.exists():
+            shutil.copy(TEMPLATE_DIR / name, path)
+        _append_xml(path, root_tag, "".join(fragments[name]))
+
+    summary = f"Added {len(added) - replies} comments and {replies} replies"
+    if nested and tree is None and document.exists():
+        tree = lxml.etree.parse(str(document), _PARSER)
+    if ranges:
+        index.insert_markers(ranges)
+    anchoring = dict.fromkeys(ranges, True)
+    if nested:
+        markers = _existing_markers(tree.getroot()) if tree is not None else {}
+        for comment_id, parent_id in nested.items():
+            anchoring[comment_id] = _nest_reply(markers, parent_id, comment_id)
+    anchored = [comment_id for comment_id, done in anchoring.items() if done]
+    unanchored = [comment_id for comment_id, done in anchoring.items() if not done]
+    if anchored:
+        document.write_bytes(
+            lxml.etree.tostring(
+                tree,
+                xml_declaration=True,
+                encoding="UTF-8",
+                standalone=tree.docinfo.standalone,
+            )
+        )
+        summary += f", anchored {len(anchored)} in document.xml"
+    if unanchored:
+        summary += (
+            f"; replies {', '.join(map(str, unanchored))} not anchored "
+            "(parent has no markers in document.xml)"
+        )
+    return added, anchoring, summary
 
 
 if __name__ == "__main__":
     p = argparse.ArgumentParser(description="Add comments to DOCX documents")
     p.add_argument("unpacked_dir", help="Unpacked DOCX directory")
-    p.add_argument("comment_id", type=int, help="Comment ID (must be unique)")
-    p.add_argument("text", help="Comment text")
+    p.add_argument("comment_id", type=int, nargs="?", help="Comment ID (must be unique)")
+    p.add_argument("text", nargs="?", help="Comment text")
     p.add_argument("--author", default="Claude", help="Author name")
     p.add_argument("--initials", default="C", help="Author initials")
     p.add_argument("--parent", type=int, help="Parent comment ID (for replies)")
+    p.add_argument(
+        "--anchor",
+        metavar="TEXT",
+        help="Insert the comment markers around the first occurrence of TEXT in document.xml",
+    )
+    p.add_argument(
+        "--batch",
+        metavar="JSON",
+        help="JSON list of comments to add in one pass (see module docstring)",
+    )
     args = p.parse_args()
 
-    para_id, msg = add_comment(
-        args.unpacked_dir,
-        args.comment_id,
-        args.text,
-        args.author,
-        args.initials,
-        args.parent,
+    if args.batch:
+        if args.comment_id is not None or args.text is not None or args.anchor:
+            p.error("--batch cannot be combined with comment_id/text/--anchor")
+        entries = json.loads(Path(args.batch).read_text(encoding="utf-8"))
+        for entry in entries:
+            entry.setdefault("author", args.author)
+            entry.setdefault("initials", args.initials)
+        _, _, msg = add_comments(args.unpacked_dir, entries)
+        print(msg)
+        if "Error" in msg:
+            sys.exit(1)
+        sys.exit(0)
+
+    if args.comment_id is None or args.text is None:
+        p.error("comment_id and text are required unless --batch is given")
+
+    entry = _comment_entry(
+        args.comment_id, args.text, args.author, args.initials, args.parent, args.anchor
     )
-    print(msg)
-    if "Error" in msg:
+    para_ids, anchoring, msg = add_comments(args.unpacked_dir, [entry])
+    if not para_ids:
+        print(msg)
         sys.exit(1)
+    print(_added_message(entry, para_ids[0], anchoring))
+    if anchoring.get(args.comment_id):
+        sys.exit(0)
     cid = args.comment_id
     if args.parent is not None:
         print(REPLY_MARKER_TEMPLATE.format(pid=args.parent, cid=cid))
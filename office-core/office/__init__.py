@@ -0,0 +1,9 @@
+"""Shared Office Open XML tooling for the docx, pptx and xlsx skills.
+
+Each skill reaches this package through a ``scripts/office`` symlink, so
+``python scripts/office/pack.py`` and ``from office.soffice import ...``
+work unchanged from any of them. Bump __version__ when the CLI or the
+importable API changes.
+"""
+
+__version__ = "1.1.0"
@@ -0,0 +1,362 @@
+"""Structural diff of two Office files (DOCX, PPTX, XLSX).
+
+Compares the packages part by part without extracting them. Parts whose
+CRC-32 and size match are treated as identical without being
+decompressed; zip entries use the CRC stored in the zip directory and
+files in an unpacked directory are checksummed the same way, so a
+package can be compared with its unpacked copy. Changed XML parts are
+compared by namespace-qualified names with blank text removed, so
+attribute order, namespace prefixes and declarations, indentation,
+comments and processing instructions do not count as changes (unlike
+C14N, which keeps prefixes and whitespace); real changes are reported as
+element, attribute and text differences with XPath-like locations.
+Changed parts are diffed in parallel.
+
+Output is JSON: a summary; the added, removed and formatting-only parts
+(bytes differ but the parsed XML is equivalent); and the changes found in
+each changed part.
+
+Usage:
+    python diff.py <old> <new> [options]
+
+Examples:
+    python diff.py original.pptx output.pptx
+    python diff.py original.docx output.docx -o diff.json --max-changes 50
+    python diff.py original.xlsx unpacked/
+
+Exits with 0 when the packages are equivalent and 1 when they differ.
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import lxml.etree
+
+XML_SUFFIXES = (".xml", ".rels", ".vml")
+DEFAULT_MAX_CHANGES = 200
+
+_XMLNS_RE = re.compile(r'\s+xmlns(?::\w+)?="[^"]*"')
+
+_PARSER = lxml.etree.XMLParser(
+    resolve_entities=False,
+    no_network=True,
+    huge_tree=True,
+    remove_blank_text=True,
+    remove_comments=True,
+    remove_pis=True,
+)
+
+
+def diff_packages(
+    old: str,
+    new: str,
+    workers: int | None = None,
+    max_changes: int = DEFAULT_MAX_CHANGES,
+) -> dict:
+    with _Package(old) as old_package, _Package(new) as new_package:
+        old_parts = old_package.fingerprints()
+        new_parts = new_package.fingerprints()
+
+        added = sorted(new_parts.keys() - old_parts.keys())
+        removed = sorted(old_parts.keys() - new_parts.keys())
+        changed = sorted(
+            name
+            for name in old_parts.keys() & new_parts.keys()
+            if old_parts[name] != new_parts[name]
+        )
+
+        workers = workers or os.cpu_count() or 1
+        if len(changed) > 1 and workers > 1:
+            # Each job opens both packages once and diffs a batch of parts
+            size = -(-len(changed) // (workers * 4))
+            jobs = [
+                (old, new, changed[i : i + size], max_changes)
+                for i in range(0, len(changed), size)
+            ]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = [r for batch in pool.map(_diff_batch, jobs) for r in batch]
+        else:
+            results = [
+                _diff_part(old_package, new_package, name, max_changes) for name in changed
+            ]
+
+    formatting = [name for name, result in zip(changed, results) if result == "formatting"]
+    parts = {
+        name: result for name, result in zip(changed, results) if isinstance(result, dict)
+    }
+    return {
+        "old": str(old),
+        "new": str(new),
+        "summary": {
+            "identical": len(old_parts.keys() & new_parts.keys()) - len(parts) - len(formatting),
+            "changed": len(parts),
+            "formatting_only": len(formatting),
+            "added": len(added),
+            "removed": len(removed),
+        },
+        "added": added,
+        "removed": removed,
+        "formatting_only": formatting,
+        "parts": parts,
+    }
+
+
+class _Package:
+    """Read access to the parts of a zip package or an unpacked directory."""
+
+    def __init__(self, source: str):
+        self.path = Path(source)
+        self._zip = None if self.path.is_dir() else zipfile.ZipFile(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._zip is not None:
+            self._zip.close()
+
+    def fingerprints(self) -> dict[str, tuple[int, int]]:
+        """(size, CRC-32) of every part, keyed by part name."""
+        if self._zip is not None:
+            return {
+                info.filename: (info.file_size, info.CRC)
+                for info in self._zip.infolist()
+                if not info.is_dir()
+            }
+        return {
+            file.relative_to(self.path).as_posix(): (file.stat().st_size, _crc32(file))
+            for file in sorted(self.path.rglob("*"))
+            if file.is_file()
+        }
+
+    def read(self, name: str) -> bytes:
+        if self._zip is not None:
+            return self._zip.read(name)
+        return (self.path / name).read_bytes()
+
+
+def _crc32(file: Path) -> int:
+    crc = 0
+    with open(file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _diff_batch(job: tuple[str, str, list[str], int]) -> list:
+    old, new, names, max_changes = job
+    with _Package(old) as old_package, _Package(new) as new_package:
+        return [_diff_part(old_package, new_package, name, max_changes) for name in names]
+
+
+def _diff_part(
+    old: _Package, new: _Package, name: str, max_changes: int
+) -> dict | str | None:
+    """None if the bytes match, "formatting" if only the parsed XML does."""
+    old_data = old.read(name)
+    new_data = new.read(name)
+    if old_data == new_data:
+        return None
+
+    if not name.lower().endswith(XML_SUFFIXES):
+        return _binary_change(old_data, new_data)
+
+    try:
+        old_root = lxml.etree.fromstring(old_data, _PARSER)
+        new_root = lxml.etree.fromstring(new_data, _PARSER)
+    except lxml.etree.XMLSyntaxError as e:
+        result = _binary_change(old_data, new_data)
+        result["error"] = f"Failed to parse XML: {e}"
+        return result
+
+    hashes = _SubtreeHashes()
+    if hashes[old_root] == hashes[new_root]:
+        return "formatting"
+
+    changes = []
+    _diff_elements(old_root, new_root, "/" + _step(new_root, 1), changes, hashes)
+    return {
+        "changes": changes[:max_changes],
+        "total_changes": len(changes),
+        "truncated": len(changes) > max_changes,
+    }
+
+
+def _binary_change(old_data: bytes, new_data: bytes) -> dict:
+    return {
+        "old_size": len(old_data),
+        "new_size": len(new_data),
+        "old_sha256": hashlib.sha256(old_data).hexdigest(),
+        "new_sha256": hashlib.sha256(new_data).hexdigest(),
+    }
+
+
+class _SubtreeHashes(dict):
+    """Memoized digest of an element's tag, attributes, text, tail and children.
+
+    Used in place of comparing C14N output, and more lenient than C14N:
+    names are hashed in {namespace}local form, so namespace prefixes and
+    declarations do not affect the digest (C14N keeps both), and the
+    blank text dropped by the parser is not seen. Like C14N, it ignores
+    attribute order, quoting, entity and character references and CDATA.
+    Comments and processing instructions are dropped by the parser (C14N
+    without comments keeps processing instructions). Text and attribute
+    values are otherwise compared exactly, so any other whitespace change
+    is reported.
+    """
+
+    def __missing__(self, elem):
+        digest = hashlib.sha1(str(elem.tag).encode())
+        for key, value in sorted(elem.attrib.items()):
+            digest.update(f"\0{key}={value}".encode())
+        digest.update(f"\0{elem.text or ''}\0{elem.tail or ''}".encode())
+        for child in elem:
+            digest.update(self[child])
+        value = self[elem] = digest.digest()
+        return value
+
+
+def _diff_elements(old, new, path: str, changes: list, hashes: _SubtreeHashes) -> None:
+    for key in sorted(set(old.attrib) | set(new.attrib)):
+        old_value, new_value = old.get(key), new.get(key)
+        if old_value != new_value:
+            changes.append(
+                {
+                    "path": f"{path}/@{_qname(new if key in new.attrib else old, key)}",
+                    "change": "attribute",
+                    "old": old_value,
+                    "new": new_value,
+                }
+            )
+
+    if (old.text or "") != (new.text or ""):
+        changes.append({"path": f"{path}/text()", "change": "text", "old": old.text, "new": new.text})
+    if (old.tail or "") != (new.tail or ""):
+        changes.append(
+            {
+                "path": f"{path}/following-sibling::text()[1]",
+                "change": "text",
+                "old": old.tail,
+                "new": new.tail,
+            }
+        )
+
+    old_children = [c for c in old if isinstance(c.tag, str)]
+    new_children = [c for c in new if isinstance(c.tag, str)]
+    old_steps = _child_steps(old_children)
+    new_steps = _child_steps(new_children)
+
+    matcher = difflib.SequenceMatcher(
+        None,
+        [hashes[c] for c in old_children],
+        [hashes[c] for c in new_children],
+        autojunk=False,
+    )
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        # Pair elements with the same tag so edits inside them are reported
+        # in place rather than as a removal plus an addition
+        tags = difflib.SequenceMatcher(
+            None,
+            [c.tag for c in old_children[i1:i2]],
+            [c.tag for c in new_children[j1:j2]],
+            autojunk=False,
+        )
+        for tag_op, a1, a2, b1, b2 in tags.get_opcodes():
+            if tag_op == "equal":
+                for i, j in zip(range(i1 + a1, i1 + a2), range(j1 + b1, j1 + b2)):
+                    _diff_elements(
+                        old_children[i], new_children[j], f"{path}/{new_steps[j]}", changes, hashes
+                    )
+                continue
+            for i in range(i1 + a1, i1 + a2):
+                changes.append({"path": f"{path}/{old_steps[i]}", "change": "removed"})
+            for j in range(j1 + b1, j1 + b2):
+                changes.append(
+                    {
+                        "path": f"{path}/{new_steps[j]}",
+                        "change": "added",
+                        "xml": _XMLNS_RE.sub(
+                            "", lxml.etree.tostring(new_children[j], encoding="unicode")
+                        )[:500],
+                    }
+                )
+
+
+def _child_steps(children) -> list[str]:
+    counts = {}
+    steps = []
+    for child in children:
+        counts[child.tag] = counts.get(child.tag, 0) + 1
+        steps.append(_step(child, counts[child.tag]))
+    return steps
+
+
+def _step(elem, index: int) -> str:
+    return f"{_qname(elem, elem.tag)}[{index}]"
+
+
+def _qname(elem, name: str) -> str:
+    qname = lxml.etree.QName(name)
+    if qname.namespace is None:
+        return qname.localname
+    for prefix, uri in elem.nsmap.items():
+        if uri == qname.namespace and prefix:
+            return f"{prefix}:{qname.localname}"
+    return qname.localname
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Structural diff of two Office files (or unpacked directories)"
+    )
+    parser.add_argument("old", help="Original .docx/.pptx/.xlsx file or unpacked directory")
+    parser.add_argument("new", help="Changed .docx/.pptx/.xlsx file or unpacked directory")
+    parser.add_argument("-o", "--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processes for diffing changed parts (default: CPU count)",
+    )
+    parser.add_argument(
+        "--max-changes",
+        type=int,
+        default=DEFAULT_MAX_CHANGES,
+        help=f"Changes listed per part (default: {DEFAULT_MAX_CHANGES})",
+    )
+    args = parser.parse_args()
+
+    for source in (args.old, args.new):
+        if not Path(source).exists():
+            print(f"Error: {source} not found", file=sys.stderr)
+            sys.exit(2)
+
+    try:
+        report = diff_packages(args.old, args.new, args.workers, args.max_changes)
+    except zipfile.BadZipFile as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+        summary = report["summary"]
+        print(
+            f"{summary['changed']} changed, {summary['formatting_only']} formatting only, "
+            f"{summary['added']} added, {summary['removed']} removed -> {args.output}"
+        )
+    else:
+        print(output)
+
+    differs = any(report["summary"][key] for key in ("changed", "added", "removed"))
+    sys.exit(1 if differs else 0)
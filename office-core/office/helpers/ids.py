@@ -0,0 +1,128 @@
+"""Allocate IDs that are unused anywhere in an unpacked package.
+
+IdAllocator.scan() reads the package once and records every ID already in
+use, grouped by kind:
+
+    paraId      w14:paraId, w15:paraId(Parent), w16cid:paraId (hex, random)
+    durableId   w16cid:durableId, w16cex:durableId (hex; decimal in numbering.xml)
+    annotation  w:id of comments, bookmarks, revisions and range markers
+    sldId       p:sldId/@id in presentation.xml (from 256)
+
+New IDs are checked against those sets and added to them, so an allocator
+never hands out the same value twice or one already in the package.
+"""
+
+import random
+from pathlib import Path
+
+import lxml.etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W14_NS = "http://schemas.microsoft.com/office/word/2010/wordml"
+W15_NS = "http://schemas.microsoft.com/office/word/2012/wordml"
+W16CID_NS = "http://schemas.microsoft.com/office/word/2016/wordml/cid"
+W16CEX_NS = "http://schemas.microsoft.com/office/word/2018/wordml/cex"
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+
+# (lowest, highest + 1) for each kind
+ID_RANGES = {
+    "paraId": (1, 0x80000000),
+    "durableId": (1, 0x7FFFFFFF),
+    "annotation": (0, 0x7FFFFFFF),
+    "sldId": (256, 0x80000000),
+}
+
+HEX_ATTRIBUTES = {
+    f"{{{W14_NS}}}paraId": "paraId",
+    f"{{{W15_NS}}}paraId": "paraId",
+    f"{{{W15_NS}}}paraIdParent": "paraId",
+    f"{{{W16CID_NS}}}paraId": "paraId",
+    f"{{{W16CID_NS}}}durableId": "durableId",
+    f"{{{W16CEX_NS}}}durableId": "durableId",
+}
+
+_W_ID = f"{{{W_NS}}}id"
+_SLD_ID = f"{{{P_NS}}}sldId"
+
+_PARSER = lxml.etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+
+
+class IdAllocator:
+    def __init__(self):
+        self.used = {kind: set() for kind in ID_RANGES}
+        self._next = {}
+
+    @classmethod
+    def scan(cls, unpacked_dir, pattern: str = "**/*.xml") -> "IdAllocator":
+        """Build an allocator from the XML parts of an unpacked package.
+
+        ``pattern`` limits the scan, e.g. "ppt/presentation.xml" when only
+        slide IDs are needed.
+        """
+        ids = cls()
+        for path in Path(unpacked_dir).glob(pattern):
+            if path.name == "[Content_Types].xml":
+                continue
+            try:
+                root = lxml.etree.parse(str(path), _PARSER).getroot()
+            except lxml.etree.XMLSyntaxError:
+                continue
+            ids.add_part(root, numbering=path.name == "numbering.xml")
+        return ids
+
+    def add_part(self, root, numbering: bool = False) -> None:
+        """Record the IDs used in one parsed part."""
+        for elem in root.iter(lxml.etree.Element):
+            for name, value in elem.attrib.items():
+                kind = HEX_ATTRIBUTES.get(name)
+                if kind is not None:
+                    base = 10 if numbering and kind == "durableId" else 16
+                    self._reserve_text(kind, value, base)
+                elif name == _W_ID:
+                    self._reserve_text("annotation", value, 10)
+            if elem.tag == _SLD_ID:
+                self._reserve_text("sldId", elem.get("id", ""), 10)
+
+    def reserve(self, kind: str, value: int) -> None:
+        self.used[kind].add(value)
+
+    def random_id(self, kind: str) -> int:
+        """A random unused ID, as Word generates paraIds and durableIds."""
+        low, high = ID_RANGES[kind]
+        used = self.used[kind]
+        if len(used) >= high - low:
+            raise ValueError(f"No unused {kind} values left")
+        while (value := random.randrange(low, high)) in used:
+            pass
+        used.add(value)
+        return value
+
+    def next_id(self, kind: str) -> int:
+        """The next unused ID above the highest one seen, wrapping to gaps."""
+        low, high = ID_RANGES[kind]
+        used = self.used[kind]
+        value = self._next.get(kind)
+        if value is None:
+            value = max(used, default=low - 1) + 1
+        if value >= high:
+            value = low
+        while value in used:
+            value += 1
+            if value >= high:
+                raise ValueError(f"No unused {kind} values left")
+        used.add(value)
+        self._next[kind] = value + 1
+        return value
+
+    def para_id(self) -> str:
+        return f"{self.random_id('paraId'):08X}"
+
+    def durable_id(self, numbering: bool = False) -> str:
+        value = self.random_id("durableId")
+        return str(value) if numbering else f"{value:08X}"
+
+    def _reserve_text(self, kind: str, value: str, base: int) -> None:
+        try:
+            self.used[kind].add(int(value, base))
+        except ValueError:
+            pass
@@ -0,0 +1,223 @@
+"""Downscale and re-encode images to the largest size they are displayed at.
+
+Finds every <a:blip r:embed> in the package, reads the size it is drawn at
+(p:spPr/a:xfrm/a:ext in slides and spreadsheet drawings, wp:extent in
+Word, scaled by the ext/chExt of any enclosing groups), and takes the
+maximum over all references to the same media part. Images larger than
+that size at the target DPI are resized; JPEG and PNG images are
+re-encoded, keeping their ICC profile and EXIF data, and kept only when
+the result is smaller.
+
+Images without a known display size (backgrounds, tiled fills,
+unreferenced media) and formats other than JPEG/PNG are left untouched.
+File names and formats never change, so no relationship or content type
+needs updating.
+"""
+
+import os
+import posixpath
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import lxml.etree
+from PIL import Image
+
+EMU_PER_INCH = 914400
+DEFAULT_DPI = 220
+DEFAULT_QUALITY = 85
+
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+WP_NS = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+IMAGE_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG"}
+
+_PARSER = lxml.etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+
+
+def optimize_images(
+    input_dir: str,
+    quality: int = DEFAULT_QUALITY,
+    dpi: int = DEFAULT_DPI,
+    workers: int | None = None,
+) -> tuple[int, str]:
+    root = Path(input_dir)
+    sizes = display_sizes(root)
+
+    jobs = []
+    for part, (cx, cy) in sizes.items():
+        path = root / part
+        if path.suffix.lower() not in IMAGE_FORMATS or not path.is_file():
+            continue
+        width = max(1, round(cx / EMU_PER_INCH * dpi))
+        height = max(1, round(cy / EMU_PER_INCH * dpi))
+        jobs.append((str(path), width, height, quality))
+
+    if not jobs:
+        return 0, "No images to optimize"
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = list(pool.map(_optimize_image, jobs))
+    except Exception as e:
+        return 0, f"Error: {e}"
+
+    changed = [(before, after) for before, after in results if after < before]
+    saved = sum(before - after for before, after in changed)
+    return len(changed), f"Optimized {len(changed)} images, saved {saved / 1024 / 1024:.1f} MB"
+
+
+def display_sizes(root: Path) -> dict[str, tuple[int, int]]:
+    """Return {media part: (max cx, max cy) in EMU}.
+
+    A part is left out if any reference to it has no known display size.
+    """
+    sizes = {}
+    unsized = set()
+    for rels_file in root.rglob("*.rels"):
+        rels_dir, filename = posixpath.split(rels_file.relative_to(root).as_posix())
+        source = posixpath.join(posixpath.dirname(rels_dir), filename[: -len(".rels")])
+        media = _media_targets(rels_file, source)
+        if not media or not (root / source).is_file():
+            continue
+
+        tree = lxml.etree.parse(str(root / source), _PARSER)
+        references = Counter(
+            value
+            for elem in tree.iter(lxml.etree.Element)
+            for key, value in elem.attrib.items()
+            if key.startswith(f"{{{R_NS}}}") and value in media
+        )
+        sized = Counter()
+        for blip in tree.iter(f"{{{A_NS}}}blip"):
+            rid = blip.get(f"{{{R_NS}}}embed")
+            if rid not in media:
+                continue
+            extent = _displayed_extent(blip)
+            if extent is None:
+                continue
+            sized[rid] += 1
+            cx, cy = extent
+            old_cx, old_cy = sizes.get(media[rid], (0, 0))
+            sizes[media[rid]] = (max(old_cx, cx), max(old_cy, cy))
+
+        unsized.update(media[rid] for rid in references if sized[rid] != references[rid])
+
+    return {part: size for part, size in sizes.items() if part not in unsized}
+
+
+def _media_targets(rels_file: Path, source: str) -> dict[str, str]:
+    targets = {}
+    for rel in lxml.etree.parse(str(rels_file), _PARSER).iter(f"{{{PKG_REL_NS}}}Relationship"):
+        target = rel.get("Target", "")
+        if rel.get("TargetMode") == "External" or "media/" not in target:
+            continue
+        if target.startswith("/"):
+            part = target.lstrip("/")
+        else:
+            part = posixpath.normpath(posixpath.join(posixpath.dirname(source), target))
+        targets[rel.get("Id")] = part
+    return targets
+
+
+def _displayed_extent(blip) -> tuple[int, int] | None:
+    """Size of the visible image region, scaled up for any a:srcRect crop.
+
+    None for tiled fills, whose size on screen depends on the tile scale.
+    """
+    blip_fill = blip.getparent()
+    if blip_fill is not None and blip_fill.find(f"{{{A_NS}}}tile") is not None:
+        return None
+
+    extent = None
+    for ancestor in blip.iterancestors():
+        found = ancestor.find(f"{{{WP_NS}}}extent")
+        if found is None:
+            found = ancestor.find(f"*/{{{A_NS}}}xfrm/{{{A_NS}}}ext")
+        if found is not None:
+            extent = found
+            break
+    if extent is None:
+        return None
+
+    try:
+        cx, cy = int(extent.get("cx")), int(extent.get("cy"))
+    except (TypeError, ValueError):
+        return None
+    if cx <= 0 or cy <= 0:
+        return None
+
+    scale_x, scale_y = _group_scale(ancestor)
+    cx, cy = round(cx * scale_x), round(cy * scale_y)
+
+    src_rect = blip_fill.find(f"{{{A_NS}}}srcRect") if blip_fill is not None else None
+    if src_rect is not None:
+        visible_x = 1 - (int(src_rect.get("l", 0)) + int(src_rect.get("r", 0))) / 100000
+        visible_y = 1 - (int(src_rect.get("t", 0)) + int(src_rect.get("b", 0))) / 100000
+        if visible_x > 0:
+            cx = round(cx / visible_x)
+        if visible_y > 0:
+            cy = round(cy / visible_y)
+    return cx, cy
+
+
+def _group_scale(shape) -> tuple[float, float]:
+    """Combined ext/chExt scale of the groups a shape is nested in."""
+    scale_x = scale_y = 1.0
+    for group in shape.iterancestors():
+        for child in group:
+            if not isinstance(child.tag, str) or not child.tag.endswith("}grpSpPr"):
+                continue
+            ext = child.find(f"{{{A_NS}}}xfrm/{{{A_NS}}}ext")
+            ch_ext = child.find(f"{{{A_NS}}}xfrm/{{{A_NS}}}chExt")
+            if ext is None or ch_ext is None:
+                break
+            try:
+                cx, cy = int(ext.get("cx")), int(ext.get("cy"))
+                ch_cx, ch_cy = int(ch_ext.get("cx")), int(ch_ext.get("cy"))
+            except (TypeError, ValueError):
+                break
+            if cx > 0 and ch_cx > 0:
+                scale_x *= cx / ch_cx
+            if cy > 0 and ch_cy > 0:
+                scale_y *= cy / ch_cy
+            break
+    return scale_x, scale_y
+
+
+def _optimize_image(job: tuple[str, int, int, int]) -> tuple[int, int]:
+    path_str, max_width, max_height, quality = job
+    path = Path(path_str)
+    before = path.stat().st_size
+    image_format = IMAGE_FORMATS[path.suffix.lower()]
+
+    with Image.open(path) as img:
+        if img.format != image_format:
+            return before, before
+        options = {key: img.info[key] for key in ("icc_profile", "exif") if img.info.get(key)}
+
+        scale = max(max_width / img.width, max_height / img.height)
+        if scale < 1:
+            if img.mode == "P":
+                img = img.convert("RGBA")
+            img = img.resize(
+                (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                Image.LANCZOS,
+            )
+        else:
+            img.load()
+
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    if image_format == "JPEG":
+        img.save(temp_path, "JPEG", quality=quality, optimize=True, **options)
+    else:
+        img.save(temp_path, "PNG", optimize=True, **options)
+
+    after = temp_path.stat().st_size
+    if after < before:
+        os.replace(temp_path, path)
+        return before, after
+    temp_path.unlink()
+    return before, before
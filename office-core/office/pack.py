@@ -1,13 +1,17 @@
 """Pack a directory into a DOCX, PPTX, or XLSX file.
 
 Validates with auto-repair, condenses XML formatting, and creates the Office file.
+With --optimize-images, images are also downscaled to the largest size they
+are displayed at and re-encoded (the unpacked directory is not modified).
 
 Usage:
     python pack.py <input_directory> <output_file> [--original <file>] [--validate true|false]
+                   [--optimize-images] [--image-quality N] [--image-dpi N]
 
 Examples:
     python pack.py unpacked/ output.docx --original input.docx
     python pack.py unpacked/ output.pptx --validate false
+    python pack.py unpacked/ output.pptx --optimize-images --image-quality 80
 """
 
 import argparse
@@ -27,6 +31,9 @@ def pack(
     original_file: str | None = None,
     validate: bool = True,
     infer_author_func=None,
+    optimize_images: bool = False,
+    image_quality: int = 85,
+    image_dpi: int = 220,
 ) -> tuple[None, str]:
     input_dir = Path(input_directory)
     output_path = Path(output_file)
@@ -57,6 +64,18 @@ def pack(
             for xml_file in temp_content_dir.rglob(pattern):
                 _condense_xml(xml_file)
 
+        if optimize_images:
+            try:
+                from helpers.optimize_images import optimize_images as do_optimize_images
+            except ImportError as e:
+                return None, f"Error: --optimize-images requires Pillow ({e})"
+            _, optimize_message = do_optimize_images(
+                str(temp_content_dir), quality=image_quality, dpi=image_dpi
+            )
+            if optimize_message.startswith("Error"):
+                return None, optimize_message
+            print(optimize_message)
+
         output_path.parent.mkdir(parents=True, exist_ok=True)
         with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
             for f in temp_content_dir.rglob("*"):
@@ -145,6 +164,23 @@ if __name__ == "__main__":
         metavar="true|false",
         help="Run validation with auto-repair (default: true)",
     )
+    parser.add_argument(
+        "--optimize-images",
+        action="store_true",
+        help="Downscale and re-encode images to their displayed size",
+    )
+    parser.add_argument(
+        "--image-quality",
+        type=int,
+        default=85,
+        help="JPEG quality for --optimize-images (default: 85)",
+    )
+    parser.add_argument(
+        "--image-dpi",
+        type=int,
+        default=220,
+        help="Resolution to keep at the displayed size for --optimize-images (default: 220)",
+    )
     args = parser.parse_args()
 
     _, message = pack(
@@ -152,6 +188,9 @@ if __name__ == "__main__":
         args.output_file,
         original_file=args.original,
         validate=args.validate,
+        optimize_images=args.optimize_images,
+        image_quality=args.image_quality,
+        image_dpi=args.image_dpi,
     )
     print(message)
 
@@ -1,7 +1,9 @@
 """
 Helper for running LibreOffice (soffice) in environments where AF_UNIX
 sockets may be blocked (e.g., sandboxed VMs).  Detects the restriction
-at runtime and applies an LD_PRELOAD shim if needed.
+at runtime and applies an LD_PRELOAD shim if needed.  The environment is
+computed once per process and the shim is compiled once into a
+content-hashed path under the temp directory.
 
 Usage:
     from office.soffice import run_soffice, get_soffice_env
@@ -14,6 +16,9 @@ Usage:
     subprocess.run(["soffice", ...], env=env)
 """
 
+import fcntl
+import functools
+import hashlib
 import os
 import socket
 import subprocess
@@ -22,6 +27,11 @@ from pathlib import Path
 
 
 def get_soffice_env() -> dict:
+    return dict(_base_soffice_env())
+
+
+@functools.lru_cache(maxsize=None)
+def _base_soffice_env() -> dict:
     env = os.environ.copy()
     env["SAL_USE_VCLPLUGIN"] = "svp"
 
@@ -38,9 +48,11 @@ def run_soffice(args: list[str], **kwargs) -> subprocess.CompletedProcess:
 
 
 
-_SHIM_SO = Path(tempfile.gettempdir()) / "lo_socket_shim.so"
+_SHIM_VERSION = 1
+_SHIM_DIR = Path(tempfile.gettempdir())
 
 
+@functools.lru_cache(maxsize=None)
 def _needs_shim() -> bool:
     try:
         s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
@@ -50,19 +62,42 @@ def _needs_shim() -> bool:
         return True
 
 
+def _shim_path() -> Path:
+    digest = hashlib.sha256(_SHIM_SOURCE.encode("utf-8")).hexdigest()[:16]
+    return _SHIM_DIR / f"lo_socket_shim-v{_SHIM_VERSION}-{digest}.so"
+
+
+@functools.lru_cache(maxsize=None)
 def _ensure_shim() -> Path:
-    if _SHIM_SO.exists():
-        return _SHIM_SO
-
-    src = Path(tempfile.gettempdir()) / "lo_socket_shim.c"
-    src.write_text(_SHIM_SOURCE)
-    subprocess.run(
-        ["gcc", "-shared", "-fPIC", "-o", str(_SHIM_SO), str(src), "-ldl"],
-        check=True,
-        capture_output=True,
-    )
-    src.unlink()
-    return _SHIM_SO
+    shim_so = _shim_path()
+    if shim_so.exists():
+        return shim_so
+
+    lock_path = shim_so.with_suffix(".lock")
+    with open(lock_path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if shim_so.exists():
+                return shim_so
+
+            pid = os.getpid()
+            src = shim_so.with_name(f"{shim_so.stem}.{pid}.c")
+            tmp_so = shim_so.with_name(f"{shim_so.stem}.{pid}.so.tmp")
+            src.write_text(_SHIM_SOURCE)
+            try:
+                subprocess.run(
+                    ["gcc", "-shared", "-fPIC", "-o", str(tmp_so), str(src), "-ldl"],
+                    check=True,
+                    capture_output=True,
+                )
+                os.replace(tmp_so, shim_so)
+            finally:
+                src.unlink(missing_ok=True)
+                tmp_so.unlink(missing_ok=True)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+    return shim_so
 
 
 
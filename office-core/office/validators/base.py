@@ -8,6 +8,23 @@ from pathlib import Path
 import defusedxml.minidom
 import lxml.etree
 
+SCHEMAS_DIR = Path(__file__).resolve().parent.parent / "schemas"
+
+_SCHEMA_CACHE = {}
+
+
+def load_schema(schema_path) -> lxml.etree.XMLSchema:
+    """Compile an XSD once per process; every validator shares the result."""
+    schema_path = Path(schema_path).resolve()
+    schema = _SCHEMA_CACHE.get(schema_path)
+    if schema is None:
+        with open(schema_path, "rb") as xsd_file:
+            xsd_doc = lxml.etree.parse(
+                xsd_file, parser=lxml.etree.XMLParser(), base_url=str(schema_path)
+            )
+        schema = _SCHEMA_CACHE[schema_path] = lxml.etree.XMLSchema(xsd_doc)
+    return schema
+
 
 class BaseSchemaValidator:
 
@@ -96,7 +113,7 @@ class BaseSchemaValidator:
         self.original_file = Path(original_file) if original_file else None
         self.verbose = verbose
 
-        self.schemas_dir = Path(__file__).parent.parent / "schemas"
+        self.schemas_dir = SCHEMAS_DIR
 
         patterns = ["*.xml", "*.rels"]
         self.xml_files = [
@@ -753,12 +770,7 @@ class BaseSchemaValidator:
             return None, None  
 
         try:
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            schema = load_schema(schema_path)
 
             with open(xml_file, "r") as f:
                 xml_doc = lxml.etree.parse(f)
@@ -2,7 +2,6 @@
 Validator for Word document XML files against XSD schemas.
 """
 
-import random
 import re
 import tempfile
 import zipfile
@@ -10,6 +9,8 @@ import zipfile
 import defusedxml.minidom
 import lxml.etree
 
+from helpers.ids import IdAllocator
+
 from .base import BaseSchemaValidator
 
 
@@ -390,6 +391,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
     def repair_durableId(self) -> int:
         repairs = 0
+        ids = None
 
         for xml_file in self.xml_files:
             try:
@@ -420,11 +422,9 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                             needs_repair = True
 
                     if needs_repair:
-                        value = random.randint(1, 0x7FFFFFFE)
-                        if xml_file.name == "numbering.xml":
-                            new_id = str(value)  
-                        else:
-                            new_id = f"{value:08X}"  
+                        if ids is None:
+                            ids = IdAllocator.scan(self.unpacked_dir)
+                        new_id = ids.durable_id(numbering=xml_file.name == "numbering.xml")
 
                         elem.setAttribute("w16cid:durableId", new_id)
                         print(
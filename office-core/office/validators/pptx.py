@@ -0,0 +1,276 @@
+"""
+Validator for PowerPoint presentation XML files against XSD schemas.
+"""
+
+import re
+from pathlib import PurePosixPath
+
+import lxml.etree
+
+from .base import BaseSchemaValidator
+
+# Matches only IDs that look like a UUID (32 letters/digits once braces,
+# parentheses and hyphens are set aside) but are not a well-formed hex UUID.
+_INVALID_UUID_RE = re.compile(
+    r"(?![\{\(]?[0-9A-Fa-f]{8}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{12}[\}\)]?\Z)"
+    r"[{}()]*(?:-*[^\W_]){32}-*[{}()]*\Z"
+)
+
+
+class PPTXSchemaValidator(BaseSchemaValidator):
+
+    PRESENTATIONML_NAMESPACE = (
+        "http://schemas.openxmlformats.org/presentationml/2006/main"
+    )
+
+    ELEMENT_RELATIONSHIP_TYPES = {
+        "sldid": "slide",
+        "sldmasterid": "slidemaster",
+        "notesmasterid": "notesmaster",
+        "sldlayoutid": "slidelayout",
+        "themeid": "theme",
+        "tablestyleid": "tablestyles",
+    }
+
+    def validate(self):
+        if not self.validate_xml():
+            return False
+
+        all_valid = True
+        if not self.validate_namespaces():
+            all_valid = False
+
+        if not self.validate_unique_ids():
+            all_valid = False
+
+        if not self.validate_uuid_ids():
+            all_valid = False
+
+        if not self.validate_file_references():
+            all_valid = False
+
+        if not self.validate_slide_layout_ids():
+            all_valid = False
+
+        if not self.validate_content_types():
+            all_valid = False
+
+        if not self.validate_against_xsd():
+            all_valid = False
+
+        if not self.validate_notes_slide_references():
+            all_valid = False
+
+        if not self.validate_all_relationship_ids():
+            all_valid = False
+
+        if not self.validate_no_duplicate_slide_layouts():
+            all_valid = False
+
+        return all_valid
+
+    @property
+    def package(self):
+        """The parsed-package model shared by the PPTX-specific checks."""
+        if getattr(self, "_package", None) is None:
+            self._package = _PackageScan(self.unpacked_dir, self.xml_files)
+        return self._package
+
+    def validate_uuid_ids(self):
+        package = self.package
+        errors = [f"  {path}: Error: {e}" for path, e in package.parse_errors.items()]
+        for path, line, value in package.invalid_uuids:
+            errors.append(
+                f"  {path}: Line {line}: ID '{value}' appears to be a UUID but contains invalid hex characters"
+            )
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} UUID ID validation errors:")
+            for error in errors:
+                print(error)
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All UUID-like IDs contain valid hex values")
+            return True
+
+    def validate_slide_layout_ids(self):
+        package = self.package
+        errors = []
+
+        if not package.slide_masters:
+            if self.verbose:
+                print("PASSED - No slide masters found")
+            return True
+
+        for master, layout_ids in package.slide_masters.items():
+            if master in package.parse_errors:
+                errors.append(f"  {master}: Error: {package.parse_errors[master]}")
+                continue
+
+            rels_path = package.rels_path(master)
+            if rels_path in package.parse_errors:
+                errors.append(f"  {rels_path}: Error: {package.parse_errors[rels_path]}")
+                continue
+            relationships = package.relationships.get(rels_path)
+            if relationships is None:
+                errors.append(f"  {master}: Missing relationships file: {rels_path}")
+                continue
+
+            valid_layout_rids = {
+                rid for rid, rel_type, _ in relationships if "slideLayout" in rel_type
+            }
+            for line, layout_id, r_id in layout_ids:
+                if r_id and r_id not in valid_layout_rids:
+                    errors.append(
+                        f"  {master}: "
+                        f"Line {line}: sldLayoutId with id='{layout_id}' "
+                        f"references r:id='{r_id}' which is not found in slide layout relationships"
+                    )
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} slide layout ID validation errors:")
+            for error in errors:
+                print(error)
+            print(
+                "Remove invalid references or add missing slide layouts to the relationships file."
+            )
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All slide layout IDs reference valid slide layouts")
+            return True
+
+    def validate_no_duplicate_slide_layouts(self):
+        package = self.package
+        errors = []
+
+        for rels_path in package.slide_rels:
+            if rels_path in package.parse_errors:
+                errors.append(f"  {rels_path}: Error: {package.parse_errors[rels_path]}")
+                continue
+            layout_rels = [
+                rel for rel in package.relationships[rels_path] if "slideLayout" in rel[1]
+            ]
+            if len(layout_rels) > 1:
+                errors.append(
+                    f"  {rels_path}: has {len(layout_rels)} slideLayout references"
+                )
+
+        if errors:
+            print("FAILED - Found slides with duplicate slideLayout references:")
+            for error in errors:
+                print(error)
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All slides have exactly one slideLayout reference")
+            return True
+
+    def validate_notes_slide_references(self):
+        package = self.package
+        errors = []
+        notes_slide_references = {}
+
+        if not package.slide_rels:
+            if self.verbose:
+                print("PASSED - No slide relationship files found")
+            return True
+
+        for rels_path in package.slide_rels:
+            if rels_path in package.parse_errors:
+                errors.append(f"  {rels_path}: Error: {package.parse_errors[rels_path]}")
+                continue
+            slide_name = PurePosixPath(rels_path).name[: -len(".xml.rels")]
+            for _, rel_type, target in package.relationships[rels_path]:
+                if "notesSlide" in rel_type and target:
+                    notes_slide_references.setdefault(target.replace("../", ""), []).append(
+                        (slide_name, rels_path)
+                    )
+
+        for target, references in notes_slide_references.items():
+            if len(references) > 1:
+                slide_names = [ref[0] for ref in references]
+                errors.append(
+                    f"  Notes slide '{target}' is referenced by multiple slides: {', '.join(slide_names)}"
+                )
+                for slide_name, rels_path in references:
+                    errors.append(f"    - {rels_path}")
+
+        if errors:
+            print(
+                f"FAILED - Found {len([e for e in errors if not e.startswith('    ')])} notes slide reference validation errors:"
+            )
+            for error in errors:
+                print(error)
+            print("Each slide may optionally have its own slide file.")
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All notes slide references are unique")
+            return True
+
+
+class _PackageScan:
+    """One parse of every part, collecting what the PPTX checks need.
+
+    Paths are POSIX strings relative to the unpacked directory.
+    """
+
+    def __init__(self, unpacked_dir, xml_files):
+        self.parse_errors = {}
+        self.invalid_uuids = []
+        self.relationships = {}
+        self.slide_masters = {}
+        self.slide_rels = []
+
+        id_attributes = {}
+        rel_tag = f"{{{BaseSchemaValidator.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
+        layout_id_tag = f"{{{PPTXSchemaValidator.PRESENTATIONML_NAMESPACE}}}sldLayoutId"
+        r_id = f"{{{BaseSchemaValidator.OFFICE_RELATIONSHIPS_NAMESPACE}}}id"
+
+        for xml_file in xml_files:
+            path = xml_file.relative_to(unpacked_dir).as_posix()
+            is_master = _in_dir(path, "ppt/slideMasters") and path.endswith(".xml")
+            is_slide_rels = _in_dir(path, "ppt/slides/_rels") and path.endswith(".xml.rels")
+            if is_master:
+                self.slide_masters[path] = []
+            if is_slide_rels:
+                self.slide_rels.append(path)
+
+            try:
+                root = lxml.etree.parse(str(xml_file)).getroot()
+            except Exception as e:
+                self.parse_errors[path] = e
+                continue
+
+            if path.endswith(".rels"):
+                self.relationships[path] = [
+                    (rel.get("Id"), rel.get("Type", ""), rel.get("Target", ""))
+                    for rel in root.iter(rel_tag)
+                ]
+
+            for elem in root.iter(lxml.etree.Element):
+                for attr, value in elem.attrib.items():
+                    is_id = id_attributes.get(attr)
+                    if is_id is None:
+                        is_id = id_attributes[attr] = attr.rpartition("}")[2].lower().endswith("id")
+                    if is_id and len(value) >= 32 and _INVALID_UUID_RE.match(value):
+                        self.invalid_uuids.append((path, elem.sourceline, value))
+                if is_master and elem.tag == layout_id_tag:
+                    self.slide_masters[path].append(
+                        (elem.sourceline, elem.get("id"), elem.get(r_id))
+                    )
+
+    @staticmethod
+    def rels_path(part):
+        directory, _, name = part.rpartition("/")
+        return f"{directory}/_rels/{name}.rels"
+
+
+def _in_dir(path, directory):
+    return path.rpartition("/")[0] == directory
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -16,13 +16,41 @@ Examples:
 To see available layouts: ls unpacked/ppt/slideLayouts/
 
 Prints the <p:sldId> element to add to presentation.xml.
+
+Bulk mode builds a whole slide order in one run and writes <p:sldIdLst>
+itself:
+
+    python add_slide.py unpacked/ --plan plan.json
+
+    {"slides": ["slide1.xml",
+                {"source": "slide2.xml", "count": 10},
+                {"source": "slideLayout6.xml"},
+                "slide3.xml"]}
+
+Each string keeps an existing slide at that position; each object adds
+"count" new slides (default 1) from a slide or layout. Existing slides not
+listed are dropped from <p:sldIdLst>; run clean.py afterwards.
 """
 
+import json
 import re
 import shutil
 import sys
 from pathlib import Path
 
+from office.helpers.ids import IdAllocator
+
+SLIDE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+SLIDE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+
+_SLD_ID_RE = re.compile(
+    r'<p:sldId\b[^>]*\br:id="(?P<rid>[^"]+)"[^>]*?(?:/>|>.*?</p:sldId>)', re.DOTALL
+)
+_SLD_ID_LST_RE = re.compile(r"<p:sldIdLst>.*?</p:sldIdLst>|<p:sldIdLst/>", re.DOTALL)
+_MASTER_ID_LST_RE = re.compile(
+    r"<p:(sldMaster|notesMaster|handoutMaster)IdLst>.*?</p:\1IdLst>", re.DOTALL
+)
+
 
 def get_next_slide_number(slides_dir: Path) -> int:
     existing = [int(m.group(1)) for f in slides_dir.glob("slide*.xml")
@@ -32,7 +60,6 @@ def get_next_slide_number(slides_dir: Path) -> int:
 
 def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
     slides_dir = unpacked_dir / "ppt" / "slides"
-    rels_dir = slides_dir / "_rels"
     layouts_dir = unpacked_dir / "ppt" / "slideLayouts"
 
     layout_path = layouts_dir / layout_file
@@ -42,6 +69,45 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
 
     next_num = get_next_slide_number(slides_dir)
     dest = f"slide{next_num}.xml"
+
+    _write_slide_from_layout(slides_dir, dest, layout_file)
+
+    _add_to_content_types(unpacked_dir, dest)
+
+    rid = _add_to_presentation_rels(unpacked_dir, dest)
+
+    next_slide_id = _get_next_slide_id(unpacked_dir)
+
+    print(f"Created {dest} from {layout_file}")
+    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
+
+
+def duplicate_slide(unpacked_dir: Path, source: str) -> None:
+    slides_dir = unpacked_dir / "ppt" / "slides"
+
+    source_slide = slides_dir / source
+
+    if not source_slide.exists():
+        print(f"Error: {source_slide} not found", file=sys.stderr)
+        sys.exit(1)
+
+    next_num = get_next_slide_number(slides_dir)
+    dest = f"slide{next_num}.xml"
+
+    _copy_slide(slides_dir, source, dest)
+
+    _add_to_content_types(unpacked_dir, dest)
+
+    rid = _add_to_presentation_rels(unpacked_dir, dest)
+
+    next_slide_id = _get_next_slide_id(unpacked_dir)
+
+    print(f"Created {dest} from {source}")
+    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
+
+
+def _write_slide_from_layout(slides_dir: Path, dest: str, layout_file: str) -> None:
+    rels_dir = slides_dir / "_rels"
     dest_slide = slides_dir / dest
     dest_rels = rels_dir / f"{dest}.rels"
 
@@ -77,34 +143,13 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
 </Relationships>'''
     dest_rels.write_text(rels_xml, encoding="utf-8")
 
-    _add_to_content_types(unpacked_dir, dest)
 
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
-
-    next_slide_id = _get_next_slide_id(unpacked_dir)
-
-    print(f"Created {dest} from {layout_file}")
-    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
-
-
-def duplicate_slide(unpacked_dir: Path, source: str) -> None:
-    slides_dir = unpacked_dir / "ppt" / "slides"
+def _copy_slide(slides_dir: Path, source: str, dest: str) -> None:
     rels_dir = slides_dir / "_rels"
-
-    source_slide = slides_dir / source
-
-    if not source_slide.exists():
-        print(f"Error: {source_slide} not found", file=sys.stderr)
-        sys.exit(1)
-
-    next_num = get_next_slide_number(slides_dir)
-    dest = f"slide{next_num}.xml"
-    dest_slide = slides_dir / dest
-
     source_rels = rels_dir / f"{source}.rels"
     dest_rels = rels_dir / f"{dest}.rels"
 
-    shutil.copy2(source_slide, dest_slide)
+    shutil.copy2(slides_dir / source, slides_dir / dest)
 
     if source_rels.exists():
         shutil.copy2(source_rels, dest_rels)
@@ -117,21 +162,159 @@ def duplicate_slide(unpacked_dir: Path, source: str) -> None:
         )
         dest_rels.write_text(rels_content, encoding="utf-8")
 
-    _add_to_content_types(unpacked_dir, dest)
 
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
-
-    next_slide_id = _get_next_slide_id(unpacked_dir)
-
-    print(f"Created {dest} from {source}")
-    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
+class SlideBatch:
+    """Add and reorder many slides with one read and one write of the package.
+
+    Slide numbers, relationship IDs and slide IDs are allocated in memory;
+    [Content_Types].xml, presentation.xml.rels and the <p:sldIdLst> in
+    presentation.xml are written once by save(). New slides are appended to
+    the slide order unless reorder() is called.
+
+        batch = SlideBatch(Path("unpacked"))
+        for _ in range(10):
+            batch.duplicate("slide2.xml")
+        batch.add_from_layout("slideLayout6.xml")
+        batch.save()
+    """
+
+    def __init__(self, unpacked_dir: Path):
+        self.unpacked_dir = unpacked_dir
+        self.slides_dir = unpacked_dir / "ppt" / "slides"
+        self.layouts_dir = unpacked_dir / "ppt" / "slideLayouts"
+        self.content_types_path = unpacked_dir / "[Content_Types].xml"
+        self.pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
+        self.pres_path = unpacked_dir / "ppt" / "presentation.xml"
+
+        self._pres_rels = self.pres_rels_path.read_text(encoding="utf-8")
+        self._pres = self.pres_path.read_text(encoding="utf-8")
+
+        self._slide_rids = {
+            target.replace("slides/", "", 1): rid
+            for rid, target in _slide_relationships(self._pres_rels)
+        }
+        self._entries = {
+            m.group("rid"): m.group(0) for m in _SLD_ID_RE.finditer(self._pres)
+        }
+        self._order = list(self._entries)
+        self._new = []
+
+        self._next_number = get_next_slide_number(self.slides_dir)
+        rids = [int(m) for m in re.findall(r'Id="rId(\d+)"', self._pres_rels)]
+        self._next_rid = max(rids) + 1 if rids else 1
+        self._ids = IdAllocator.scan(unpacked_dir, "ppt/presentation.xml")
+
+    def duplicate(self, source: str) -> str:
+        if not (self.slides_dir / source).exists():
+            raise FileNotFoundError(f"{self.slides_dir / source} not found")
+        dest = self._allocate()
+        _copy_slide(self.slides_dir, source, dest)
+        return dest
+
+    def add_from_layout(self, layout_file: str) -> str:
+        if not (self.layouts_dir / layout_file).exists():
+            raise FileNotFoundError(f"{self.layouts_dir / layout_file} not found")
+        dest = self._allocate()
+        _write_slide_from_layout(self.slides_dir, dest, layout_file)
+        return dest
+
+    def add(self, source: str) -> str:
+        """Duplicate a slide or create one from a layout, as the CLI does."""
+        source_type, layout_file = parse_source(source)
+        if source_type == "layout" and layout_file is not None:
+            return self.add_from_layout(layout_file)
+        return self.duplicate(source)
+
+    def reorder(self, slides: list[str]) -> None:
+        """Set the slide order. Slides left out are removed from <p:sldIdLst>."""
+        order = []
+        for name in slides:
+            rid = self._slide_rids.get(name)
+            if rid is None:
+                raise ValueError(f"{name} is not a slide in presentation.xml.rels")
+            if rid in order:
+                raise ValueError(f"{name} is listed more than once")
+            if rid not in self._entries:
+                self._entries[rid] = self._sld_id(rid)
+            order.append(rid)
+        self._order = order
+
+    def save(self) -> None:
+        if self._new:
+            overrides = "".join(
+                f'  <Override PartName="/ppt/slides/{dest}" ContentType="{SLIDE_CONTENT_TYPE}"/>\n'
+                for dest in self._new
+            )
+            content_types = self.content_types_path.read_text(encoding="utf-8")
+            content_types = content_types.replace("</Types>", f"{overrides}</Types>")
+            self.content_types_path.write_text(content_types, encoding="utf-8")
+
+            rels = "".join(
+                f'  <Relationship Id="{self._slide_rids[dest]}" Type="{SLIDE_REL_TYPE}" Target="slides/{dest}"/>\n'
+                for dest in self._new
+            )
+            self._pres_rels = self._pres_rels.replace(
+                "</Relationships>", f"{rels}</Relationships>"
+            )
+            self.pres_rels_path.write_text(self._pres_rels, encoding="utf-8")
+            self._new = []
+
+        entries = "".join(self._entries[rid] for rid in self._order)
+        sld_id_lst = f"<p:sldIdLst>{entries}</p:sldIdLst>"
+        if _SLD_ID_LST_RE.search(self._pres):
+            pres = _SLD_ID_LST_RE.sub(lambda _: sld_id_lst, self._pres, count=1)
+        else:
+            # <p:sldIdLst> follows the master ID lists in CT_Presentation
+            anchor = list(_MASTER_ID_LST_RE.finditer(self._pres))[-1].end()
+            pres = self._pres[:anchor] + sld_id_lst + self._pres[anchor:]
+        if pres != self._pres:
+            self._pres = pres
+            self.pres_path.write_text(pres, encoding="utf-8")
+
+    def _allocate(self) -> str:
+        dest = f"slide{self._next_number}.xml"
+        self._next_number += 1
+        rid = f"rId{self._next_rid}"
+        self._next_rid += 1
+
+        self._slide_rids[dest] = rid
+        self._entries[rid] = self._sld_id(rid)
+        self._order.append(rid)
+        self._new.append(dest)
+        return dest
+
+    def _sld_id(self, rid: str) -> str:
+        slide_id = self._ids.next_id("sldId")
+        return f'<p:sldId id="{slide_id}" r:id="{rid}"/>'
+
+
+def apply_plan(unpacked_dir: Path, plan: dict) -> list[str]:
+    """Build the slide order described by a plan in one pass.
+
+    The plan's "slides" list is the final deck order. Each entry is either
+    an existing slide filename to keep, or {"source": "slide2.xml"} /
+    {"source": "slideLayout2.xml"} to add a new slide, with an optional
+    "count". Existing slides not listed are dropped from <p:sldIdLst>
+    (run clean.py afterwards to delete their files).
+    """
+    batch = SlideBatch(unpacked_dir)
+    order = []
+    for entry in plan.get("slides", []):
+        if isinstance(entry, str):
+            order.append(entry)
+            continue
+        for _ in range(entry.get("count", 1)):
+            order.append(batch.add(entry["source"]))
+    batch.reorder(order)
+    batch.save()
+    return order
 
 
 def _add_to_content_types(unpacked_dir: Path, dest: str) -> None:
     content_types_path = unpacked_dir / "[Content_Types].xml"
     content_types = content_types_path.read_text(encoding="utf-8")
 
-    new_override = f'<Override PartName="/ppt/slides/{dest}" ContentType="application/vnd.openxmlformats-officedocument.presentationml.slide+xml"/>'
+    new_override = f'<Override PartName="/ppt/slides/{dest}" ContentType="{SLIDE_CONTENT_TYPE}"/>'
 
     if f"/ppt/slides/{dest}" not in content_types:
         content_types = content_types.replace("</Types>", f"  {new_override}\n</Types>")
@@ -146,7 +329,7 @@ def _add_to_presentation_rels(unpacked_dir: Path, dest: str) -> str:
     next_rid = max(rids) + 1 if rids else 1
     rid = f"rId{next_rid}"
 
-    new_rel = f'<Relationship Id="{rid}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide" Target="slides/{dest}"/>'
+    new_rel = f'<Relationship Id="{rid}" Type="{SLIDE_REL_TYPE}" Target="slides/{dest}"/>'
 
     if f"slides/{dest}" not in pres_rels:
         pres_rels = pres_rels.replace("</Relationships>", f"  {new_rel}\n</Relationships>")
@@ -155,11 +338,18 @@ def _add_to_presentation_rels(unpacked_dir: Path, dest: str) -> str:
     return rid
 
 
+def _slide_relationships(pres_rels: str) -> list[tuple[str, str]]:
+    slides = []
+    for rel in re.findall(r"<Relationship\b[^>]*>", pres_rels):
+        rid = re.search(r'Id="([^"]+)"', rel)
+        target = re.search(r'Target="(slides/[^"]+)"', rel)
+        if rid and target:
+            slides.append((rid.group(1), target.group(1)))
+    return slides
+
+
 def _get_next_slide_id(unpacked_dir: Path) -> int:
-    pres_path = unpacked_dir / "ppt" / "presentation.xml"
-    pres_content = pres_path.read_text(encoding="utf-8")
-    slide_ids = [int(m) for m in re.findall(r'<p:sldId[^>]*id="(\d+)"', pres_content)]
-    return max(slide_ids) + 1 if slide_ids else 256
+    return IdAllocator.scan(unpacked_dir, "ppt/presentation.xml").next_id("sldId")
 
 
 def parse_source(source: str) -> tuple[str, str | None]:
@@ -170,8 +360,27 @@ def parse_source(source: str) -> tuple[str, str | None]:
 
 
 if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[2] == "--plan":
+        unpacked_dir = Path(sys.argv[1])
+        if not unpacked_dir.exists():
+            print(f"Error: {unpacked_dir} not found", file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            plan = json.loads(Path(sys.argv[3]).read_text(encoding="utf-8"))
+            order = apply_plan(unpacked_dir, plan)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        print(f"Wrote {len(order)} slides to <p:sldIdLst>:")
+        for name in order:
+            print(f"  {name}")
+        sys.exit(0)
+
     if len(sys.argv) != 3:
         print("Usage: python add_slide.py <unpacked_dir> <source>", file=sys.stderr)
+        print("       python add_slide.py <unpacked_dir> --plan plan.json", file=sys.stderr)
         print("", file=sys.stderr)
         print("Source can be:", file=sys.stderr)
         print("  slide2.xml        - duplicate an existing slide", file=sys.stderr)
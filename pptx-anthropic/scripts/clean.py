@@ -6,6 +6,8 @@ Example:
     python clean.py unpacked/
 
 This script removes:
+- Duplicate media (identical bytes under different names); references are
+  pointed at one copy
 - Orphaned slides (not in sldIdLst) and their relationships
 - [trash] directory (unreferenced files)
 - Orphaned .rels files for deleted resources
@@ -15,205 +17,211 @@ This script removes:
 - Content-Type overrides for deleted files
 """
 
+import hashlib
+import posixpath
+import re
 import sys
 from pathlib import Path
+from urllib.parse import unquote
 
 import defusedxml.minidom
 
-
-import re
-
-
-def get_slides_in_sldidlst(unpacked_dir: Path) -> set[str]:
-    pres_path = unpacked_dir / "ppt" / "presentation.xml"
-    pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
-
-    if not pres_path.exists() or not pres_rels_path.exists():
-        return set()
-
-    rels_dom = defusedxml.minidom.parse(str(pres_rels_path))
-    rid_to_slide = {}
-    for rel in rels_dom.getElementsByTagName("Relationship"):
-        rid = rel.getAttribute("Id")
+SWEPT_DIRS = [
+    "slides",
+    "notesSlides",
+    "media",
+    "embeddings",
+    "charts",
+    "diagrams",
+    "tags",
+    "drawings",
+    "ink",
+    "theme",
+]
+
+PRESENTATION = "ppt/presentation.xml"
+PRESENTATION_RELS = "ppt/_rels/presentation.xml.rels"
+
+
+def read_relationships(unpacked_dir: Path, part: str) -> dict[str, str]:
+    """Return {rId: target part} for one part's .rels, skipping external targets.
+
+    Part names are package-relative POSIX paths; "" is the package itself.
+    """
+    rels_file = unpacked_dir / _rels_name(part)
+    if not rels_file.exists():
+        return {}
+
+    dom = defusedxml.minidom.parse(str(rels_file))
+    edges = {}
+    for rel in dom.getElementsByTagName("Relationship"):
         target = rel.getAttribute("Target")
-        rel_type = rel.getAttribute("Type")
-        if "slide" in rel_type and target.startswith("slides/"):
-            rid_to_slide[rid] = target.replace("slides/", "")
-
-    pres_content = pres_path.read_text(encoding="utf-8")
-    referenced_rids = set(re.findall(r'<p:sldId[^>]*r:id="([^"]+)"', pres_content))
-
-    return {rid_to_slide[rid] for rid in referenced_rids if rid in rid_to_slide}
-
+        if not target or rel.getAttribute("TargetMode") == "External":
+            continue
+        edges[rel.getAttribute("Id")] = _resolve_target(part, target)
+    return edges
 
-def remove_orphaned_slides(unpacked_dir: Path) -> list[str]:
-    slides_dir = unpacked_dir / "ppt" / "slides"
-    slides_rels_dir = slides_dir / "_rels"
-    pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
 
-    if not slides_dir.exists():
-        return []
+def _rels_name(part: str) -> str:
+    directory, filename = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{filename}.rels")
 
-    referenced_slides = get_slides_in_sldidlst(unpacked_dir)
-    removed = []
 
-    for slide_file in slides_dir.glob("slide*.xml"):
-        if slide_file.name not in referenced_slides:
-            rel_path = slide_file.relative_to(unpacked_dir)
-            slide_file.unlink()
-            removed.append(str(rel_path))
+def _source_part(rels_name: str) -> str:
+    rels_dir, filename = posixpath.split(rels_name)
+    return posixpath.join(posixpath.dirname(rels_dir), filename[: -len(".rels")])
 
-            rels_file = slides_rels_dir / f"{slide_file.name}.rels"
-            if rels_file.exists():
-                rels_file.unlink()
-                removed.append(str(rels_file.relative_to(unpacked_dir)))
 
-    if removed and pres_rels_path.exists():
-        rels_dom = defusedxml.minidom.parse(str(pres_rels_path))
-        changed = False
+def _resolve_target(source: str, target: str) -> str:
+    target = unquote(target)
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source), target))
 
-        for rel in list(rels_dom.getElementsByTagName("Relationship")):
-            target = rel.getAttribute("Target")
-            if target.startswith("slides/"):
-                slide_name = target.replace("slides/", "")
-                if slide_name not in referenced_slides:
-                    if rel.parentNode:
-                        rel.parentNode.removeChild(rel)
-                        changed = True
-
-        if changed:
-            with open(pres_rels_path, "wb") as f:
-                f.write(rels_dom.toxml(encoding="utf-8"))
-
-    return removed
 
+def get_slide_rids_in_sldidlst(unpacked_dir: Path) -> set[str]:
+    pres_path = unpacked_dir / PRESENTATION
+    if not pres_path.exists():
+        return set()
+    pres_content = pres_path.read_text(encoding="utf-8")
+    return set(re.findall(r'<p:sldId[^>]*r:id="([^"]+)"', pres_content))
+
+
+def prune_orphaned_slide_rels(unpacked_dir: Path, edges: dict[str, str]) -> None:
+    """Drop presentation.xml relationships to slides missing from sldIdLst.
+
+    Both the parsed edges and presentation.xml.rels are updated, so those
+    slides are never marked.
+    """
+    listed = get_slide_rids_in_sldidlst(unpacked_dir)
+    orphaned = {
+        rid
+        for rid, target in edges.items()
+        if target.startswith("ppt/slides/") and rid not in listed
+    }
+    if not orphaned:
+        return
 
-def remove_trash_directory(unpacked_dir: Path) -> list[str]:
-    trash_dir = unpacked_dir / "[trash]"
+    for rid in orphaned:
+        del edges[rid]
+
+    rels_path = unpacked_dir / PRESENTATION_RELS
+    rels_dom = defusedxml.minidom.parse(str(rels_path))
+    for rel in list(rels_dom.getElementsByTagName("Relationship")):
+        if rel.getAttribute("Id") in orphaned and rel.parentNode:
+            rel.parentNode.removeChild(rel)
+    with open(rels_path, "wb") as f:
+        f.write(rels_dom.toxml(encoding="utf-8"))
+
+
+def mark_reachable(unpacked_dir: Path) -> set[str]:
+    """Walk relationships from the package root, parsing each .rels once."""
+    reachable = {""}
+    stack = [""]
+    while stack:
+        part = stack.pop()
+        edges = read_relationships(unpacked_dir, part)
+        if part == PRESENTATION:
+            prune_orphaned_slide_rels(unpacked_dir, edges)
+        for target in edges.values():
+            if target not in reachable:
+                reachable.add(target)
+                stack.append(target)
+    return reachable
+
+
+def sweep_unreachable(unpacked_dir: Path, reachable: set[str]) -> list[str]:
     removed = []
 
-    if trash_dir.exists() and trash_dir.is_dir():
-        for file_path in trash_dir.iterdir():
-            if file_path.is_file():
-                rel_path = file_path.relative_to(unpacked_dir)
-                removed.append(str(rel_path))
-                file_path.unlink()
-        trash_dir.rmdir()
-
-    return removed
-
-
-def get_slide_referenced_files(unpacked_dir: Path) -> set:
-    referenced = set()
-    slides_rels_dir = unpacked_dir / "ppt" / "slides" / "_rels"
-
-    if not slides_rels_dir.exists():
-        return referenced
+    for dir_name in SWEPT_DIRS:
+        dir_path = unpacked_dir / "ppt" / dir_name
+        if not dir_path.exists():
+            continue
 
-    for rels_file in slides_rels_dir.glob("*.rels"):
-        dom = defusedxml.minidom.parse(str(rels_file))
-        for rel in dom.getElementsByTagName("Relationship"):
-            target = rel.getAttribute("Target")
-            if not target:
+        for file_path in dir_path.iterdir():
+            if not file_path.is_file():
                 continue
-            target_path = (rels_file.parent.parent / target).resolve()
-            try:
-                referenced.add(target_path.relative_to(unpacked_dir.resolve()))
-            except ValueError:
-                pass
-
-    return referenced
-
-
-def remove_orphaned_rels_files(unpacked_dir: Path) -> list[str]:
-    resource_dirs = ["charts", "diagrams", "drawings"]
-    removed = []
-    slide_referenced = get_slide_referenced_files(unpacked_dir)
+            part = file_path.relative_to(unpacked_dir).as_posix()
+            if part not in reachable:
+                file_path.unlink()
+                removed.append(part)
 
-    for dir_name in resource_dirs:
-        rels_dir = unpacked_dir / "ppt" / dir_name / "_rels"
+        rels_dir = dir_path / "_rels"
         if not rels_dir.exists():
             continue
-
         for rels_file in rels_dir.glob("*.rels"):
-            resource_file = rels_dir.parent / rels_file.name.replace(".rels", "")
-            try:
-                resource_rel_path = resource_file.resolve().relative_to(unpacked_dir.resolve())
-            except ValueError:
-                continue
-
-            if not resource_file.exists() or resource_rel_path not in slide_referenced:
+            source = dir_path / rels_file.name[: -len(".rels")]
+            if source.relative_to(unpacked_dir).as_posix() not in reachable:
                 rels_file.unlink()
-                rel_path = rels_file.relative_to(unpacked_dir)
-                removed.append(str(rel_path))
+                removed.append(rels_file.relative_to(unpacked_dir).as_posix())
 
     return removed
 
 
-def get_referenced_files(unpacked_dir: Path) -> set:
-    referenced = set()
+def dedupe_media(unpacked_dir: Path) -> dict[str, str]:
+    """Point every reference to a duplicate media file at one canonical copy.
+
+    Files in ppt/media are grouped by content hash and the first name of
+    each group is kept. Returns {duplicate part: canonical part}; the
+    duplicates are left on disk and removed by the sweep once unreferenced.
+    """
+    media_dir = unpacked_dir / "ppt" / "media"
+    if not media_dir.exists():
+        return {}
+
+    canonical = {}
+    duplicates = {}
+    for file_path in sorted(media_dir.iterdir(), key=_natural_key):
+        if not file_path.is_file():
+            continue
+        digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        part = file_path.relative_to(unpacked_dir).as_posix()
+        if digest in canonical:
+            duplicates[part] = canonical[digest]
+        else:
+            canonical[digest] = part
+
+    if not duplicates:
+        return {}
 
     for rels_file in unpacked_dir.rglob("*.rels"):
+        if b"media/" not in rels_file.read_bytes():
+            continue
+        source = _source_part(rels_file.relative_to(unpacked_dir).as_posix())
         dom = defusedxml.minidom.parse(str(rels_file))
+        changed = False
         for rel in dom.getElementsByTagName("Relationship"):
-            target = rel.getAttribute("Target")
-            if not target:
+            if rel.getAttribute("TargetMode") == "External":
                 continue
-            target_path = (rels_file.parent.parent / target).resolve()
-            try:
-                referenced.add(target_path.relative_to(unpacked_dir.resolve()))
-            except ValueError:
-                pass
+            target = _resolve_target(source, rel.getAttribute("Target"))
+            if target in duplicates:
+                rel.setAttribute(
+                    "Target",
+                    posixpath.relpath(duplicates[target], posixpath.dirname(source) or "."),
+                )
+                changed = True
+        if changed:
+            with open(rels_file, "wb") as f:
+                f.write(dom.toxml(encoding="utf-8"))
 
-    return referenced
+    return duplicates
 
 
-def remove_orphaned_files(unpacked_dir: Path, referenced: set) -> list[str]:
-    resource_dirs = ["media", "embeddings", "charts", "diagrams", "tags", "drawings", "ink"]
-    removed = []
+def _natural_key(path: Path) -> list:
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", path.name)]
 
-    for dir_name in resource_dirs:
-        dir_path = unpacked_dir / "ppt" / dir_name
-        if not dir_path.exists():
-            continue
 
-        for file_path in dir_path.glob("*"):
-            if not file_path.is_file():
-                continue
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
+def remove_trash_directory(unpacked_dir: Path) -> list[str]:
+    trash_dir = unpacked_dir / "[trash]"
+    removed = []
 
-    theme_dir = unpacked_dir / "ppt" / "theme"
-    if theme_dir.exists():
-        for file_path in theme_dir.glob("theme*.xml"):
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
+    if trash_dir.exists() and trash_dir.is_dir():
+        for file_path in trash_dir.iterdir():
+            if file_path.is_file():
+                rel_path = file_path.relative_to(unpacked_dir)
                 removed.append(str(rel_path))
-                theme_rels = theme_dir / "_rels" / f"{file_path.name}.rels"
-                if theme_rels.exists():
-                    theme_rels.unlink()
-                    removed.append(str(theme_rels.relative_to(unpacked_dir)))
-
-    notes_dir = unpacked_dir / "ppt" / "notesSlides"
-    if notes_dir.exists():
-        for file_path in notes_dir.glob("*.xml"):
-            if not file_path.is_file():
-                continue
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
                 file_path.unlink()
-                removed.append(str(rel_path))
-
-        notes_rels_dir = notes_dir / "_rels"
-        if notes_rels_dir.exists():
-            for file_path in notes_rels_dir.glob("*.rels"):
-                notes_file = notes_dir / file_path.name.replace(".rels", "")
-                if not notes_file.exists():
-                    file_path.unlink()
-                    removed.append(str(file_path.relative_to(unpacked_dir)))
+        trash_dir.rmdir()
 
     return removed
 
@@ -223,6 +231,7 @@ def update_content_types(unpacked_dir: Path, removed_files: list[str]) -> None:
     if not ct_path.exists():
         return
 
+    removed_files = set(removed_files)
     dom = defusedxml.minidom.parse(str(ct_path))
     changed = False
 
@@ -239,24 +248,20 @@ def update_content_types(unpacked_dir: Path, removed_files: list[str]) -> None:
 
 
 def clean_unused_files(unpacked_dir: Path) -> list[str]:
-    all_removed = []
-
-    slides_removed = remove_orphaned_slides(unpacked_dir)
-    all_removed.extend(slides_removed)
-
-    trash_removed = remove_trash_directory(unpacked_dir)
-    all_removed.extend(trash_removed)
-
-    while True:
-        removed_rels = remove_orphaned_rels_files(unpacked_dir)
-        referenced = get_referenced_files(unpacked_dir)
-        removed_files = remove_orphaned_files(unpacked_dir, referenced)
-
-        total_removed = removed_rels + removed_files
-        if not total_removed:
-            break
-
-        all_removed.extend(total_removed)
+    """Mark every part reachable from the package root and sweep the rest.
+
+    Only reachable parts have their .rels parsed, each exactly once. Slides
+    are reachable only through presentation.xml's sldIdLst, so dropping a
+    <p:sldId> also releases its notes, charts, media and so on in the same
+    pass, and [Content_Types].xml is rewritten once at the end. Identical
+    media files are collapsed onto one copy first, so the duplicates are
+    swept too.
+    """
+    all_removed = remove_trash_directory(unpacked_dir)
+
+    dedupe_media(unpacked_dir)
+    reachable = mark_reachable(unpacked_dir)
+    all_removed.extend(sweep_unreachable(unpacked_dir, reachable))
 
     if all_removed:
         update_content_types(unpacked_dir, all_removed)
@@ -2,6 +2,12 @@
 """
 AI 使用形態演進 - 多樣化版面 FYP PPT (簡化版)
 使用 8 種版面設計
+
+--fast 模式：每種版面（及其列表長度）只用 python-pptx 逐個 shape 構建一次原型，
+之後的幻燈片直接複製原型的 spTree 並原地替換文字。
+
+    python create_varied_v2.py [--fast] [-o output.pptx]
+    python create_varied_v2.py --benchmark 500
 """
 
 from pptx import Presentation
@@ -9,7 +15,12 @@ from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml.ns import qn
+import argparse
+import copy
 import os
+import re
+import time
 
 FONT = "Microsoft JhengHei"
 
@@ -317,104 +328,186 @@ def add_icon_list_slide(slide, title, items):
         p.text = desc
         set_font(p.runs[0], 18, False, (100,100,100))
 
-# 主函數
-def create_ppt():
-    print("🚀 創建多樣化版面 FYP PPT...")
-    
-    prs = Presentation()
-    prs.slide_width = Inches(13.333)
-    prs.slide_height = Inches(7.5)
-    
+class PrototypeCache:
+    """版面原型快取：同一版面 + 同樣的列表長度只構建一次
+
+    構建原型時把每個文字參數換成佔位符 ⟦n⟧，記下含佔位符的 <a:t>；
+    實例化時複製原型 spTree，只改這些 <a:t> 的文字。
+    參數含換行等控制字元時直接執行 builder。
+    """
+
+    TOKEN = re.compile(r"⟦(\d+)⟧")
+    # python-pptx 會把換行等控制字元轉成 <a:br/> 或分段，不能只替換 <a:t>
+    CONTROL = re.compile(r"[\x00-\x1f\x7f]")
+
+    def __init__(self):
+        self._scratch = Presentation()
+        self._prototypes = {}
+
+    def add(self, prs, builder, *args):
+        """等同於 builder(新幻燈片, *args)，但只在第一次真正執行 builder"""
+        values = []
+        token_args = _tokenize(args, values)
+        if any(self.CONTROL.search(value) for value in values):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            builder(slide, *args)
+            return slide
+        key = (builder, _shape_of(args))
+        if key not in self._prototypes:
+            self._prototypes[key] = self._build(builder, token_args)
+        sp_tree, slots = self._prototypes[key]
+
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        target = slide.shapes._spTree
+        for child in list(target):
+            target.remove(child)
+        for child in copy.deepcopy(sp_tree):
+            target.append(child)
+
+        texts = list(target.iter(qn("a:t")))
+        for index, template in slots:
+            texts[index].text = self.TOKEN.sub(lambda m: values[int(m.group(1))], template)
+        return slide
+
+    def _build(self, builder, token_args):
+        slide = self._scratch.slides.add_slide(self._scratch.slide_layouts[6])
+        builder(slide, *token_args)
+        if len(slide.part.rels) > 1:
+            raise ValueError(f"{builder.__name__} 的原型引用了圖片等外部 part，無法直接複製")
+        sp_tree = slide.shapes._spTree
+        slots = [
+            (index, t.text)
+            for index, t in enumerate(sp_tree.iter(qn("a:t")))
+            if t.text and self.TOKEN.search(t.text)
+        ]
+        return sp_tree, slots
+
+
+def _tokenize(value, values):
+    """把參數中的每個字串換成 ⟦n⟧，原文依序存入 values"""
+    if isinstance(value, str):
+        values.append(value)
+        return f"⟦{len(values) - 1}⟧"
+    return type(value)(_tokenize(item, values) for item in value)
+
+
+def _shape_of(value):
+    """參數結構（列表長度），決定能否共用同一原型"""
+    if isinstance(value, str):
+        return None
+    return tuple(_shape_of(item) for item in value)
+
+
+# 全部頁面：(版面函數, 內容參數)
+DECK = [
     # 頁1: 標題 (版面1)
-    add_title_slide(prs.slides.add_slide(prs.slide_layouts[6]), 
-        "AI 使用形態的演進", "從 GPT 到 Agent、MCP 與 Skills")
-    
+    (add_title_slide, ("AI 使用形態的演進", "從 GPT 到 Agent、MCP 與 Skills")),
     # 頁2: 目錄 (版面8)
-    add_icon_list_slide(prs.slides.add_slide(prs.slide_layouts[6]), "目錄", [
+    (add_icon_list_slide, ("目錄", [
         ("📖", "緒論", "研究背景與動機"),
         ("🤖", "GPT 時代", "GPT-3/4 與 ChatGPT"),
         ("🔧", "Agent 革命", "ReAct 與多 Agent 系統"),
         ("⚡", "MCP 與 Skills", "協議與模組化能力"),
         ("🚀", "未來展望", "技術演進與產業影響")
-    ])
-    
+    ])),
     # 頁3: 研究背景 (版面2)
-    add_two_column_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "🔬", "研究背景", [
-            "AI 技術從簡單聊天機器人快速演進到複雜智能代理系統",
-            "傳統 GPT 模型擅長文字生成，但缺乏實際行動能力",
-            "AI Agent 的出現橋接了理解與執行之間的鴻溝",
-            "MCP 和 Skills 系統提供模組化、可擴展的 AI 能力"
-        ])
-    
+    (add_two_column_slide, ("🔬", "研究背景", [
+        "AI 技術從簡單聊天機器人快速演進到複雜智能代理系統",
+        "傳統 GPT 模型擅長文字生成，但缺乏實際行動能力",
+        "AI Agent 的出現橋接了理解與執行之間的鴻溝",
+        "MCP 和 Skills 系統提供模組化、可擴展的 AI 能力"
+    ])),
     # 頁4: GPT-3 (版面6)
-    add_sidebar_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "GPT-3 時代", "2020 年的突破", [
-            "1,750 億參數 — 當時前所未有的規模",
-            "少樣本學習能力浮現，展現強大泛化能力",
-            "文字生成品質接近人類水平，開啟新紀元",
-            "局限性：上下文窗口有限、產生幻覺"
-        ])
-    
+    (add_sidebar_slide, ("GPT-3 時代", "2020 年的突破", [
+        "1,750 億參數 — 當時前所未有的規模",
+        "少樣本學習能力浮現，展現強大泛化能力",
+        "文字生成品質接近人類水平，開啟新紀元",
+        "局限性：上下文窗口有限、產生幻覺"
+    ])),
     # 頁5: GPT-4 (版面4)
-    add_big_circle_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "🧠", "GPT-4 突破 (2023)", [
-            "多模態能力 — 同時理解文字與圖像",
-            "推理能力提升，幻覺問題顯著減少",
-            "上下文窗口擴展（8K → 32K → 128K）",
-            "更好的指令遵循與安全對齊"
-        ])
-    
+    (add_big_circle_slide, ("🧠", "GPT-4 突破 (2023)", [
+        "多模態能力 — 同時理解文字與圖像",
+        "推理能力提升，幻覺問題顯著減少",
+        "上下文窗口擴展（8K → 32K → 128K）",
+        "更好的指令遵循與安全對齊"
+    ])),
     # 頁6: GPT 局限 (版面3)
-    add_three_cards_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "GPT 模型的局限性", [
-            ("無法執行", "只能生成文字，無法執行實際行動"),
-            ("無持久記憶", "跨對話無記憶，每次從頭開始"),
-            ("推理受限", "複雜任務的推理能力有限")
-        ])
-    
+    (add_three_cards_slide, ("GPT 模型的局限性", [
+        ("無法執行", "只能生成文字，無法執行實際行動"),
+        ("無持久記憶", "跨對話無記憶，每次從頭開始"),
+        ("推理受限", "複雜任務的推理能力有限")
+    ])),
     # 頁7: Agent 概念 (版面5)
-    add_grid_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "Agent vs 傳統聊天機器人", [
-            ("💬", "聊天機器人", "單輪、無狀態、文字輸出"),
-            ("🔧", "AI Agent", "多步驟、有狀態、可執行"),
-            ("😶", "被動回應", "等待指令，僅回應問題"),
-            ("🎯", "主動解決", "理解目標，主動執行")
-        ])
-    
+    (add_grid_slide, ("Agent vs 傳統聊天機器人", [
+        ("💬", "聊天機器人", "單輪、無狀態、文字輸出"),
+        ("🔧", "AI Agent", "多步驟、有狀態、可執行"),
+        ("😶", "被動回應", "等待指令，僅回應問題"),
+        ("🎯", "主動解決", "理解目標，主動執行")
+    ])),
     # 頁8: ReAct (版面7)
-    add_flow_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "ReAct 框架", [
-            ("1", "觀察", "接收環境信息"),
-            ("2", "思考", "推理分析狀況"),
-            ("3", "行動", "執行具體操作")
-        ])
-    
+    (add_flow_slide, ("ReAct 框架", [
+        ("1", "觀察", "接收環境信息"),
+        ("2", "思考", "推理分析狀況"),
+        ("3", "行動", "執行具體操作")
+    ])),
     # 頁9: MCP (版面2)
-    add_two_column_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "⚡", "Model Context Protocol", [
-            "AI 模型整合的標準化協議",
-            "由 Anthropic 於 2024 年提出",
-            "實現安全、雙向的通訊機制",
-            "好比 AI 應用的 USB-C 接口"
-        ])
-    
+    (add_two_column_slide, ("⚡", "Model Context Protocol", [
+        "AI 模型整合的標準化協議",
+        "由 Anthropic 於 2024 年提出",
+        "實現安全、雙向的通訊機制",
+        "好比 AI 應用的 USB-C 接口"
+    ])),
     # 頁10: 核心發現 (版面6)
-    add_sidebar_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "核心發現", "三個關鍵轉變", [
-            "1. 演進軌跡：生成 → 推理 → 行動",
-            "2. Agent 橋接了 AI 與現實任務的鴻溝",
-            "3. MCP 實現標準化、可互操作的 AI 工具",
-            "4. Skills 讓 AI 能力模組化與可重用",
-            "5. 未來是自主、協作的 AI 系統"
-        ])
-    
+    (add_sidebar_slide, ("核心發現", "三個關鍵轉變", [
+        "1. 演進軌跡：生成 → 推理 → 行動",
+        "2. Agent 橋接了 AI 與現實任務的鴻溝",
+        "3. MCP 實現標準化、可互操作的 AI 工具",
+        "4. Skills 讓 AI 能力模組化與可重用",
+        "5. 未來是自主、協作的 AI 系統"
+    ])),
     # 頁11: 致謝 (版面1)
-    add_title_slide(prs.slides.add_slide(prs.slide_layouts[6]),
-        "致謝", "AI 的未來是 Agentic")
+    (add_title_slide, ("致謝", "AI 的未來是 Agentic")),
+]
+
+
+def build_presentation(pages, fast=False):
+    prs = Presentation()
+    prs.slide_width = Inches(13.333)
+    prs.slide_height = Inches(7.5)
+
+    if fast:
+        cache = PrototypeCache()
+        for builder, args in pages:
+            cache.add(prs, builder, *args)
+    else:
+        for builder, args in pages:
+            builder(prs.slides.add_slide(prs.slide_layouts[6]), *args)
+    return prs
+
+
+def benchmark(count=500):
+    """比較逐個 shape 構建與原型複製生成 count 頁（不含保存）"""
+    pages = [DECK[i % len(DECK)] for i in range(count)]
+    results = {}
+    for fast in (False, True):
+        start = time.perf_counter()
+        build_presentation(pages, fast=fast)
+        results["fast" if fast else "shapes"] = time.perf_counter() - start
+
+    print(f"📊 {count} 頁:")
+    print(f"   逐個 shape: {results['shapes']:.2f}s ({count / results['shapes']:.0f} 頁/秒)")
+    print(f"   原型複製:   {results['fast']:.2f}s ({count / results['fast']:.0f} 頁/秒)")
+    print(f"   加速:       {results['shapes'] / results['fast']:.1f}x")
+    return results
+
+
+# 主函數
+def create_ppt(fast=False, output='AI_Evolution_FYP_Varied_v2.pptx'):
+    print("🚀 創建多樣化版面 FYP PPT...")
+    
+    prs = build_presentation(DECK, fast=fast)
     
     # 保存
-    output = 'AI_Evolution_FYP_Varied_v2.pptx'
     prs.save(output)
     
     print(f"✅ 完成！")
@@ -425,5 +518,16 @@ def create_ppt():
     return output
 
 if __name__ == "__main__":
-    os.chdir('/Users/singit/.openclaw/workspace-rem/projects/swarm_examples')
-    create_ppt()
+    parser = argparse.ArgumentParser(description="多樣化版面 FYP PPT")
+    parser.add_argument("--fast", action="store_true", help="使用版面原型複製")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="比較兩種方式生成 N 頁的速度")
+    parser.add_argument("-o", "--output", help="輸出文件")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+    elif args.output:
+        create_ppt(fast=args.fast, output=args.output)
+    else:
+        os.chdir('/Users/singit/.openclaw/workspace-rem/projects/swarm_examples')
+        create_ppt(fast=args.fast)
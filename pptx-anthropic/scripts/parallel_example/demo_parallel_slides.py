@@ -2,12 +2,26 @@
 """
 demo_parallel_slides.py - 並行幻燈片創建演示
 
-這個腳本示範如何使用 sessions_spawn 批量創建 PPT 幻燈片
+用 pptx_parallel 的進程池引擎生成課程幻燈片：每個 worker 用 python-pptx
+生成一段幻燈片，最後在包層級合併成 final_lesson.pptx。
+
+用法：
+    python demo_parallel_slides.py [--workers N] [--repeat K] [--benchmark]
 """
 
-import os
+import argparse
 import json
-from datetime import datetime
+import os
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import PP_ALIGN
+from pptx.util import Inches, Pt
+
+from pptx_parallel import DEFAULT_WORKERS, benchmark, render_parallel
+
+OUTPUT_DIR = os.path.expanduser("~/.openclaw/workspace-rem/pptx_parallel_demo")
 
 # 模擬課程內容
 LESSON_SLIDES = [
@@ -47,220 +61,98 @@ LESSON_SLIDES = [
     }
 ]
 
-def generate_slide_task(slide_info, output_dir):
-    """生成單個幻燈片的創建任務"""
-    
+def _fill_background(slide, rgb):
+    fill = slide.background.fill
+    fill.solid()
+    fill.fore_color.rgb = RGBColor(*rgb)
+
+
+def _add_text(slide, text, left, top, width, height, size, rgb,
+              bold=False, align=PP_ALIGN.LEFT):
+    frame = slide.shapes.add_textbox(left, top, width, height).text_frame
+    frame.word_wrap = True
+    paragraph = frame.paragraphs[0]
+    paragraph.text = text
+    paragraph.alignment = align
+    paragraph.font.size = Pt(size)
+    paragraph.font.bold = bold
+    paragraph.font.color.rgb = RGBColor(*rgb)
+    return frame
+
+
+def build_lesson_slide(prs, slide_info):
+    """按類型生成一張課程幻燈片（在 worker 進程中執行）"""
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    width = prs.slide_width
     slide_type = slide_info["type"]
-    slide_num = slide_info["num"]
-    
-    if slide_type == "title":
-        task = f"""
-使用 python-pptx 創建一個標題頁幻燈片：
 
-幻燈片 {slide_num} - 標題頁
-- 主標題："{slide_info['title']}"
-- 副標題："{slide_info['subtitle']}"
-- 背景使用深藍色（RGB: 30, 39, 97）
-- 主標題字體：44pt，白色，置中
-- 副標題字體：28pt，淺色，置中
-
-保存到：{output_dir}/slide_{slide_num:02d}.pptx
+    if slide_type == "title":
+        _fill_background(slide, (30, 39, 97))
+        _add_text(slide, slide_info["title"], 0, Inches(2.5), width, Inches(1.2),
+                  44, (255, 255, 255), bold=True, align=PP_ALIGN.CENTER)
+        _add_text(slide, slide_info["subtitle"], 0, Inches(3.9), width, Inches(0.8),
+                  28, (202, 220, 252), align=PP_ALIGN.CENTER)
 
-輸出執行結果確認。
-"""
-    
     elif slide_type == "content":
-        bullets_text = "\\n".join([f'- "{b}"' for b in slide_info["bullets"]])
-        task = f"""
-使用 python-pptx 創建一個內容頁幻燈片：
-
-幻燈片 {slide_num} - 內容頁
-- 標題："{slide_info['title']}"
-- 內容項目：
-{bullets_text}
-- 背景：淺藍白（RGB: 240, 248, 255）
-- 頂部有藍色標題條（RGB: 2, 128, 144）
-- 標題字體：36pt，白色，粗體
-- 內容字體：24pt，深灰色
+        _fill_background(slide, (240, 248, 255))
+        bar = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, width, Inches(1.2))
+        bar.fill.solid()
+        bar.fill.fore_color.rgb = RGBColor(2, 128, 144)
+        bar.line.fill.background()
+        _add_text(slide, slide_info["title"], Inches(0.5), Inches(0.2),
+                  width - Inches(1), Inches(0.8), 36, (255, 255, 255), bold=True)
+        frame = _add_text(slide, slide_info["bullets"][0], Inches(0.7), Inches(1.6),
+                          width - Inches(1.4), Inches(5), 24, (64, 64, 64))
+        for bullet in slide_info["bullets"][1:]:
+            paragraph = frame.add_paragraph()
+            paragraph.text = bullet
+            paragraph.font.size = Pt(24)
+            paragraph.font.color.rgb = RGBColor(64, 64, 64)
 
-保存到：{output_dir}/slide_{slide_num:02d}.pptx
-
-輸出執行結果確認。
-"""
-    
     elif slide_type == "image":
-        task = f"""
-使用 python-pptx 創建一個圖文頁幻燈片：
+        _fill_background(slide, (0, 168, 150))
+        size = Inches(2.6)
+        circle = slide.shapes.add_shape(MSO_SHAPE.OVAL, (width - size) // 2,
+                                        Inches(0.8), size, size)
+        circle.fill.solid()
+        circle.fill.fore_color.rgb = RGBColor(255, 255, 255)
+        circle.line.fill.background()
+        _add_text(slide, slide_info["title"], 0, Inches(3.7), width, Inches(1),
+                  40, (255, 255, 255), bold=True, align=PP_ALIGN.CENTER)
+        _add_text(slide, slide_info["description"], 0, Inches(5.2), width, Inches(0.8),
+                  22, (224, 247, 244), align=PP_ALIGN.CENTER)
 
-幻燈片 {slide_num} - 圖文頁
-- 大標題："{slide_info['title']}"
-- 描述文字："{slide_info['description']}"
-- 背景：青色（RGB: 0, 168, 150）
-- 中間有一個大白色圓形（模擬圖標區域）
-- 標題在圓形下方，40pt，白色，置中
-- 描述在最下方，22pt，淺色，置中
+    return slide
 
-保存到：{output_dir}/slide_{slide_num:02d}.pptx
-
-輸出執行結果確認。
-"""
-    
-    return task.strip()
-
-def create_parallel_tasks_config():
-    """創建並行任務配置文件"""
-    
-    output_dir = os.path.expanduser("~/.openclaw/workspace-rem/pptx_parallel_demo")
-    os.makedirs(output_dir, exist_ok=True)
-    
-    tasks = []
-    
-    print("🚀 生成並行 PPT 創建任務\\n")
-    print("=" * 60)
-    
-    for slide in LESSON_SLIDES:
-        task_content = generate_slide_task(slide, output_dir)
-        
-        task_config = {
-            "task_id": f"slide_{slide['num']:02d}",
-            "slide_num": slide["num"],
-            "slide_type": slide["type"],
-            "session_key": f"pptx-creator-slide-{slide['num']:02d}",
-            "task": task_content,
-            "output_file": f"{output_dir}/slide_{slide['num']:02d}.pptx",
-            "created_at": datetime.now().isoformat()
-        }
-        
-        tasks.append(task_config)
-        
-        print(f"\\n📊 幻燈片 {slide['num']}: {slide['title']}")
-        print(f"   類型: {slide['type']}")
-        print(f"   Session: {task_config['session_key']}")
-    
-    # 保存任務配置
-    config_file = f"{output_dir}/parallel_tasks_config.json"
-    with open(config_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "tasks": tasks,
-            "total_slides": len(tasks),
-            "output_directory": output_dir,
-            "created_at": datetime.now().isoformat()
-        }, f, indent=2, ensure_ascii=False)
-    
-    print("\\n" + "=" * 60)
-    print(f"\\n✅ 任務配置已生成：{config_file}")
-    print(f"📁 輸出目錄：{output_dir}")
-    print(f"\\n📋 下一步操作：")
-    print("1. 讀取配置文件中的每個任務")
-    print("2. 使用 sessions_spawn 啟動每個任務")
-    print("3. 等待所有 session 完成")
-    print("4. 聚合結果到最終 PPT")
-    
-    return config_file, tasks
-
-def generate_aggregation_script(output_dir):
-    """生成結果聚合腳本"""
-    
-    script_content = f'''#!/usr/bin/env python3
-"""
-聚合並行創建的幻燈片到最終 PPT
-"""
-
-from pptx import Presentation
-from pptx.util import Inches
-import os
-import glob
-
-OUTPUT_DIR = "{output_dir}"
-FINAL_PPT = os.path.join(OUTPUT_DIR, "final_lesson.pptx")
-
-def aggregate_slides():
-    """聚合所有幻燈片"""
-    
-    # 創建新 PPT
-    final_prs = Presentation()
-    
-    # 獲取所有幻燈片文件（按順序）
-    slide_files = sorted(glob.glob(os.path.join(OUTPUT_DIR, "slide_*.pptx")))
-    
-    print(f"🔍 找到 {{len(slide_files)}} 個幻燈片文件")
-    
-    for slide_file in slide_files:
-        print(f"  📄 處理：{{os.path.basename(slide_file)}}")
-        
-        # 讀取單個幻燈片
-        prs = Presentation(slide_file)
-        
-        # 複製幻燈片到最終 PPT
-        for slide in prs.slides:
-            # 這裡需要實現幻燈片複製邏輯
-            # 簡化版本：僅複製內容文本
-            slide_layout = final_prs.slide_layouts[6]  # 空白佈局
-            new_slide = final_prs.slides.add_slide(slide_layout)
-            
-            # 複製文本內容
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    new_shape = new_slide.shapes.add_textbox(
-                        shape.left, shape.top, shape.width, shape.height
-                    )
-                    new_shape.text = shape.text
-    
-    # 保存最終 PPT
-    final_prs.save(FINAL_PPT)
-    print(f"\\n✅ 聚合完成：{{FINAL_PPT}}")
-
-if __name__ == "__main__":
-    aggregate_slides()
-'''
-    
-    script_file = f"{output_dir}/aggregate_slides.py"
-    with open(script_file, 'w') as f:
-        f.write(script_content)
-    
-    os.chmod(script_file, 0o755)
-    print(f"\\n📝 聚合腳本已生成：{script_file}")
-    
-    return script_file
 
 def main():
     """主程序"""
-    
-    print("=" * 60)
-    print("  並行 PPT 創建演示 - Sessions Spawn 方案")
+    parser = argparse.ArgumentParser(description="並行 PPT 創建演示")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"並行進程數（默認 {DEFAULT_WORKERS}）")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="重複課程內容 K 次，用於放大規模測試")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="與串行 python-pptx 生成對比吞吐量")
+    args = parser.parse_args()
+
+    slides = LESSON_SLIDES * args.repeat
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    final_ppt = os.path.join(OUTPUT_DIR, "final_lesson.pptx")
+
     print("=" * 60)
-    
-    # 創建並行任務配置
-    config_file, tasks = create_parallel_tasks_config()
-    
-    # 生成聚合腳本
-    output_dir = os.path.expanduser("~/.openclaw/workspace-rem/pptx_parallel_demo")
-    aggregate_script = generate_aggregation_script(output_dir)
-    
-    print("\\n" + "=" * 60)
-    print("  使用示例代碼")
+    print("  並行 PPT 創建演示 - 進程池 + 包層級合併")
     print("=" * 60)
-    print("""
-# 在 OpenClaw 中使用 sessions_spawn 啟動任務：
+    print(f"\n🚀 {len(slides)} 張幻燈片，{args.workers} 個進程")
 
-# 1. 加載任務配置
-import json
-with open('""" + config_file + """') as f:
-    config = json.load(f)
+    render_parallel(slides, build_lesson_slide, final_ppt, workers=args.workers)
+    print(f"✅ 聚合完成：{final_ppt}（{len(Presentation(final_ppt).slides)} 張）")
 
-# 2. 並行啟動所有任務
-for task in config['tasks']:
-    sessions_spawn(
-        task=task['task'],
-        mode='run',
-        session_key=task['session_key']
-    )
+    if args.benchmark:
+        print("\n📊 基準測試：")
+        print(json.dumps(benchmark(slides, build_lesson_slide, workers=args.workers),
+                         indent=2, ensure_ascii=False))
 
-# 3. 等待完成後聚合結果
-exec(command='python """ + aggregate_script + """')
-""")
-    
-    print("\\n✨ 演示配置完成！")
 
 if __name__ == "__main__":
     main()
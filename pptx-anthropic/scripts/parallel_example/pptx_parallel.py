@@ -1,103 +1,349 @@
 #!/usr/bin/env python3
 """
-pptx_parallel.py - 使用 sessions_spawn 實現並行 PPT 處理
+pptx_parallel.py - 本地進程池並行生成 PPT 幻燈片
 
-這是 Anthropic subagent 模式的 OpenClaw 替代方案
+每個 worker 從模板建立一個只含一段連續幻燈片的 .pptx（每段約 N/(2×workers) 張，
+分攤打開模板與保存的開銷），最後在「包」層級合併：直接複製幻燈片 part、
+它的 .rels 以及引用到的媒體/圖表等 part，重新編號 slide ID 與 rId，
+而不是用 python-pptx 逐個 shape 複製。
+
+用法：
+    python pptx_parallel.py slides.json output.pptx [--template t.pptx] [--workers N]
+    python pptx_parallel.py slides.json output.pptx --benchmark
+
+slides.json 格式：
+    [{"title": "標題", "subtitle": "副標題"},
+     {"title": "內容頁", "bullets": ["要點 1", "要點 2"]}]
+
+在程式中使用自訂的幻燈片建構函數：
+    from pptx_parallel import render_parallel
+    render_parallel(specs, build_fn, "out.pptx", template="t.pptx", workers=4)
+
+build_fn(prs, spec) 需為模組頂層函數（可被 pickle），在 prs 中新增一張幻燈片。
+所有 worker 使用同一個模板，因此版式、母版與主題直接共用模板中的 part。
 """
 
+import argparse
 import json
 import os
+import posixpath
+import re
 import sys
-from datetime import datetime
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-# 配置
-WORKSPACE = os.path.expanduser("~/.openclaw/workspace-rem")
-OUTPUT_DIR = f"{WORKSPACE}/pptx_parallel_outputs"
+import lxml.etree
+from pptx import Presentation
 
-def create_slide_task(slide_num, content, template_file):
-    """創建單個幻燈片的編輯任務"""
-    return f"""
-# PPT Slide Editor Task - Slide {slide_num}
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
 
-讀取模板文件：{template_file}
-編輯第 {slide_num} 張幻燈片
-內容：{content}
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+SLIDE_REL_TYPE = f"{R_NS}/slide"
 
-使用 python-pptx 完成以下操作：
-1. 加載 PPT 文件
-2. 定位到第 {slide_num} 張幻燈片
-3. 更新文本內容
-4. 保存文件到：{OUTPUT_DIR}/slide_{slide_num}_edited.pptx
+# 模板中所有幻燈片共用的 part，合併時不複製
+SHARED_DIRS = (
+    "ppt/slideLayouts/",
+    "ppt/slideMasters/",
+    "ppt/theme/",
+    "ppt/notesMasters/",
+    "ppt/handoutMasters/",
+)
 
-請輸出執行結果的摘要。
-"""
+_PARSER = lxml.etree.XMLParser(resolve_entities=False, no_network=True)
 
-def main():
-    """主函數：示範並行處理多個幻燈片"""
-    
-    # 確保輸出目錄存在
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # 定義任務
-    tasks = [
-        {
-            "id": "slide_1",
-            "slide_num": 1,
-            "content": "標題頁：AI Agent 介紹",
-            "template": "/tmp/template.pptx"
-        },
-        {
-            "id": "slide_2", 
-            "slide_num": 2,
-            "content": "什麼是 AI？",
-            "template": "/tmp/template.pptx"
-        },
-        {
-            "id": "slide_3",
-            "slide_num": 3,
-            "content": "Agent 的工作原理",
-            "template": "/tmp/template.pptx"
-        },
-        {
-            "id": "slide_4",
-            "slide_num": 4,
-            "content": "實際應用案例",
-            "template": "/tmp/template.pptx"
+
+# ---------------------------------------------------------------- 生成
+
+
+def build_text_slide(prs, spec):
+    """預設建構函數：標題頁（title + subtitle）或標題加要點的內容頁"""
+    if "bullets" in spec:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = spec.get("title", "")
+        body = slide.placeholders[1].text_frame
+        for i, bullet in enumerate(spec["bullets"]):
+            paragraph = body.paragraphs[0] if i == 0 else body.add_paragraph()
+            paragraph.text = bullet
+    else:
+        slide = prs.slides.add_slide(prs.slide_layouts[0])
+        slide.shapes.title.text = spec.get("title", "")
+        if len(slide.placeholders) > 1:
+            slide.placeholders[1].text = spec.get("subtitle", "")
+    return slide
+
+
+def open_template(template):
+    """打開模板並移除其中已有的幻燈片，只保留版式、母版與主題"""
+    prs = Presentation(template)
+    sld_id_lst = prs.slides._sldIdLst
+    for sld_id in list(sld_id_lst):
+        prs.part.drop_rel(sld_id.rId)
+        sld_id_lst.remove(sld_id)
+    return prs
+
+
+def _build_chunk(job, build_fn, template):
+    """worker：把一段連續的幻燈片生成到一個 .pptx，返回文件路徑"""
+    start, chunk, out_dir = job
+    prs = open_template(template)
+    for spec in chunk:
+        build_fn(prs, spec)
+    path = os.path.join(out_dir, f"slides_{start:05d}.pptx")
+    prs.save(path)
+    return path
+
+
+def render_parallel(specs, build_fn=build_text_slide, output="output.pptx",
+                    template=None, workers=DEFAULT_WORKERS):
+    """用進程池並行生成所有幻燈片，再合併成一個 .pptx"""
+    if not specs:
+        raise ValueError("沒有需要生成的幻燈片")
+
+    size = -(-len(specs) // (workers * 2))
+    with tempfile.TemporaryDirectory() as out_dir:
+        jobs = [(i, specs[i:i + size], out_dir) for i in range(0, len(specs), size)]
+        worker = partial(_build_chunk, build_fn=build_fn, template=template)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(worker, jobs))
+        merge_decks(parts, output)
+    return output
+
+
+def render_serial(specs, build_fn=build_text_slide, output="output.pptx", template=None):
+    """對照組：在一個 python-pptx Presentation 中逐張生成"""
+    prs = open_template(template)
+    for spec in specs:
+        build_fn(prs, spec)
+    prs.save(output)
+    return output
+
+
+# ---------------------------------------------------------------- 合併
+
+
+class _Package:
+    """以 {part 名稱: bytes} 形式保存在內存中的 OPC 包"""
+
+    def __init__(self, path):
+        with zipfile.ZipFile(path) as zf:
+            self.parts = {name: zf.read(name) for name in zf.namelist()}
+        self.content_types = lxml.etree.fromstring(self.parts["[Content_Types].xml"], _PARSER)
+        self._counters = {}
+
+    def rels(self, part):
+        directory, filename = posixpath.split(part)
+        name = posixpath.join(directory, "_rels", f"{filename}.rels")
+        if name not in self.parts:
+            return None
+        return lxml.etree.fromstring(self.parts[name], _PARSER)
+
+    def set_rels(self, part, rels):
+        directory, filename = posixpath.split(part)
+        name = posixpath.join(directory, "_rels", f"{filename}.rels")
+        self.parts[name] = _serialize(rels)
+
+    def override(self, part):
+        for elem in self.content_types.iter(f"{{{CT_NS}}}Override"):
+            if elem.get("PartName") == f"/{part}":
+                return elem.get("ContentType")
+        return None
+
+    def default_extensions(self):
+        return {
+            elem.get("Extension").lower(): elem
+            for elem in self.content_types.iter(f"{{{CT_NS}}}Default")
         }
+
+    def unique_name(self, part):
+        """為 part 分配包內未使用的名稱，例如 ppt/media/image3.png"""
+        directory, filename = posixpath.split(part)
+        stem, ext = posixpath.splitext(filename)
+        prefix = re.sub(r"\d+$", "", stem)
+        key = (directory, prefix, ext)
+        if key not in self._counters:
+            pattern = re.compile(rf"{re.escape(prefix)}(\d+){re.escape(ext)}$")
+            numbers = [
+                int(m.group(1))
+                for name in self.parts
+                if posixpath.dirname(name) == directory
+                and (m := pattern.match(posixpath.basename(name)))
+            ]
+            self._counters[key] = max(numbers, default=0)
+        self._counters[key] += 1
+        return posixpath.join(directory, f"{prefix}{self._counters[key]}{ext}")
+
+
+def merge_decks(paths, output):
+    """把多個由同一模板生成的 .pptx 合併成一個，按 paths 順序排列幻燈片"""
+    base = _Package(paths[0])
+    pres_rels = base.rels("ppt/presentation.xml")
+    pres = lxml.etree.fromstring(base.parts["ppt/presentation.xml"], _PARSER)
+    sld_id_lst = pres.find(f"{{{P_NS}}}sldIdLst")
+    if sld_id_lst is None:
+        # sldIdLst 必須緊跟在各母版 ID 列表之後
+        masters = [
+            child for child in pres
+            if lxml.etree.QName(child).localname in
+            ("sldMasterIdLst", "notesMasterIdLst", "handoutMasterIdLst")
+        ]
+        sld_id_lst = lxml.etree.Element(f"{{{P_NS}}}sldIdLst")
+        masters[-1].addnext(sld_id_lst)
+
+    rid_numbers = [
+        int(m.group(1)) for rel in pres_rels if (m := re.fullmatch(r"rId(\d+)", rel.get("Id", "")))
     ]
-    
-    print(f"🚀 啟動並行 PPT 編輯任務")
-    print(f"📊 總共 {len(tasks)} 個幻燈片需要處理")
-    print(f"📁 輸出目錄：{OUTPUT_DIR}")
-    print("-" * 50)
-    
-    # 創建任務配置文件
-    task_config = []
-    for task in tasks:
-        task_config.append({
-            "session_key": f"pptx-editor-{task['id']}",
-            "task": create_slide_task(
-                task['slide_num'],
-                task['content'],
-                task['template']
-            ),
-            "output_file": f"{OUTPUT_DIR}/{task['id']}_result.json"
-        })
-    
-    # 保存任務配置（供 OpenClaw 讀取）
-    config_file = f"{OUTPUT_DIR}/tasks_config.json"
-    with open(config_file, 'w', encoding='utf-8') as f:
-        json.dump(task_config, f, indent=2, ensure_ascii=False)
-    
-    print(f"\n✅ 任務配置已保存：{config_file}")
-    print("\n📋 使用說明：")
-    print("1. 讀取上面的 tasks_config.json")
-    print("2. 對每個任務調用 sessions_spawn")
-    print("3. 等待所有 session 完成")
-    print("4. 聚合結果")
-    
-    return config_file
+    next_rid = max(rid_numbers, default=0) + 1
+    next_slide_id = 1 + max((int(s.get("id")) for s in sld_id_lst), default=255)
+
+    for path in paths[1:]:
+        source = _Package(path)
+        source_pres_rels = source.rels("ppt/presentation.xml")
+        targets = {rel.get("Id"): rel.get("Target") for rel in source_pres_rels}
+        source_pres = lxml.etree.fromstring(source.parts["ppt/presentation.xml"], _PARSER)
+        mapping = {}
+
+        for sld_id in source_pres.iter(f"{{{P_NS}}}sldId"):
+            slide = posixpath.normpath(posixpath.join("ppt", targets[sld_id.get(f"{{{R_NS}}}id")]))
+            new_slide = _copy_part(source, base, slide, mapping)
+
+            rid = f"rId{next_rid}"
+            next_rid += 1
+            lxml.etree.SubElement(
+                pres_rels,
+                f"{{{REL_NS}}}Relationship",
+                Id=rid,
+                Type=SLIDE_REL_TYPE,
+                Target=posixpath.relpath(new_slide, "ppt"),
+            )
+            new_id = lxml.etree.SubElement(sld_id_lst, f"{{{P_NS}}}sldId")
+            new_id.set("id", str(next_slide_id))
+            new_id.set(f"{{{R_NS}}}id", rid)
+            next_slide_id += 1
+
+    base.parts["ppt/presentation.xml"] = _serialize(pres)
+    base.set_rels("ppt/presentation.xml", pres_rels)
+    base.parts["[Content_Types].xml"] = _serialize(base.content_types)
+
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", base.parts.pop("[Content_Types].xml"))
+        for name, data in base.parts.items():
+            zf.writestr(name, data)
+    return output
+
+
+def _copy_part(source, dest, part, mapping):
+    """把 part 及其遞歸引用的非共用 part 複製到 dest，返回新名稱"""
+    if part in mapping:
+        return mapping[part]
+    if part.startswith(SHARED_DIRS):
+        mapping[part] = part
+        return part
+
+    new_part = dest.unique_name(part)
+    mapping[part] = new_part
+    dest.parts[new_part] = source.parts[part]
+
+    rels = source.rels(part)
+    if rels is not None:
+        for rel in rels:
+            target = rel.get("Target")
+            if rel.get("TargetMode") == "External" or not target:
+                continue
+            if target.startswith("/"):
+                target_part = target.lstrip("/")
+            else:
+                target_part = posixpath.normpath(
+                    posixpath.join(posixpath.dirname(part), target)
+                )
+            if target_part not in source.parts:
+                continue
+            new_target = _copy_part(source, dest, target_part, mapping)
+            rel.set("Target", posixpath.relpath(new_target, posixpath.dirname(new_part)))
+        dest.set_rels(new_part, rels)
+
+    content_type = source.override(part)
+    if content_type:
+        lxml.etree.SubElement(
+            dest.content_types,
+            f"{{{CT_NS}}}Override",
+            PartName=f"/{new_part}",
+            ContentType=content_type,
+        )
+    else:
+        ext = posixpath.splitext(part)[1].lstrip(".").lower()
+        defaults = dest.default_extensions()
+        source_default = source.default_extensions().get(ext)
+        if ext not in defaults and source_default is not None:
+            dest.content_types.insert(0, lxml.etree.fromstring(
+                lxml.etree.tostring(source_default), _PARSER
+            ))
+    return new_part
+
+
+def _serialize(elem):
+    return lxml.etree.tostring(elem, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+# ---------------------------------------------------------------- 基準測試
+
+
+def benchmark(specs, build_fn=build_text_slide, template=None, workers=DEFAULT_WORKERS):
+    """比較串行 python-pptx 生成與並行生成 + 包合併的吞吐量"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        render_serial(specs, build_fn, os.path.join(tmp, "serial.pptx"), template)
+        results["serial"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        render_parallel(specs, build_fn, os.path.join(tmp, "parallel.pptx"), template, workers)
+        results["parallel"] = time.perf_counter() - start
+
+    return {
+        "slides": len(specs),
+        "workers": workers,
+        "serial_seconds": round(results["serial"], 3),
+        "parallel_seconds": round(results["parallel"], 3),
+        "serial_slides_per_second": round(len(specs) / results["serial"], 1),
+        "parallel_slides_per_second": round(len(specs) / results["parallel"], 1),
+        "speedup": round(results["serial"] / results["parallel"], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="並行生成 PPT 幻燈片並在包層級合併")
+    parser.add_argument("slides", help="幻燈片內容 JSON 文件")
+    parser.add_argument("output", help="輸出 .pptx 文件")
+    parser.add_argument("--template", help="模板 .pptx（默認使用 python-pptx 內建模板）")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"並行進程數（默認 {DEFAULT_WORKERS}）")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="同時運行串行生成並輸出吞吐量對比")
+    args = parser.parse_args()
+
+    with open(args.slides, encoding="utf-8") as f:
+        specs = json.load(f)
+
+    print(f"🚀 使用 {args.workers} 個進程生成 {len(specs)} 張幻燈片")
+    start = time.perf_counter()
+    try:
+        render_parallel(specs, build_text_slide, args.output, args.template, args.workers)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ 錯誤：{e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ 已保存：{args.output}（{time.perf_counter() - start:.2f}s）")
+
+    if args.benchmark:
+        print("\n📊 基準測試：")
+        print(json.dumps(benchmark(specs, build_text_slide, args.template, args.workers),
+                         indent=2, ensure_ascii=False))
+
 
 if __name__ == "__main__":
-    config = main()
-    print(f"\n🎯 配置文件：{config}")
+    main()
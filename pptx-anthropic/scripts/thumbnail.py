@@ -4,8 +4,17 @@ Creates a grid layout of slide thumbnails for quick visual analysis.
 Labels each thumbnail with its XML filename (e.g., slide1.xml).
 Hidden slides are shown with a placeholder pattern.
 
+Rendered tiles are cached by a hash of each slide's XML and everything it
+pulls in (layout, master, theme, media, charts), so after an edit only the
+changed slides are re-rendered. Slides that show a slide number field also
+hash their number, so moving them invalidates their tiles. The cache is
+trimmed to CACHE_MAX_BYTES, least recently used tiles first; deleting the
+cache directory clears it.
+
 Usage:
-    python thumbnail.py input.pptx [output_prefix] [--cols N]
+    python thumbnail.py input.pptx [output_prefix] [--cols N] [--format jpg|png|webp]
+                        [--slides RANGES] [--only slideN.xml]
+                        [--cache-dir DIR | --no-cache]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -13,28 +22,49 @@ Examples:
 
     python thumbnail.py template.pptx grid --cols 4
     # Creates: grid.jpg (or grid-1.jpg, grid-2.jpg for large decks)
+
+    python thumbnail.py template.pptx --slides 10-20 --only slide42.xml
+    # Renders just those slides from a minimal copy of the deck
 """
 
 import argparse
+import collections
+import functools
+import hashlib
+import itertools
+import os
+import posixpath
 import subprocess
 import sys
 import tempfile
 import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import defusedxml.minidom
+from clean import clean_unused_files
 from office.soffice import get_soffice_env
 from PIL import Image, ImageDraw, ImageFont
 
 THUMBNAIL_WIDTH = 300
-CONVERSION_DPI = 100
+DEFAULT_ASPECT = 9 / 16
 MAX_COLS = 6
 DEFAULT_COLS = 3
 JPEG_QUALITY = 95
+IMAGE_FORMATS = {".jpg": "JPEG", ".png": "PNG", ".webp": "WEBP"}
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
 GRID_PADDING = 20
 BORDER_WIDTH = 2
 FONT_SIZE_RATIO = 0.10
 LABEL_PADDING_RATIO = 0.4
+CACHE_VERSION = 2
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "pptx-thumbnails"
+)
+IGNORED_REL_TYPES = ("/slide", "/notesSlide", "/notesMaster", "/handoutMaster", "/comments")
+SLIDE_NUMBER_FIELD = b'type="slidenum"'
 
 
 def main():
@@ -54,6 +84,34 @@ def main():
         default=DEFAULT_COLS,
         help=f"Number of columns (default: {DEFAULT_COLS}, max: {MAX_COLS})",
     )
+    parser.add_argument(
+        "--format",
+        choices=[suffix.lstrip(".") for suffix in IMAGE_FORMATS],
+        default="jpg",
+        help="Grid image format (default: jpg)",
+    )
+    parser.add_argument(
+        "--slides",
+        metavar="RANGES",
+        help="Only render these slide positions, e.g. 10-20 or 1,4,7-9",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="SLIDE",
+        help="Only render this slide file, e.g. slide7.xml (repeatable)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Rendered tile cache (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render every slide and don't read or write the tile cache",
+    )
 
     args = parser.parse_args()
 
@@ -66,22 +124,27 @@ def main():
         print(f"Error: Invalid PowerPoint file: {args.input}", file=sys.stderr)
         sys.exit(1)
 
-    output_path = Path(f"{args.output_prefix}.jpg")
+    output_path = Path(f"{args.output_prefix}.{args.format}")
 
     try:
-        slide_info = get_slide_info(input_path)
+        slide_info = select_slides(get_slide_info(input_path), args.slides, args.only)
+        if not slide_info:
+            print("Error: No slides found", file=sys.stderr)
+            sys.exit(1)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            visible_images = convert_to_images(input_path, temp_path)
+        aspect = get_slide_aspect(input_path)
 
-            if not visible_images and not any(s["hidden"] for s in slide_info):
-                print("Error: No slides found", file=sys.stderr)
-                sys.exit(1)
+        cache_dir = None if args.no_cache else args.cache_dir
 
-            slides = build_slide_list(slide_info, visible_images, temp_path)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            visible_images = render_visible_slides(
+                input_path, slide_info, Path(temp_dir), THUMBNAIL_WIDTH, cache_dir
+            )
+            slides = build_slide_list(slide_info, visible_images, THUMBNAIL_WIDTH, aspect)
 
-            grid_files = create_grids(slides, cols, THUMBNAIL_WIDTH, output_path)
+            grid_files = create_grids(
+                slides, cols, THUMBNAIL_WIDTH, output_path, aspect=aspect
+            )
 
             print(f"Created {len(grid_files)} grid(s):")
             for grid_file in grid_files:
@@ -94,56 +157,358 @@ def main():
 
 def get_slide_info(pptx_path: Path) -> list[dict]:
     with zipfile.ZipFile(pptx_path, "r") as zf:
-        rels_content = zf.read("ppt/_rels/presentation.xml.rels").decode("utf-8")
-        rels_dom = defusedxml.minidom.parseString(rels_content)
+        return _slide_info(zf)
+
 
-        rid_to_slide = {}
-        for rel in rels_dom.getElementsByTagName("Relationship"):
-            rid = rel.getAttribute("Id")
-            target = rel.getAttribute("Target")
-            rel_type = rel.getAttribute("Type")
-            if "slide" in rel_type and target.startswith("slides/"):
-                rid_to_slide[rid] = target.replace("slides/", "")
+def _slide_info(zf: zipfile.ZipFile) -> list[dict]:
+    rels_content = zf.read("ppt/_rels/presentation.xml.rels").decode("utf-8")
+    rels_dom = defusedxml.minidom.parseString(rels_content)
 
-        pres_content = zf.read("ppt/presentation.xml").decode("utf-8")
-        pres_dom = defusedxml.minidom.parseString(pres_content)
+    rid_to_slide = {}
+    for rel in rels_dom.getElementsByTagName("Relationship"):
+        rid = rel.getAttribute("Id")
+        target = rel.getAttribute("Target")
+        rel_type = rel.getAttribute("Type")
+        if "slide" in rel_type and target.startswith("slides/"):
+            rid_to_slide[rid] = target.replace("slides/", "")
 
-        slides = []
-        for sld_id in pres_dom.getElementsByTagName("p:sldId"):
-            rid = sld_id.getAttribute("r:id")
-            if rid in rid_to_slide:
-                hidden = sld_id.getAttribute("show") == "0"
-                slides.append({"name": rid_to_slide[rid], "hidden": hidden})
+    pres_content = zf.read("ppt/presentation.xml").decode("utf-8")
+    pres_dom = defusedxml.minidom.parseString(pres_content)
 
-        return slides
+    slides = []
+    for sld_id in pres_dom.getElementsByTagName("p:sldId"):
+        rid = sld_id.getAttribute("r:id")
+        if rid in rid_to_slide:
+            hidden = sld_id.getAttribute("show") == "0"
+            slides.append({"name": rid_to_slide[rid], "hidden": hidden})
 
+    return slides
 
-def build_slide_list(
+
+def render_visible_slides(
+    pptx_path: Path,
     slide_info: list[dict],
-    visible_images: list[Path],
     temp_dir: Path,
-) -> list[tuple[Path, str]]:
-    if visible_images:
-        with Image.open(visible_images[0]) as img:
-            placeholder_size = img.size
-    else:
-        placeholder_size = (1920, 1080)
+    width: int,
+    cache_dir: Path | None,
+) -> Iterator[Image.Image]:
+    visible = [info["name"] for info in slide_info if not info["hidden"]]
 
-    slides = []
-    visible_idx = 0
+    with zipfile.ZipFile(pptx_path, "r") as zf:
+        dependencies = slide_dependencies(zf, visible)
+        numbered = numbered_slides(zf, dependencies)
+        if cache_dir is not None:
+            hashes = slide_hashes(zf, dependencies, width, numbered)
+
+    tiles = None
+    dirty = visible
+    if cache_dir is not None:
+        tiles = {name: cache_dir / f"{hashes[name]}.png" for name in visible}
+        dirty = [name for name in visible if not tiles[name].exists()]
+
+    if dirty:
+        pages = _render_slides(pptx_path, dirty, numbered, temp_dir, width)
+        if tiles is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        rendered = 0
+        for name, img in zip(dirty, pages):
+            rendered += 1
+            if tiles is None:
+                yield img
+                continue
+            temp_tile = tiles[name].with_name(f"{tiles[name].stem}.{os.getpid()}.tmp")
+            img.save(temp_tile, "PNG")
+            os.replace(temp_tile, tiles[name])
+        if rendered != len(dirty):
+            raise RuntimeError(f"Rendered {rendered} of {len(dirty)} slides")
+        if tiles is None:
+            return
+        prune_cache(cache_dir, CACHE_MAX_BYTES, keep=set(tiles.values()))
+
+    for name in visible:
+        try:
+            os.utime(tiles[name])
+            img = Image.open(tiles[name])
+        except FileNotFoundError:
+            # Pruned from the cache after this run checked it; render it again
+            img = next(_render_slides(pptx_path, [name], numbered, temp_dir, width), None)
+            if img is None:
+                raise RuntimeError(f"Failed to render {name}") from None
+            yield img
+            continue
+        with img:
+            yield img.convert("RGB")
+
+
+def prune_cache(cache_dir: Path, max_bytes: int, keep: set[Path] = frozenset()) -> None:
+    """Delete the least recently used tiles until the cache fits in max_bytes."""
+    tiles = []
+    total = 0
+    for path in cache_dir.glob("*.png"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        total += stat.st_size
+        if path not in keep:
+            tiles.append((stat.st_mtime, stat.st_size, path))
+
+    for _, size, path in sorted(tiles):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def _render_slides(
+    pptx_path: Path, names: list[str], numbered: set[str], temp_dir: Path, width: int
+) -> Iterator[Image.Image]:
+    """Render the given visible slides, in deck order, to tile-sized images.
+
+    A subset deck is rendered unless it would change the number shown on one
+    of the slides; then the whole deck is rendered and other pages skipped.
+    """
+    deck = get_slide_info(pptx_path)
+    deck_visible = [info["name"] for info in deck if not info["hidden"]]
+    position = {info["name"]: i for i, info in enumerate(deck)}
+    renumbered = any(
+        position[name] != i for i, name in enumerate(names) if name in numbered
+    )
+
+    if names == deck_visible or renumbered:
+        wanted = set(names)
+        pages = render_pages(convert_to_pdf(pptx_path, temp_dir), width)
+        return (img for name, img in zip(deck_visible, pages) if name in wanted)
+
+    subset = build_subset_deck(pptx_path, names, temp_dir / f"{pptx_path.stem}.pptx")
+    return render_pages(convert_to_pdf(subset, temp_dir), width)
+
+
+def slide_dependencies(zf: zipfile.ZipFile, slide_names: list[str]) -> dict[str, set[str]]:
+    """Every part each slide transitively depends on, the slide included."""
+    names = set(zf.namelist())
+    rels_cache = {}
+
+    def related_parts(part):
+        if part not in rels_cache:
+            rels_cache[part] = _related_parts(zf, names, part)
+        return rels_cache[part]
+
+    dependencies = {}
+    for name in slide_names:
+        root = f"ppt/slides/{name}"
+        seen = {root}
+        stack = [root]
+        while stack:
+            for target in related_parts(stack.pop()):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        dependencies[name] = seen
+
+    return dependencies
+
+
+def numbered_slides(zf: zipfile.ZipFile, dependencies: dict[str, set[str]]) -> set[str]:
+    """Slides that show a slide number field, on the slide or its layout/master.
+
+    Layouts and masters only count when the field is outside a placeholder;
+    their sldNum placeholders appear only on slides that have one themselves.
+    """
+    shows_number = {}
+
+    def part_shows_number(part, is_slide):
+        if part not in shows_number:
+            data = zf.read(part) if part.endswith(".xml") else b""
+            shows_number[part] = SLIDE_NUMBER_FIELD in data and (
+                is_slide or _has_unplaced_slide_number(data)
+            )
+        return shows_number[part]
+
+    return {
+        name
+        for name, parts in dependencies.items()
+        if any(
+            part_shows_number(part, part == f"ppt/slides/{name}") for part in sorted(parts)
+        )
+    }
+
+
+def _has_unplaced_slide_number(data: bytes) -> bool:
+    dom = defusedxml.minidom.parseString(data)
+    for field in dom.getElementsByTagName("a:fld"):
+        if field.getAttribute("type") != "slidenum":
+            continue
+        shape = field.parentNode
+        while shape is not None and shape.nodeName != "p:sp":
+            shape = shape.parentNode
+        if shape is None or not shape.getElementsByTagName("p:ph"):
+            return True
+    return False
+
+
+def slide_hashes(
+    zf: zipfile.ZipFile,
+    dependencies: dict[str, set[str]],
+    width: int,
+    numbered: set[str] = frozenset(),
+) -> dict[str, str]:
+    """Hash each slide together with every part it transitively depends on.
+
+    Slides in ``numbered`` also hash their position in the deck.
+    """
+    part_digests = {}
+
+    def part_digest(part):
+        if part not in part_digests:
+            part_digests[part] = hashlib.sha256(zf.read(part)).hexdigest()
+        return part_digests[part]
+
+    pres_dom = defusedxml.minidom.parseString(zf.read("ppt/presentation.xml"))
+    slide_size = ",".join(
+        f"{sz.getAttribute('cx')}x{sz.getAttribute('cy')}"
+        for sz in pres_dom.getElementsByTagName("p:sldSz")
+    )
+    position = {info["name"]: i for i, info in enumerate(_slide_info(zf))} if numbered else {}
+
+    hashes = {}
+    for name, parts in dependencies.items():
+        digest = hashlib.sha256(f"v{CACHE_VERSION}|{width}|{slide_size}".encode())
+        for part in sorted(parts):
+            digest.update(f"|{part}={part_digest(part)}".encode())
+        if name in numbered:
+            digest.update(f"|position={position[name]}".encode())
+        hashes[name] = digest.hexdigest()
+
+    return hashes
+
+
+def _related_parts(zf: zipfile.ZipFile, names: set[str], part: str) -> list[str]:
+    directory, filename = posixpath.split(part)
+    rels_path = posixpath.join(directory, "_rels", f"{filename}.rels")
+    if rels_path not in names:
+        return []
+
+    is_master = filename.startswith("slideMaster")
+    rels_dom = defusedxml.minidom.parseString(zf.read(rels_path))
+    targets = []
+    for rel in rels_dom.getElementsByTagName("Relationship"):
+        rel_type = rel.getAttribute("Type")
+        if rel.getAttribute("TargetMode") == "External":
+            continue
+        if rel_type.endswith(IGNORED_REL_TYPES):
+            continue
+        if is_master and rel_type.endswith("/slideLayout"):
+            continue
+        target = rel.getAttribute("Target")
+        if target.startswith("/"):
+            resolved = target.lstrip("/")
+        else:
+            resolved = posixpath.normpath(posixpath.join(directory, target))
+        if resolved in names:
+            targets.append(resolved)
+    return targets
+
+
+def build_subset_deck(pptx_path: Path, slide_names: list[str], dest: Path) -> Path:
+    """Write a minimal copy of the deck containing only the given slides.
+
+    The other slides are dropped from p:sldIdLst and clean.py then removes
+    them along with any notes, media and other parts nothing references
+    any more, so LibreOffice only has to load what it renders.
+    """
+    keep = set(slide_names)
+    with tempfile.TemporaryDirectory() as unpacked:
+        unpacked_dir = Path(unpacked)
+        with zipfile.ZipFile(pptx_path, "r") as zf:
+            zf.extractall(unpacked_dir)
+
+        rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
+        rels_dom = defusedxml.minidom.parse(str(rels_path))
+        keep_rids = {
+            rel.getAttribute("Id")
+            for rel in rels_dom.getElementsByTagName("Relationship")
+            if rel.getAttribute("Target").replace("slides/", "", 1) in keep
+        }
+
+        pres_path = unpacked_dir / "ppt" / "presentation.xml"
+        pres_dom = defusedxml.minidom.parse(str(pres_path))
+        for sld_id in list(pres_dom.getElementsByTagName("p:sldId")):
+            if sld_id.getAttribute("r:id") not in keep_rids:
+                sld_id.parentNode.removeChild(sld_id)
+            elif sld_id.getAttribute("show") == "0":
+                sld_id.removeAttribute("show")
+        pres_path.write_bytes(pres_dom.toxml(encoding="UTF-8"))
+
+        clean_unused_files(unpacked_dir)
+
+        with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as zf:
+            for f in unpacked_dir.rglob("*"):
+                if f.is_file():
+                    zf.write(f, f.relative_to(unpacked_dir))
+
+    return dest
+
+
+def select_slides(
+    slide_info: list[dict], ranges: str | None, only: list[str] | None
+) -> list[dict]:
+    """Filter slide_info by 1-based positions ("10-20,25") and/or filenames."""
+    if not ranges and not only:
+        return slide_info
+
+    positions = set()
+    for part in (ranges or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        try:
+            start, stop = int(first), int(last or first)
+        except ValueError:
+            raise ValueError(f"Invalid slide range: {part!r}") from None
+        positions.update(range(start, stop + 1))
+
+    names = {name if name.endswith(".xml") else f"{name}.xml" for name in only or []}
+    unknown = names - {info["name"] for info in slide_info}
+    if unknown:
+        raise ValueError(f"Slides not in presentation: {', '.join(sorted(unknown))}")
+
+    return [
+        info
+        for position, info in enumerate(slide_info, start=1)
+        if position in positions or info["name"] in names
+    ]
+
+
+def get_slide_aspect(pptx_path: Path) -> float:
+    with zipfile.ZipFile(pptx_path, "r") as zf:
+        pres_dom = defusedxml.minidom.parseString(zf.read("ppt/presentation.xml"))
+
+    for sld_sz in pres_dom.getElementsByTagName("p:sldSz"):
+        cx, cy = sld_sz.getAttribute("cx"), sld_sz.getAttribute("cy")
+        if cx.isdigit() and cy.isdigit() and int(cx):
+            return int(cy) / int(cx)
+    return DEFAULT_ASPECT
+
+
+def build_slide_list(
+    slide_info: list[dict],
+    visible_images: Iterator[Image.Image],
+    width: int,
+    aspect: float,
+) -> Iterator[tuple[Image.Image, str]]:
+    placeholder_size = (width, int(width * aspect))
 
     for info in slide_info:
         if info["hidden"]:
-            placeholder_path = temp_dir / f"hidden-{info['name']}.jpg"
             placeholder_img = create_hidden_placeholder(placeholder_size)
-            placeholder_img.save(placeholder_path, "JPEG")
-            slides.append((placeholder_path, f"{info['name']} (hidden)"))
+            yield placeholder_img, f"{info['name']} (hidden)"
         else:
-            if visible_idx < len(visible_images):
-                slides.append((visible_images[visible_idx], info["name"]))
-                visible_idx += 1
-
-    return slides
+            img = next(visible_images, None)
+            if img is None:
+                return
+            yield img, info["name"]
 
 
 def create_hidden_placeholder(size: tuple[int, int]) -> Image.Image:
@@ -155,7 +520,7 @@ def create_hidden_placeholder(size: tuple[int, int]) -> Image.Image:
     return img
 
 
-def convert_to_images(pptx_path: Path, temp_dir: Path) -> list[Path]:
+def convert_to_pdf(pptx_path: Path, temp_dir: Path) -> Path:
     pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
 
     result = subprocess.run(
@@ -175,64 +540,174 @@ def convert_to_images(pptx_path: Path, temp_dir: Path) -> list[Path]:
     if result.returncode != 0 or not pdf_path.exists():
         raise RuntimeError("PDF conversion failed")
 
-    result = subprocess.run(
+    return pdf_path
+
+
+def render_pages(pdf_path: Path, width: int) -> Iterator[Image.Image]:
+    """Render each PDF page straight to a thumbnail-sized image in memory.
+
+    pdftoppm writes the pages as a stream of PPM images on stdout, scaled
+    to the tile width, so no full-resolution page ever touches the disk.
+    """
+    proc = subprocess.Popen(
         [
             "pdftoppm",
-            "-jpeg",
-            "-r",
-            str(CONVERSION_DPI),
+            "-scale-to-x",
+            str(width),
+            "-scale-to-y",
+            "-1",
             str(pdf_path),
-            str(temp_dir / "slide"),
         ],
-        capture_output=True,
-        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
     )
-    if result.returncode != 0:
+    try:
+        while (img := _read_ppm(proc.stdout)) is not None:
+            yield img
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+    if proc.returncode != 0:
         raise RuntimeError("Image conversion failed")
 
-    return sorted(temp_dir.glob("slide-*.jpg"))
+
+def _read_ppm(stream) -> Image.Image | None:
+    fields = []
+    token = b""
+    while len(fields) < 4:
+        char = stream.read(1)
+        if not char:
+            if fields or token:
+                raise RuntimeError("Truncated image data from pdftoppm")
+            return None
+        if char.isspace():
+            if token:
+                fields.append(token)
+                token = b""
+        else:
+            token += char
+
+    magic, width, height, _ = fields
+    if magic != b"P6":
+        raise RuntimeError(f"Unexpected image format from pdftoppm: {magic!r}")
+    size = (int(width), int(height))
+    data = stream.read(size[0] * size[1] * 3)
+    return Image.frombytes("RGB", size, data)
 
 
 def create_grids(
-    slides: list[tuple[Path, str]],
+    slides: Iterable[tuple[Image.Image, str]],
     cols: int,
     width: int,
     output_path: Path,
+    aspect: float | None = None,
+    workers: int | None = None,
 ) -> list[str]:
+    """Compose and save grid images, one per chunk of slides.
+
+    Tiles are fitted to the cell size once as they arrive, and each chunk is
+    composed and encoded on a thread pool (PIL releases the GIL for paste,
+    resize and encode), so large decks use several cores. At most ``workers``
+    chunks are in flight, so memory stays bounded while pages stream in.
+    """
     max_per_grid = cols * (cols + 1)
+    image_format = IMAGE_FORMATS[output_path.suffix.lower()]
+
+    slides = iter(slides)
+    first = next(slides, None)
+    if first is None:
+        return []
+    if aspect is None:
+        aspect = first[0].height / first[0].width
+    height = int(width * aspect)
+
+    tiles = (
+        (_fit_tile(img, width, height), label)
+        for img, label in itertools.chain([first], slides)
+    )
+    chunk = list(itertools.islice(tiles, max_per_grid))
+    next_chunk = list(itertools.islice(tiles, max_per_grid))
+    single_grid = not next_chunk
+    chunk_idx = 0
+
+    workers = workers or DEFAULT_WORKERS
     grid_files = []
+    in_flight = collections.deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while chunk:
+            if single_grid:
+                grid_filename = output_path
+            else:
+                stem = output_path.stem
+                suffix = output_path.suffix
+                grid_filename = output_path.parent / f"{stem}-{chunk_idx + 1}{suffix}"
+
+            if len(in_flight) >= workers:
+                grid_files.append(in_flight.popleft().result())
+            in_flight.append(
+                executor.submit(
+                    _save_grid, chunk, cols, width, height, grid_filename, image_format
+                )
+            )
 
-    for chunk_idx, start_idx in enumerate(range(0, len(slides), max_per_grid)):
-        end_idx = min(start_idx + max_per_grid, len(slides))
-        chunk_slides = slides[start_idx:end_idx]
+            chunk, next_chunk = next_chunk, list(itertools.islice(tiles, max_per_grid))
+            chunk_idx += 1
 
-        grid = create_grid(chunk_slides, cols, width)
+        grid_files.extend(future.result() for future in in_flight)
+    return grid_files
 
-        if len(slides) <= max_per_grid:
-            grid_filename = output_path
-        else:
-            stem = output_path.stem
-            suffix = output_path.suffix
-            grid_filename = output_path.parent / f"{stem}-{chunk_idx + 1}{suffix}"
 
-        grid_filename.parent.mkdir(parents=True, exist_ok=True)
-        grid.save(str(grid_filename), quality=JPEG_QUALITY)
-        grid_files.append(str(grid_filename))
+def _save_grid(
+    slides: list[tuple[Image.Image, str]],
+    cols: int,
+    width: int,
+    height: int,
+    grid_filename: Path,
+    image_format: str,
+) -> str:
+    grid = create_grid(slides, cols, width, height)
+    grid_filename.parent.mkdir(parents=True, exist_ok=True)
+    if image_format == "PNG":
+        grid.save(str(grid_filename), image_format)
+    else:
+        grid.save(str(grid_filename), image_format, quality=JPEG_QUALITY)
+    return str(grid_filename)
+
 
-    return grid_files
+def _fit_tile(img: Image.Image, width: int, height: int) -> Image.Image:
+    if img.width > width or img.height > height:
+        img = img.copy()
+        img.thumbnail((width, height), Image.Resampling.LANCZOS)
+    return img
+
+
+@functools.lru_cache(maxsize=None)
+def _load_font(font_size: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.load_default(size=font_size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=4096)
+def _label_width(label: str, font_size: int) -> int:
+    bbox = _load_font(font_size).getbbox(label)
+    return bbox[2] - bbox[0]
 
 
 def create_grid(
-    slides: list[tuple[Path, str]],
+    slides: list[tuple[Image.Image, str]],
     cols: int,
     width: int,
+    height: int | None = None,
 ) -> Image.Image:
     font_size = int(width * FONT_SIZE_RATIO)
     label_padding = int(font_size * LABEL_PADDING_RATIO)
 
-    with Image.open(slides[0][0]) as img:
-        aspect = img.height / img.width
-    height = int(width * aspect)
+    if height is None:
+        first = slides[0][0]
+        height = int(width * first.height / first.width)
 
     rows = (len(slides) + cols - 1) // cols
     grid_w = cols * width + (cols + 1) * GRID_PADDING
@@ -240,13 +715,9 @@ def create_grid(
 
     grid = Image.new("RGB", (grid_w, grid_h), "white")
     draw = ImageDraw.Draw(grid)
+    font = _load_font(font_size)
 
-    try:
-        font = ImageFont.load_default(size=font_size)
-    except Exception:
-        font = ImageFont.load_default()
-
-    for i, (img_path, slide_name) in enumerate(slides):
+    for i, (img, slide_name) in enumerate(slides):
         row, col = i // cols, i % cols
         x = col * width + (col + 1) * GRID_PADDING
         y_base = (
@@ -254,8 +725,7 @@ def create_grid(
         )
 
         label = slide_name
-        bbox = draw.textbbox((0, 0), label, font=font)
-        text_w = bbox[2] - bbox[0]
+        text_w = _label_width(label, font_size)
         draw.text(
             (x + (width - text_w) // 2, y_base + label_padding),
             label,
@@ -265,22 +735,21 @@ def create_grid(
 
         y_thumbnail = y_base + label_padding + font_size + label_padding
 
-        with Image.open(img_path) as img:
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
-            w, h = img.size
-            tx = x + (width - w) // 2
-            ty = y_thumbnail + (height - h) // 2
-            grid.paste(img, (tx, ty))
-
-            if BORDER_WIDTH > 0:
-                draw.rectangle(
-                    [
-                        (tx - BORDER_WIDTH, ty - BORDER_WIDTH),
-                        (tx + w + BORDER_WIDTH - 1, ty + h + BORDER_WIDTH - 1),
-                    ],
-                    outline="gray",
-                    width=BORDER_WIDTH,
-                )
+        img = _fit_tile(img, width, height)
+        w, h = img.size
+        tx = x + (width - w) // 2
+        ty = y_thumbnail + (height - h) // 2
+        grid.paste(img, (tx, ty))
+
+        if BORDER_WIDTH > 0:
+            draw.rectangle(
+                [
+                    (tx - BORDER_WIDTH, ty - BORDER_WIDTH),
+                    (tx + w + BORDER_WIDTH - 1, ty + h + BORDER_WIDTH - 1),
+                ],
+                outline="gray",
+                width=BORDER_WIDTH,
+            )
 
     return grid
 
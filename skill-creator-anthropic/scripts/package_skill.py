@@ -11,6 +11,7 @@ Example:
 """
 
 import fnmatch
+import os
 import sys
 import zipfile
 from pathlib import Path
@@ -39,6 +40,16 @@ def should_exclude(rel_path: Path) -> bool:
     return any(fnmatch.fnmatch(name, pat) for pat in EXCLUDE_GLOBS)
 
 
+def iter_skill_files(skill_path: Path):
+    """Yield every file under skill_path, following symlinked directories."""
+    for dirpath, dirnames, filenames in os.walk(skill_path, followlinks=True):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            file_path = Path(dirpath) / filename
+            if file_path.is_file():
+                yield file_path
+
+
 def package_skill(skill_path, output_dir=None):
     """
     Package a skill folder into a .skill file.
@@ -89,10 +100,10 @@ def package_skill(skill_path, output_dir=None):
     # Create the .skill file (zip format)
     try:
         with zipfile.ZipFile(skill_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory, excluding build artifacts
-            for file_path in skill_path.rglob('*'):
-                if not file_path.is_file():
-                    continue
+            # Walk through the skill directory, excluding build artifacts.
+            # Symlinked directories (e.g. scripts/office, shared between the
+            # docx/pptx/xlsx skills) are followed so the package is self-contained.
+            for file_path in iter_skill_files(skill_path):
                 arcname = file_path.relative_to(skill_path.parent)
                 if should_exclude(arcname):
                     print(f"  Skipped: {arcname}")
@@ -2,6 +2,11 @@
 """
 ppt-maker: 精美PPT制作工具
 支持科技风设计、图文混排、HTML内容嵌入
+
+背景色写入母版，顶部色带、装饰线等固定元素只在自定义版式中绘制一次，
+每张幻灯片只包含自己的文字和图片。也可以用声明式 JSON/YAML 描述整份演示：
+
+    python ppt_maker.py --spec deck.json -o deck.pptx
 """
 
 from pptx import Presentation
@@ -9,9 +14,16 @@ from pptx.util import Inches, Pt, Emu
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.shapes.autoshape import CT_Shape
 from pptx.oxml.xmlchemy import OxmlElement
 from pptx.oxml.ns import qn
-from PIL import Image
+from pptx.parts.slide import SlideLayoutPart
+from pptx.shapes.autoshape import Shape
+from PIL import Image, ImageOps
+import copy
+import hashlib
+import json
 import os
 import sys
 import argparse
@@ -25,6 +37,200 @@ class Theme(Enum):
     CORPORATE = "corporate"  # 企业风
 
 
+IMAGE_DPI = 200
+IMAGE_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "dragon-ppt-maker", "images",
+)
+
+
+class ImagePipeline:
+    """图片预处理：只读文件头取尺寸，按显示尺寸缩小并按内容哈希缓存
+
+    尺寸按 EXIF 方向换算（手机竖拍照片），缩小时把旋转写入像素，并保留
+    ICC 色彩配置和 EXIF。同一图片以相同尺寸出现在多页时得到同一个缓存
+    文件，python-pptx 按内容去重，因此演示中只保存一份媒体 part。
+    """
+    
+    # EXIF Orientation 取这些值时图片需要旋转 90°/270°，宽高互换
+    _TRANSPOSED = (5, 6, 7, 8)
+    
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, dpi=IMAGE_DPI):
+        self.cache_dir = cache_dir
+        self.dpi = dpi
+        self._info = {}
+        self._digests = {}
+    
+    def size(self, path):
+        """返回按 EXIF 方向显示的 (宽, 高) 像素，只解析文件头"""
+        return self._image_info(path)[0]
+    
+    def prepare(self, path, width, height):
+        """返回用于嵌入的文件：显示尺寸 (EMU) 在 dpi 下所需的像素不超过原图时缩小
+
+        带 EXIF 旋转的图片总是重新编码，PowerPoint 不读取 EXIF 方向。
+        """
+        (img_width, img_height), fmt, orientation = self._image_info(path)
+        target_w = max(1, round(Emu(width).inches * self.dpi))
+        target_h = max(1, round(Emu(height).inches * self.dpi))
+        if target_w >= img_width and target_h >= img_height:
+            if orientation in (None, 1):
+                return path
+            target_w, target_h = img_width, img_height
+        
+        ext = "jpg" if fmt == "JPEG" else "png"
+        cached = os.path.join(self.cache_dir, f"{self._digest(path)}-{target_w}x{target_h}.{ext}")
+        if os.path.exists(cached):
+            return cached
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with Image.open(path) as img:
+            # JPEG 直接按比例解码；draft 作用于旋转前的像素
+            if orientation in self._TRANSPOSED:
+                img.draft("RGB", (target_h, target_w))
+            else:
+                img.draft("RGB", (target_w, target_h))
+            icc_profile = img.info.get("icc_profile")
+            img = ImageOps.exif_transpose(img)
+            exif = img.getexif()
+            if fmt == "JPEG":
+                img = img.convert("RGB")
+            elif img.mode not in ("RGB", "RGBA", "L", "LA"):
+                img = img.convert("RGBA")
+            if img.size != (target_w, target_h):
+                img = img.resize((target_w, target_h), Image.LANCZOS)
+        
+        options = {"icc_profile": icc_profile, "exif": exif.tobytes() if exif else None}
+        options = {key: value for key, value in options.items() if value}
+        temp = f"{cached}.{os.getpid()}.tmp"
+        if fmt == "JPEG":
+            img.save(temp, "JPEG", quality=90, optimize=True, **options)
+        else:
+            img.save(temp, "PNG", optimize=True, **options)
+        os.replace(temp, cached)
+        return cached
+    
+    @staticmethod
+    def _key(path):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    
+    def _image_info(self, path):
+        """((宽, 高), 格式, EXIF 方向)，按 (路径, 修改时间, 大小) 缓存"""
+        key = self._key(path)
+        if key not in self._info:
+            with Image.open(path) as img:
+                orientation = img.getexif().get(0x0112)
+                width, height = img.size
+                if orientation in self._TRANSPOSED:
+                    width, height = height, width
+                self._info[key] = ((width, height), img.format, orientation)
+        return self._info[key]
+    
+    def _digest(self, path):
+        """文件内容哈希，只在需要生成缓存文件名时计算"""
+        key = self._key(path)
+        if key not in self._digests:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            self._digests[key] = digest.hexdigest()[:32]
+        return self._digests[key]
+
+
+HTML_VIEWPORT = (1280, 519)  # 与 12.333 x 5 英寸的内容区同比例
+HTML_SCALE = 2
+HTML_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "dragon-ppt-maker", "html",
+)
+
+
+class HtmlRenderer:
+    """用常驻的无头 Chromium（Playwright）把 HTML 渲染成 PNG
+
+    浏览器在第一次渲染时启动，之后复用，每种视口保留一个页面；
+    截图按 HTML 内容哈希 + 视口缓存，相同内容不会重复渲染。
+    """
+    
+    def __init__(self, cache_dir=HTML_CACHE_DIR, scale=HTML_SCALE):
+        self.cache_dir = cache_dir
+        self.scale = scale
+        self._playwright = None
+        self._browser = None
+        self._pages = {}
+        self._available = None
+    
+    @property
+    def available(self):
+        """是否已安装 Playwright"""
+        if self._available is None:
+            try:
+                import playwright.sync_api  # noqa: F401
+                self._available = True
+            except ImportError:
+                self._available = False
+        return self._available
+    
+    def cache_path(self, html, viewport=HTML_VIEWPORT):
+        key = f"{viewport[0]}x{viewport[1]}@{self.scale}\n{html}".encode("utf-8")
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(key).hexdigest()[:32]}.png")
+    
+    def render_many(self, html_list, viewport=HTML_VIEWPORT):
+        """批量渲染，返回与 html_list 对应的 PNG 路径；只渲染缓存中没有的"""
+        paths = [self.cache_path(html, viewport) for html in html_list]
+        missing = {path: html for html, path in zip(html_list, paths) if not os.path.exists(path)}
+        if missing:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            page = self._page(viewport)
+            for path, html in missing.items():
+                page.set_content(html, wait_until="load")
+                temp = f"{path}.{os.getpid()}.tmp.png"
+                page.screenshot(path=temp)
+                os.replace(temp, path)
+        return paths
+    
+    def _page(self, viewport):
+        if self._browser is None:
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=True)
+        if viewport not in self._pages:
+            self._pages[viewport] = self._browser.new_page(
+                viewport={"width": viewport[0], "height": viewport[1]},
+                device_scale_factor=self.scale,
+            )
+        return self._pages[viewport]
+    
+    def close(self):
+        if self._browser is not None:
+            self._browser.close()
+        if self._playwright is not None:
+            self._playwright.stop()
+        self._browser = None
+        self._playwright = None
+        self._pages = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 声明式规格中 slide 的 type -> PresentationBuilder 方法
+SLIDE_TYPES = {
+    "title": "add_title_slide",
+    "content": "add_content_slide",
+    "features": "add_feature_grid",
+    "comparison": "add_comparison_slide",
+    "image": "add_image_slide",
+    "html": "add_html_snapshot",
+    "closing": "add_closing_slide",
+}
+
+
 class PresentationBuilder:
     """PPT构建器"""
     
@@ -34,6 +240,11 @@ class PresentationBuilder:
         self.prs.slide_height = Inches(7.5)
         self.theme = theme
         self._apply_theme()
+        self._layouts = {}
+        self._set_master_background()
+        self.images = ImagePipeline()
+        self.html_renderer = HtmlRenderer()
+        self._pending_snapshots = []
     
     def _apply_theme(self):
         """应用主题颜色"""
@@ -74,19 +285,79 @@ class PresentationBuilder:
                 'gradient_end': RGBColor(0, 51, 102),
             }
     
-    def _add_gradient_background(self, slide):
-        """添加渐变背景"""
-        shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, self.prs.slide_width, self.prs.slide_height)
+    def _set_master_background(self):
+        """背景色写入母版，所有版式和幻灯片继承，不再逐页添加背景矩形"""
+        fill = self.prs.slide_master.background.fill
+        fill.solid()
+        fill.fore_color.rgb = self.colors['dark']
+    
+    def _layout(self, kind):
+        """返回某类页面的自定义版式，首次使用时基于空白版式创建并绘制装饰"""
+        if kind not in self._layouts:
+            layout = self._new_layout(f"Dragon {kind.title()}")
+            width, height = self.prs.slide_width, self.prs.slide_height
+            accent = self.colors['accent']
+            
+            if kind == "title":
+                for i in range(5):
+                    self._add_layout_rect(layout, Inches(-2), Inches(1.5 + i * 0.15), Inches(3), Inches(0.05), accent)
+                if self.theme == Theme.TECH:
+                    self._add_tech_decoration(layout)
+            elif kind == "content":
+                self._add_top_bar(layout, Inches(1.0))
+            elif kind == "comparison":
+                self._add_top_bar(layout, Inches(0.9))
+                # 中间分割线
+                self._add_layout_rect(layout, Inches(6.5), Inches(1.2), Inches(0.02), Inches(6), accent)
+            elif kind == "media":
+                self._add_top_bar(layout)
+            elif kind == "closing":
+                for i in range(10):
+                    self._add_layout_rect(layout, Inches(i * 1.5), height - Inches(0.5), Inches(0.8), Inches(0.05), accent)
+            
+            self._layouts[kind] = layout
+        return self._layouts[kind]
+    
+    def _new_layout(self, name):
+        """复制空白版式为新的版式 part，并注册到母版"""
+        blank = self.prs.slide_layouts[6]
+        master = self.prs.slide_master
+        package = master.part.package
+        
+        partname = package.next_partname("/ppt/slideLayouts/slideLayout%d.xml")
+        element = copy.deepcopy(blank._element)
+        element.cSld.set("name", name)
+        part = SlideLayoutPart(partname, blank.part.content_type, package, element)
+        part.relate_to(master.part, RT.SLIDE_MASTER)
+        rId = master.part.relate_to(part, RT.SLIDE_LAYOUT)
+        
+        # 母版与版式 ID 共用同一编号空间
+        ids = [int(e.get("id")) for e in self.prs.part._element.iter(qn("p:sldMasterId"))]
+        ids += [int(e.get("id")) for e in master._element.iter(qn("p:sldLayoutId"))]
+        layout_id = OxmlElement("p:sldLayoutId")
+        layout_id.set("id", str(max(ids) + 1))
+        layout_id.set(qn("r:id"), rId)
+        master._element.get_or_add_sldLayoutIdLst().append(layout_id)
+        return part.slide_layout
+    
+    def _add_layout_rect(self, layout, x, y, width, height, color):
+        """在版式上添加无边框纯色矩形/圆形"""
+        return self._add_layout_shape(layout, "rect", x, y, width, height, color)
+    
+    def _add_layout_shape(self, layout, prst, x, y, width, height, color):
+        spTree = layout.shapes._spTree
+        shape_id = max(int(e.get("id")) for e in spTree.iter(qn("p:cNvPr"))) + 1
+        sp = CT_Shape.new_autoshape_sp(shape_id, f"Decoration {shape_id}", prst, x, y, width, height)
+        spTree.insert_element_before(sp, "p:extLst")
+        shape = Shape(sp, layout.shapes)
         shape.fill.solid()
-        shape.fill.fore_color.rgb = self.colors['dark']
+        shape.fill.fore_color.rgb = color
         shape.line.fill.background()
+        return shape
     
-    def _add_top_bar(self, slide, height=Inches(1.2)):
+    def _add_top_bar(self, layout, height=Inches(1.2)):
         """添加顶部色带"""
-        shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, self.prs.slide_width, height)
-        shape.fill.solid()
-        shape.fill.fore_color.rgb = self.colors['primary']
-        shape.line.fill.background()
+        return self._add_layout_rect(layout, 0, 0, self.prs.slide_width, height, self.colors['primary'])
     
     def _add_title_text(self, slide, text, x, y, width, height, font_size=36, bold=True, color=None):
         """添加标题文本"""
@@ -102,19 +373,8 @@ class PresentationBuilder:
     
     def add_title_slide(self, title, subtitle="", bg_image=None):
         """添加标题页"""
-        slide_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        # 背景
-        self._add_gradient_background(slide)
-        
-        # 添加装饰线条
-        for i in range(5):
-            y = Inches(1.5 + i * 0.15)
-            shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(-2), y, Inches(3), Inches(0.05))
-            shape.fill.solid()
-            shape.fill.fore_color.rgb = self.colors['accent']
-            shape.line.fill.background()
+        # 背景、装饰线条与科技感装饰都在版式中
+        slide = self.prs.slides.add_slide(self._layout("title"))
         
         # 标题
         title_box = slide.shapes.add_textbox(Inches(1), Inches(2.5), Inches(11), Inches(1.5))
@@ -137,39 +397,23 @@ class PresentationBuilder:
             p.font.color.rgb = self.colors['accent']
             p.alignment = PP_ALIGN.LEFT
         
-        # 底部信息
-        if self.theme == Theme.TECH:
-            self._add_tech_decoration(slide)
-        
         return slide
     
-    def _add_tech_decoration(self, slide):
+    def _add_tech_decoration(self, layout):
         """添加科技感装饰"""
         # 底部装饰线
-        shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, self.prs.slide_height - Inches(0.1), self.prs.slide_width, Inches(0.1))
-        shape.fill.solid()
-        shape.fill.fore_color.rgb = self.colors['accent']
-        shape.line.fill.background()
+        self._add_layout_rect(layout, 0, self.prs.slide_height - Inches(0.1), self.prs.slide_width, Inches(0.1), self.colors['accent'])
         
         # 右侧装饰点
         for i in range(8):
             x = self.prs.slide_width - Inches(0.5 + i * 0.3)
             y = self.prs.slide_height - Inches(0.8 - i * 0.08)
-            shape = slide.shapes.add_shape(MSO_SHAPE.OVAL, x, y, Inches(0.15), Inches(0.15))
-            shape.fill.solid()
-            shape.fill.fore_color.rgb = self.colors['accent']
-            shape.line.fill.background()
+            self._add_layout_shape(layout, "ellipse", x, y, Inches(0.15), Inches(0.15), self.colors['accent'])
     
     def add_content_slide(self, title, bullets, icon="", description=""):
         """添加内容页"""
-        slide_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        # 背景
-        self._add_gradient_background(slide)
-        
-        # 顶部色带
-        self._add_top_bar(slide, Inches(1.0))
+        # 背景与顶部色带在版式中
+        slide = self.prs.slides.add_slide(self._layout("content"))
         
         # 标题
         title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.25), Inches(12), Inches(0.6))
@@ -210,11 +454,7 @@ class PresentationBuilder:
     
     def add_feature_grid(self, features, title="核心功能"):
         """添加特性网格页"""
-        slide_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        # 背景
-        self._add_gradient_background(slide)
+        slide = self.prs.slides.add_slide(self._layout("blank"))
         
         # 标题
         title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(12), Inches(0.7))
@@ -279,14 +519,10 @@ class PresentationBuilder:
     
     def add_comparison_slide(self, title, left_title, left_items, right_title, right_items):
         """添加对比页"""
-        slide_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        # 背景
-        self._add_gradient_background(slide)
+        # 背景、顶部色带与中间分割线在版式中
+        slide = self.prs.slides.add_slide(self._layout("comparison"))
         
         # 标题
-        self._add_top_bar(slide, Inches(0.9))
         self._add_title_text(slide, f"[VS] {title}", Inches(0.5), Inches(0.2), Inches(12), Inches(0.5), font_size=32)
         
         # 左侧
@@ -325,42 +561,32 @@ class PresentationBuilder:
             p.font.color.rgb = self.colors['text']
             p.space_after = Pt(12)
         
-        # 中间分割线
-        shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(6.5), Inches(1.2), Inches(0.02), Inches(6))
-        shape.fill.solid()
-        shape.fill.fore_color.rgb = self.colors['accent']
-        shape.line.fill.background()
-        
         return slide
     
     def add_image_slide(self, title, image_path, description=""):
         """添加图片页"""
-        slide_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        # 背景
-        self._add_gradient_background(slide)
+        slide = self.prs.slides.add_slide(self._layout("media"))
         
         # 标题
-        self._add_top_bar(slide)
         self._add_title_text(slide, title, Inches(0.5), Inches(0.3), Inches(12), Inches(0.6), font_size=36)
         
         # 图片
         if os.path.exists(image_path):
-            # 计算图片尺寸，保持比例
-            img = Image.open(image_path)
-            img_width, img_height = img.size
+            # 计算图片尺寸，保持比例（EMU）
+            img_width, img_height = self.images.size(image_path)
             max_width = Inches(12)
             max_height = Inches(5.5)
             
-            ratio = min(max_width.inches / img_width, max_height.inches / img_height)
-            final_width = img_width * ratio
-            final_height = img_height * ratio
+            ratio = min(max_width / img_width, max_height / img_height)
+            final_width = Emu(round(img_width * ratio))
+            final_height = Emu(round(img_height * ratio))
             
-            x = (self.prs.slide_width - final_width) / 2
+            x = (self.prs.slide_width - final_width) // 2
             y = Inches(1.5)
             
-            slide.shapes.add_picture(image_path, x, y, width=final_width)
+            # 按显示尺寸缩小后的图片（有缓存）；相同图片只嵌入一次
+            picture = self.images.prepare(image_path, final_width, final_height)
+            slide.shapes.add_picture(picture, x, y, width=final_width, height=final_height)
         
         # 描述
         if description:
@@ -376,20 +602,52 @@ class PresentationBuilder:
     
     def add_html_snapshot(self, title, html_content, description=""):
         """
-        添加HTML内容（通过内嵌文本模拟）
-        注意：完整的HTML嵌入需要额外处理，这里提供文本摘要展示
+        添加HTML内容：用无头浏览器渲染成截图
+        所有截图在 render_snapshots()/save() 时用同一个浏览器会话批量渲染；
+        未安装 Playwright 时退回为文本摘要展示
         """
-        slide_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        # 背景
-        self._add_gradient_background(slide)
+        slide = self.prs.slides.add_slide(self._layout("media"))
         
         # 标题
-        self._add_top_bar(slide)
         self._add_title_text(slide, f"[Web] {title}", Inches(0.5), Inches(0.3), Inches(12), Inches(0.6), font_size=32)
         
-        # 代码/内容框
+        if self.html_renderer.available:
+            self._pending_snapshots.append((slide, html_content))
+        else:
+            self._add_html_preview(slide, html_content)
+        
+        if description:
+            desc_box = slide.shapes.add_textbox(Inches(0.5), Inches(6.5), Inches(12), Inches(0.5))
+            tf = desc_box.text_frame
+            p = tf.paragraphs[0]
+            p.text = description
+            p.font.size = Pt(14)
+            p.font.color.rgb = RGBColor(180, 200, 220)
+        
+        return slide
+    
+    def render_snapshots(self):
+        """批量渲染所有待处理的 HTML 截图并插入幻灯片"""
+        if not self._pending_snapshots:
+            return
+        from playwright.sync_api import Error as PlaywrightError
+        
+        slides, html_list = zip(*self._pending_snapshots)
+        self._pending_snapshots = []
+        try:
+            with self.html_renderer:
+                paths = self.html_renderer.render_many(list(html_list))
+        except PlaywrightError as e:
+            # 已安装 Playwright 但浏览器无法启动（如未执行 playwright install chromium）
+            print(f"[Warn] HTML 截图失败，改为文本摘要: {e}", file=sys.stderr)
+            for slide, html_content in zip(slides, html_list):
+                self._add_html_preview(slide, html_content)
+            return
+        for slide, path in zip(slides, paths):
+            slide.shapes.add_picture(path, Inches(0.5), Inches(1.3), Inches(12.333), Inches(5))
+    
+    def _add_html_preview(self, slide, html_content):
+        """文本摘要展示（无浏览器时）"""
         code_box = slide.shapes.add_textbox(Inches(0.5), Inches(1.3), Inches(12.333), Inches(5))
         tf = code_box.text_frame
         tf.word_wrap = True
@@ -401,33 +659,11 @@ class PresentationBuilder:
         p.font.size = Pt(12)
         p.font.name = "Consolas"
         p.font.color.rgb = RGBColor(0, 255, 180)
-        
-        if description:
-            desc_box = slide.shapes.add_textbox(Inches(0.5), Inches(6.5), Inches(12), Inches(0.5))
-            tf = desc_box.text_frame
-            p = tf.paragraphs[0]
-            p.text = description
-            p.font.size = Pt(14)
-            p.font.color.rgb = RGBColor(180, 200, 220)
-        
-        return slide
     
     def add_closing_slide(self, title, subtitle=""):
         """添加结束页"""
-        slide_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(slide_layout)
-        
-        # 背景
-        self._add_gradient_background(slide)
-        
-        # 装饰
-        for i in range(10):
-            x = Inches(i * 1.5)
-            y = self.prs.slide_height - Inches(0.5)
-            shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, x, y, Inches(0.8), Inches(0.05))
-            shape.fill.solid()
-            shape.fill.fore_color.rgb = self.colors['accent']
-            shape.line.fill.background()
+        # 背景与底部装饰在版式中
+        slide = self.prs.slides.add_slide(self._layout("closing"))
         
         # 标题
         title_box = slide.shapes.add_textbox(0, Inches(3), self.prs.slide_width, Inches(1))
@@ -453,10 +689,45 @@ class PresentationBuilder:
     
     def save(self, filename):
         """保存PPT"""
+        self.render_snapshots()
         self.prs.save(filename)
         print(f"[OK] PPT已保存: {filename}")
 
 
+def load_spec(path):
+    """读取 JSON 或 YAML 格式的演示规格"""
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("读取 YAML 规格需要 PyYAML: pip install pyyaml")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def build_from_spec(spec):
+    """按声明式规格生成演示
+
+    spec 格式:
+        {"theme": "tech",
+         "slides": [{"type": "title", "title": "...", "subtitle": "..."},
+                    {"type": "content", "title": "...", "bullets": ["..."]},
+                    {"type": "features", "title": "...", "features": [["标题", "描述"]]},
+                    ...]}
+    除 type 外的字段原样作为对应 add_* 方法的参数，type 见 SLIDE_TYPES。
+    """
+    theme = Theme(spec.get("theme", "tech"))
+    builder = PresentationBuilder(theme=theme)
+    for i, slide in enumerate(spec.get("slides", []), 1):
+        fields = dict(slide)
+        slide_type = fields.pop("type", None)
+        if slide_type not in SLIDE_TYPES:
+            raise ValueError(f"第 {i} 页: 未知类型 {slide_type!r}，可选: {', '.join(SLIDE_TYPES)}")
+        getattr(builder, SLIDE_TYPES[slide_type])(**fields)
+    return builder
+
+
 def create_openclow_presentation():
     """创建OpenClaw介绍PPT（科技风）"""
     prs = PresentationBuilder(theme=Theme.TECH)
@@ -576,10 +847,21 @@ if __name__ == "__main__":
     parser.add_argument("--output", "-o", help="输出文件")
     parser.add_argument("--theme", default="tech", choices=["tech", "modern", "corporate"])
     parser.add_argument("--openclaw", action="store_true", help="生成OpenClaw介绍PPT")
+    parser.add_argument("--spec", help="声明式演示规格文件（.json / .yaml）")
     
     args = parser.parse_args()
     
-    if args.openclaw:
+    if args.spec:
+        try:
+            spec = load_spec(args.spec)
+            prs = build_from_spec(spec)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[Error] {e}")
+            sys.exit(1)
+        output = args.output or spec.get("output") or "output.pptx"
+        prs.save(output)
+        print(f"\n[Done] PPT已生成: {output}（{len(prs.prs.slides)} 页）")
+    elif args.openclaw:
         output = create_openclow_presentation()
         print(f"\n[Done] OpenClaw 科技风 PPT 已生成: {output}")
     elif args.title and args.content:
@@ -591,5 +873,6 @@ if __name__ == "__main__":
         prs.save(output)
         print(f"\n[Done] PPT已生成: {output}")
     else:
-        print("使用 --openclaw 生成OpenClaw介绍，或使用 --title --content 指定内容")
+        print("使用 --openclaw 生成OpenClaw介绍，--spec 指定演示规格，或使用 --title --content 指定内容")
         print("示例: python ppt_maker.py -t '标题' -c '要点1|要点2|要点3' -o demo.pptx")
+        print("示例: python ppt_maker.py --spec deck.json -o deck.pptx")
@@ -0,0 +1,1124 @@
+"""
+In-process formula recalculation for small edits to Excel files.
+
+Builds a cell dependency graph from the workbook, applies edits to input
+cells, and re-evaluates only the formulas that depend on them. Supports
+arithmetic, comparison and concatenation operators, cross-sheet references,
+and SUM, AVERAGE, MIN, MAX, COUNT, ROUND, ABS, IF, IFERROR, VLOOKUP, INDEX
+and MATCH. Anything else falls back to a full LibreOffice recalculation via
+recalc.py.
+
+Usage:
+    python formula_graph.py <excel_file> --set 'Inputs!B2=42' [--set ...] [--output <file>]
+
+Example:
+    python formula_graph.py model.xlsx --set 'Inputs!B2=0.07' --set 'Inputs!B3=Base'
+"""
+
+import argparse
+import bisect
+import datetime
+import decimal
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+
+import lxml.etree
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.datetime import to_excel
+
+from recalc import check_workbook, recalc, worksheet_parts
+
+SPREADSHEET_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+ERROR_CODES = ("#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A")
+
+# Sheet limits; whole-row and whole-column references extend to these
+MAX_ROW = 1048576
+MAX_COL = 16384
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<string>"(?:[^"]|"")*")
+    |(?P<error>\#NULL!|\#DIV/0!|\#VALUE!|\#REF!|\#NAME\?|\#NUM!|\#N/A)
+    |(?P<func>(?:_xlfn\.)?[A-Za-z][A-Za-z0-9.]*(?=\())
+    |(?P<ref>
+        (?:(?:'(?:[^']|'')+'|[A-Za-z_][\w.]*)!)?
+        (?:
+            \$?[A-Za-z]{1,3}\$?[0-9]+(?::\$?[A-Za-z]{1,3}\$?[0-9]+)?
+            |\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}
+            |\$?[0-9]+:\$?[0-9]+
+        )
+    )(?![\w(!])
+    |(?P<bool>TRUE|FALSE)(?![\w(])
+    |(?P<number>(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)
+    |(?P<op><=|>=|<>|[-+*/^&%=<>(),])
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+_COMPARISON_OPS = {"=", "<>", "<", ">", "<=", ">="}
+
+_DYNAMIC_FUNCTIONS = {"INDIRECT", "OFFSET"}
+
+
+class ExcelError(Exception):
+    """An Excel error value such as #DIV/0!.
+
+    Raised while evaluating a formula and stored as the cell's value once
+    the formula completes, so errors propagate the way Excel's do.
+    """
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __repr__(self):
+        return self.code
+
+
+class UnsupportedFormula(Exception):
+    pass
+
+
+class _Range:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def values(self):
+        for row in self.rows:
+            yield from row
+
+
+class _RangeIndex:
+    """Range precedents on one sheet, for finding the ranges containing a cell.
+
+    Ranges are grouped by column span, then by row span, and identical
+    ranges share one entry. Workbooks tend to reuse a few column spans
+    (A:A, $B$2:$B$100), so a lookup checks those spans and bisects the
+    row spans under each instead of testing every registered range.
+    """
+
+    def __init__(self):
+        self._spans = {}
+        self._sorted = {}
+
+    def add(self, r1, c1, r2, c2, key):
+        rows = self._spans.setdefault((c1, c2), {})
+        rows.setdefault((r1, r2), set()).add(key)
+        self._sorted.pop((c1, c2), None)
+
+    def find(self, row, col):
+        for span, rows in self._spans.items():
+            if not span[0] <= col <= span[1]:
+                continue
+            intervals = self._sorted.get(span)
+            if intervals is None:
+                intervals = self._sorted[span] = sorted(rows)
+            for i in range(bisect.bisect_right(intervals, (row, MAX_ROW))):
+                if intervals[i][1] >= row:
+                    yield rows[intervals[i]]
+
+
+class _CellIndex:
+    """A set of cell keys grouped by sheet and column, for range queries."""
+
+    def __init__(self, keys):
+        self._columns = {}
+        for sheet, row, col in keys:
+            self._columns.setdefault(sheet, {}).setdefault(col, []).append(row)
+        for columns in self._columns.values():
+            for rows in columns.values():
+                rows.sort()
+        self._order = {sheet: sorted(columns) for sheet, columns in self._columns.items()}
+
+    def within(self, sheet, r1, c1, r2, c2):
+        columns = self._columns.get(sheet)
+        if not columns:
+            return
+        order = self._order[sheet]
+        for i in range(bisect.bisect_left(order, c1), bisect.bisect_right(order, c2)):
+            col = order[i]
+            rows = columns[col]
+            for j in range(bisect.bisect_left(rows, r1), bisect.bisect_right(rows, r2)):
+                yield (sheet, rows[j], col)
+
+
+class FormulaGraph:
+    """Dependency graph and evaluator for the formulas in one workbook."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.values = {}
+        self.formulas = {}
+        self.unsupported = set()
+        self.needs_fallback = False
+        self.edits = {}
+        self._recalculated = set()
+        self._sheet_names = {}
+        self._bounds = {}
+        self._precedents = {}
+        self._cell_dependents = {}
+        self._range_dependents = {}
+        self._dirty = set()
+        self._load()
+
+    def _load(self):
+        wb = load_workbook(self.filename, read_only=True, data_only=True)
+        for ws in wb.worksheets:
+            self._sheet_names[ws.title.lower()] = ws.title
+            max_row = max_col = 0
+            for row in ws.iter_rows():
+                for cell in row:
+                    if cell.value is None:
+                        continue
+                    self.values[(ws.title, cell.row, cell.column)] = _from_cell(cell)
+                    max_row = max(max_row, cell.row)
+                    max_col = max(max_col, cell.column)
+            self._bounds[ws.title] = (max_row, max_col)
+        wb.close()
+
+        wb = load_workbook(self.filename, read_only=True, data_only=False)
+        for ws in wb.worksheets:
+            max_row, max_col = self._bounds[ws.title]
+            for row in ws.iter_rows():
+                for cell in row:
+                    if cell.value is None:
+                        continue
+                    max_row = max(max_row, cell.row)
+                    max_col = max(max_col, cell.column)
+                    if cell.data_type != "f":
+                        continue
+                    key = (ws.title, cell.row, cell.column)
+                    self._add_formula(key, cell.value)
+                    if self.values.get(key) is None:
+                        self._dirty.add(key)
+            self._bounds[ws.title] = (max_row, max_col)
+        wb.close()
+
+        self._has_opaque_formulas = any(p is None for p in self._precedents.values())
+
+    def _add_formula(self, key, formula):
+        if not isinstance(formula, str):
+            self.unsupported.add(key)
+            self._precedents[key] = None
+            return
+
+        try:
+            node = _Parser(formula[1:], key[0], self).parse()
+        except UnsupportedFormula:
+            self.unsupported.add(key)
+            self._precedents[key] = None
+            return
+
+        if _calls_any(node, _DYNAMIC_FUNCTIONS):
+            self.unsupported.add(key)
+            self._precedents[key] = None
+            return
+
+        precedents = []
+        try:
+            self.formulas[key] = self._compile(node, precedents)
+        except UnsupportedFormula:
+            self.unsupported.add(key)
+        self._precedents[key] = precedents
+
+        for sheet, r1, c1, r2, c2 in precedents:
+            if r1 == r2 and c1 == c2:
+                self._cell_dependents.setdefault((sheet, r1, c1), set()).add(key)
+            else:
+                if sheet not in self._range_dependents:
+                    self._range_dependents[sheet] = _RangeIndex()
+                self._range_dependents[sheet].add(r1, c1, r2, c2, key)
+
+    def set_value(self, ref, value):
+        sheet, row, col = self._parse_cell_ref(ref)
+        key = (sheet, row, col)
+        if key in self._precedents:
+            raise ValueError(f"{ref} contains a formula; only input cells can be set")
+        if isinstance(value, str) and value.startswith("="):
+            raise ValueError(f"Setting formulas is not supported ({ref})")
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            value = to_excel(value)
+
+        self.values[key] = value
+        self.edits[key] = value
+        max_row, max_col = self._bounds[sheet]
+        self._bounds[sheet] = (max(max_row, row), max(max_col, col))
+        self._dirty.update(self._dependents(key))
+
+        if self._has_opaque_formulas:
+            self.needs_fallback = True
+
+    def recalculate(self):
+        """Re-evaluate every formula downstream of the edits.
+
+        Returns a mapping of "Sheet!A1" references to their new values.
+        Sets needs_fallback instead if the affected subgraph contains an
+        unsupported formula or a circular reference.
+        """
+        dirty = set()
+        pending = list(self._dirty)
+        while pending:
+            key = pending.pop()
+            if key in dirty:
+                continue
+            dirty.add(key)
+            pending.extend(self._dependents(key))
+        self._dirty.clear()
+
+        if dirty & self.unsupported:
+            self.needs_fallback = True
+            return {}
+
+        try:
+            order = self._topological_order(dirty)
+        except UnsupportedFormula:
+            self.needs_fallback = True
+            return {}
+
+        changed = {}
+        for key in order:
+            try:
+                value = self.formulas[key]()
+                if isinstance(value, _Range):
+                    raise ExcelError("#VALUE!")
+            except ExcelError as e:
+                value = e
+            if value is None:
+                value = 0
+            self.values[key] = value
+            changed[key] = value
+        self._recalculated.update(changed)
+
+        return {_format_key(key): value for key, value in changed.items()}
+
+    def save(self, output=None):
+        updates = {}
+        for key, value in self.edits.items():
+            updates.setdefault(key[0], {})[key] = value
+        if not self.needs_fallback:
+            for key in self._recalculated:
+                updates.setdefault(key[0], {})[key] = self.values[key]
+        _write_cells(self.filename, output or self.filename, updates)
+
+    def _dependents(self, key):
+        sheet, row, col = key
+        found = set(self._cell_dependents.get(key, ()))
+        ranges = self._range_dependents.get(sheet)
+        if ranges is not None:
+            for dependents in ranges.find(row, col):
+                found.update(dependents)
+        return found
+
+    def _topological_order(self, dirty):
+        order = []
+        state = {}
+        index = _CellIndex(dirty)
+        for start in dirty:
+            if start in state:
+                continue
+            stack = [(start, iter(self._dirty_precedents(start, dirty, index)))]
+            state[start] = "visiting"
+            while stack:
+                key, children = stack[-1]
+                for child in children:
+                    if state.get(child) == "visiting":
+                        raise UnsupportedFormula("Circular reference")
+                    if child not in state:
+                        state[child] = "visiting"
+                        stack.append(
+                            (child, iter(self._dirty_precedents(child, dirty, index)))
+                        )
+                        break
+                else:
+                    stack.pop()
+                    state[key] = "done"
+                    order.append(key)
+        return order
+
+    def _dirty_precedents(self, key, dirty, index):
+        for sheet, r1, c1, r2, c2 in self._precedents[key]:
+            if r1 == r2 and c1 == c2:
+                if (sheet, r1, c1) in dirty:
+                    yield (sheet, r1, c1)
+                continue
+            yield from index.within(sheet, r1, c1, r2, c2)
+
+    def _parse_cell_ref(self, ref):
+        sheet, _, cell = ref.rpartition("!")
+        try:
+            sheet = self.resolve_sheet(sheet.strip("'").replace("''", "'") or None, None)
+        except UnsupportedFormula as e:
+            raise ValueError(str(e)) from None
+        match = re.fullmatch(r"\$?([A-Za-z]{1,3})\$?([0-9]+)", cell)
+        if not match:
+            raise ValueError(f"Invalid cell reference: {ref}")
+        return sheet, int(match.group(2)), column_index_from_string(match.group(1).upper())
+
+    def resolve_sheet(self, name, default):
+        if name is None:
+            if default is None:
+                raise ValueError("Cell references must include a sheet name")
+            return default
+        try:
+            return self._sheet_names[name.lower()]
+        except KeyError:
+            raise UnsupportedFormula(f"Unknown sheet {name}") from None
+
+    def _compile(self, node, precedents):
+        kind = node[0]
+
+        if kind == "const":
+            value = node[1]
+            if isinstance(value, ExcelError):
+
+                def raise_error():
+                    raise value
+
+                return raise_error
+            return lambda: value
+
+        if kind == "ref":
+            _, sheet, r1, c1, r2, c2 = node
+            precedents.append((sheet, r1, c1, r2, c2))
+            values = self.values
+            if r1 == r2 and c1 == c2:
+                key = (sheet, r1, c1)
+
+                def cell_value():
+                    value = values.get(key)
+                    if isinstance(value, ExcelError):
+                        raise value
+                    return value
+
+                # SUM, COUNT and friends skip text and bools read from cells
+                cell_value.is_reference = True
+                return cell_value
+
+            bounds = self._bounds
+
+            def range_value():
+                # Whole rows and columns stop at the sheet's current used range
+                max_row, max_col = bounds[sheet]
+                last_row = r2 if r2 < MAX_ROW else max(r1, max_row)
+                last_col = c2 if c2 < MAX_COL else max(c1, max_col)
+                return _Range(
+                    [
+                        [values.get((sheet, r, c)) for c in range(c1, last_col + 1)]
+                        for r in range(r1, last_row + 1)
+                    ]
+                )
+
+            return range_value
+
+        if kind == "neg":
+            operand = self._compile(node[1], precedents)
+            return lambda: -_to_number(operand())
+
+        if kind == "percent":
+            operand = self._compile(node[1], precedents)
+            return lambda: _to_number(operand()) / 100
+
+        if kind == "binop":
+            _, op, left_node, right_node = node
+            left = self._compile(left_node, precedents)
+            right = self._compile(right_node, precedents)
+            return _binary_operator(op, left, right)
+
+        if kind == "func":
+            _, name, arg_nodes = node
+            args = [self._compile(arg, precedents) for arg in arg_nodes]
+            if name not in _FUNCTIONS:
+                raise UnsupportedFormula(f"Unsupported function {name}")
+            return _FUNCTIONS[name](args)
+
+        raise UnsupportedFormula(f"Unknown node {kind}")
+
+
+class _Parser:
+    def __init__(self, formula, sheet, graph):
+        self.tokens = list(_tokenize(formula))
+        self.pos = 0
+        self.sheet = sheet
+        self.graph = graph
+
+    def parse(self):
+        node = self._comparison()
+        if self.pos != len(self.tokens):
+            raise UnsupportedFormula("Unexpected trailing tokens")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self):
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _expect(self, value):
+        kind, text = self._take()
+        if kind != "op" or text != value:
+            raise UnsupportedFormula(f"Expected {value!r}")
+
+    def _comparison(self):
+        node = self._concat()
+        while self._peek()[0] == "op" and self._peek()[1] in _COMPARISON_OPS:
+            op = self._take()[1]
+            node = ("binop", op, node, self._concat())
+        return node
+
+    def _concat(self):
+        node = self._additive()
+        while self._peek() == ("op", "&"):
+            self._take()
+            node = ("binop", "&", node, self._additive())
+        return node
+
+    def _additive(self):
+        node = self._multiplicative()
+        while self._peek()[0] == "op" and self._peek()[1] in "+-":
+            op = self._take()[1]
+            node = ("binop", op, node, self._multiplicative())
+        return node
+
+    def _multiplicative(self):
+        node = self._power()
+        while self._peek()[0] == "op" and self._peek()[1] in "*/":
+            op = self._take()[1]
+            node = ("binop", op, node, self._power())
+        return node
+
+    def _power(self):
+        node = self._unary()
+        while self._peek() == ("op", "^"):
+            self._take()
+            node = ("binop", "^", node, self._unary())
+        return node
+
+    def _unary(self):
+        if self._peek() == ("op", "-"):
+            self._take()
+            return ("neg", self._unary())
+        if self._peek() == ("op", "+"):
+            self._take()
+            return self._unary()
+        return self._percent()
+
+    def _percent(self):
+        node = self._primary()
+        while self._peek() == ("op", "%"):
+            self._take()
+            node = ("percent", node)
+        return node
+
+    def _primary(self):
+        kind, text = self._take()
+
+        if kind == "number":
+            value = float(text)
+            return ("const", int(value) if value.is_integer() else value)
+        if kind == "string":
+            return ("const", text[1:-1].replace('""', '"'))
+        if kind == "bool":
+            return ("const", text.upper() == "TRUE")
+        if kind == "error":
+            return ("const", ExcelError(text.upper()))
+        if kind == "ref":
+            return self._reference(text)
+        if kind == "func":
+            name = text.upper()
+            if name.startswith("_XLFN."):
+                name = name[len("_XLFN.") :]
+            self._expect("(")
+            args = []
+            if self._peek() != ("op", ")"):
+                while True:
+                    args.append(self._comparison())
+                    if self._peek() != ("op", ","):
+                        break
+                    self._take()
+            self._expect(")")
+            return ("func", name, args)
+        if kind == "op" and text == "(":
+            node = self._comparison()
+            self._expect(")")
+            return node
+
+        raise UnsupportedFormula(f"Unexpected token {text!r}")
+
+    def _reference(self, text):
+        sheet_name, _, area = text.rpartition("!")
+        if sheet_name.startswith("'"):
+            sheet_name = sheet_name[1:-1].replace("''", "'")
+        sheet = self.graph.resolve_sheet(sheet_name or None, self.sheet)
+
+        start, _, end = area.replace("$", "").upper().partition(":")
+        end = end or start
+
+        if start.isalpha():
+            c1, c2 = column_index_from_string(start), column_index_from_string(end)
+            r1, r2 = 1, MAX_ROW
+        elif start.isdigit():
+            r1, r2 = int(start), int(end)
+            c1, c2 = 1, MAX_COL
+        else:
+            c1, r1 = _split_cell(start)
+            c2, r2 = _split_cell(end)
+
+        return ("ref", sheet, min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+
+
+def _calls_any(node, names):
+    if node[0] == "func":
+        return node[1] in names or any(_calls_any(arg, names) for arg in node[2])
+    if node[0] == "binop":
+        return _calls_any(node[2], names) or _calls_any(node[3], names)
+    if node[0] in ("neg", "percent"):
+        return _calls_any(node[1], names)
+    return False
+
+
+def _tokenize(formula):
+    pos = 0
+    while pos < len(formula):
+        match = _TOKEN_RE.match(formula, pos)
+        if not match:
+            raise UnsupportedFormula(f"Cannot parse formula near {formula[pos:]!r}")
+        pos = match.end()
+        if match.lastgroup != "ws":
+            yield match.lastgroup, match.group()
+
+
+def _split_cell(ref):
+    match = re.fullmatch(r"([A-Z]{1,3})([0-9]+)", ref)
+    return column_index_from_string(match.group(1)), int(match.group(2))
+
+
+def _from_cell(cell):
+    value = cell.value
+    if cell.data_type == "e" and value in ERROR_CODES:
+        return ExcelError(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return to_excel(value)
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds() / 86400
+    return value
+
+
+def _format_key(key):
+    sheet, row, col = key
+    return f"{sheet}!{get_column_letter(col)}{row}"
+
+
+def _to_number(value):
+    if isinstance(value, _Range):
+        raise ExcelError("#VALUE!")
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ExcelError("#VALUE!") from None
+
+
+def _to_text(value):
+    if isinstance(value, _Range):
+        raise ExcelError("#VALUE!")
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else format(value, ".15g")
+    return str(value)
+
+
+def _to_bool(value):
+    if isinstance(value, _Range):
+        raise ExcelError("#VALUE!")
+    if isinstance(value, str):
+        if value.upper() in ("TRUE", "FALSE"):
+            return value.upper() == "TRUE"
+        raise ExcelError("#VALUE!")
+    return bool(_to_number(value))
+
+
+def _type_rank(value):
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def _compare(left, right):
+    if left is None:
+        left = "" if isinstance(right, str) else 0
+    if right is None:
+        right = "" if isinstance(left, str) else 0
+    if _type_rank(left) != _type_rank(right):
+        return -1 if _type_rank(left) < _type_rank(right) else 1
+    if isinstance(left, str):
+        left, right = left.lower(), right.lower()
+    return (left > right) - (left < right)
+
+
+def _binary_operator(op, left, right):
+    if op == "+":
+        return lambda: _to_number(left()) + _to_number(right())
+    if op == "-":
+        return lambda: _to_number(left()) - _to_number(right())
+    if op == "*":
+        return lambda: _to_number(left()) * _to_number(right())
+    if op == "/":
+
+        def divide():
+            numerator, denominator = _to_number(left()), _to_number(right())
+            if denominator == 0:
+                raise ExcelError("#DIV/0!")
+            return numerator / denominator
+
+        return divide
+    if op == "^":
+
+        def power():
+            try:
+                result = _to_number(left()) ** _to_number(right())
+            except (ZeroDivisionError, OverflowError):
+                raise ExcelError("#NUM!") from None
+            if isinstance(result, complex):
+                raise ExcelError("#NUM!")
+            return result
+
+        return power
+    if op == "&":
+        return lambda: _to_text(left()) + _to_text(right())
+
+    checks = {
+        "=": lambda c: c == 0,
+        "<>": lambda c: c != 0,
+        "<": lambda c: c < 0,
+        ">": lambda c: c > 0,
+        "<=": lambda c: c <= 0,
+        ">=": lambda c: c >= 0,
+    }
+    check = checks[op]
+
+    def compare():
+        left_value, right_value = left(), right()
+        if isinstance(left_value, _Range) or isinstance(right_value, _Range):
+            raise ExcelError("#VALUE!")
+        return check(_compare(left_value, right_value))
+
+    return compare
+
+
+def _numbers(args):
+    for arg in args:
+        value = arg()
+        if isinstance(value, _Range):
+            for item in value.values():
+                if isinstance(item, ExcelError):
+                    raise item
+                if isinstance(item, (int, float)) and not isinstance(item, bool):
+                    yield item
+        elif getattr(arg, "is_reference", False):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield value
+        else:
+            yield _to_number(value)
+
+
+def _fn_sum(args):
+    return lambda: sum(_numbers(args))
+
+
+def _fn_average(args):
+    def average():
+        values = list(_numbers(args))
+        if not values:
+            raise ExcelError("#DIV/0!")
+        return sum(values) / len(values)
+
+    return average
+
+
+def _fn_min(args):
+    return lambda: min(_numbers(args), default=0)
+
+
+def _fn_max(args):
+    return lambda: max(_numbers(args), default=0)
+
+
+def _fn_count(args):
+    def count():
+        total = 0
+        for arg in args:
+            try:
+                value = arg()
+            except ExcelError:
+                continue
+            if isinstance(value, _Range):
+                total += sum(
+                    1
+                    for item in value.values()
+                    if isinstance(item, (int, float)) and not isinstance(item, bool)
+                )
+            elif getattr(arg, "is_reference", False):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    total += 1
+            elif isinstance(value, (int, float)):
+                total += 1
+        return total
+
+    return count
+
+
+def _fn_round(args):
+    if len(args) != 2:
+        raise UnsupportedFormula("ROUND takes two arguments")
+
+    def round_half_away():
+        value, digits = _to_number(args[0]()), int(_to_number(args[1]()))
+        # Round the shortest decimal form, so 2.675 rounds up as it does in Excel
+        try:
+            rounded = decimal.Decimal(repr(value)).quantize(
+                decimal.Decimal(1).scaleb(-digits), rounding=decimal.ROUND_HALF_UP
+            )
+        except decimal.InvalidOperation:
+            # More digits requested than the value carries
+            return value
+        return float(rounded)
+
+    return round_half_away
+
+
+def _fn_abs(args):
+    if len(args) != 1:
+        raise UnsupportedFormula("ABS takes one argument")
+    return lambda: abs(_to_number(args[0]()))
+
+
+def _fn_if(args):
+    if not 1 <= len(args) <= 3:
+        raise UnsupportedFormula("IF takes one to three arguments")
+
+    def if_():
+        if _to_bool(args[0]()):
+            return args[1]() if len(args) > 1 else True
+        return args[2]() if len(args) > 2 else False
+
+    return if_
+
+
+def _fn_iferror(args):
+    if len(args) != 2:
+        raise UnsupportedFormula("IFERROR takes two arguments")
+
+    def iferror():
+        try:
+            value = args[0]()
+        except ExcelError:
+            return args[1]()
+        return value
+
+    return iferror
+
+
+def _lookup_position(lookup, candidates, match_type):
+    if match_type == 0:
+        for i, candidate in enumerate(candidates):
+            if candidate is not None and _type_rank(candidate) == _type_rank(lookup):
+                if _compare(candidate, lookup) == 0:
+                    return i
+        raise ExcelError("#N/A")
+
+    best = None
+    for i, candidate in enumerate(candidates):
+        if candidate is None or _type_rank(candidate) != _type_rank(lookup):
+            continue
+        order = _compare(candidate, lookup)
+        if (match_type > 0 and order <= 0) or (match_type < 0 and order >= 0):
+            best = i
+        else:
+            break
+    if best is None:
+        raise ExcelError("#N/A")
+    return best
+
+
+def _fn_vlookup(args):
+    if not 3 <= len(args) <= 4:
+        raise UnsupportedFormula("VLOOKUP takes three or four arguments")
+
+    def vlookup():
+        lookup, table = args[0](), args[1]()
+        column = int(_to_number(args[2]()))
+        approximate = _to_bool(args[3]()) if len(args) == 4 else True
+        if not isinstance(table, _Range):
+            raise ExcelError("#VALUE!")
+        if column < 1:
+            raise ExcelError("#VALUE!")
+        if column > len(table.rows[0]):
+            raise ExcelError("#REF!")
+        first_column = [row[0] for row in table.rows]
+        index = _lookup_position(lookup, first_column, 1 if approximate else 0)
+        return table.rows[index][column - 1]
+
+    return vlookup
+
+
+def _fn_match(args):
+    if not 2 <= len(args) <= 3:
+        raise UnsupportedFormula("MATCH takes two or three arguments")
+
+    def match():
+        lookup, lookup_range = args[0](), args[1]()
+        match_type = int(_to_number(args[2]())) if len(args) == 3 else 1
+        if not isinstance(lookup_range, _Range):
+            raise ExcelError("#N/A")
+        rows = lookup_range.rows
+        if len(rows) == 1:
+            candidates = rows[0]
+        elif all(len(row) == 1 for row in rows):
+            candidates = [row[0] for row in rows]
+        else:
+            raise ExcelError("#N/A")
+        return _lookup_position(lookup, candidates, match_type) + 1
+
+    return match
+
+
+def _fn_index(args):
+    if not 2 <= len(args) <= 3:
+        raise UnsupportedFormula("INDEX takes two or three arguments")
+
+    def index():
+        area = args[0]()
+        if not isinstance(area, _Range):
+            area = _Range([[area]])
+        row = int(_to_number(args[1]()))
+        col = int(_to_number(args[2]())) if len(args) == 3 else 0
+        rows = area.rows
+        if len(args) == 2 and len(rows) == 1:
+            row, col = 1, row
+        elif col == 0 and len(rows[0]) == 1:
+            col = 1
+        if row < 1 or col < 1 or row > len(rows) or col > len(rows[0]):
+            raise ExcelError("#REF!")
+        value = rows[row - 1][col - 1]
+        if isinstance(value, ExcelError):
+            raise value
+        return value
+
+    return index
+
+
+_FUNCTIONS = {
+    "SUM": _fn_sum,
+    "AVERAGE": _fn_average,
+    "MIN": _fn_min,
+    "MAX": _fn_max,
+    "COUNT": _fn_count,
+    "ROUND": _fn_round,
+    "ABS": _fn_abs,
+    "IF": _fn_if,
+    "IFERROR": _fn_iferror,
+    "VLOOKUP": _fn_vlookup,
+    "MATCH": _fn_match,
+    "INDEX": _fn_index,
+}
+
+
+def _write_cells(src, dst, updates):
+    with zipfile.ZipFile(src) as zf:
+        parts = dict(worksheet_parts(zf))
+        patched = {
+            parts[sheet]: _patch_sheet(zf.read(parts[sheet]), cells)
+            for sheet, cells in updates.items()
+        }
+
+        fd, temp_path = tempfile.mkstemp(
+            suffix=".xlsx", dir=os.path.dirname(os.path.abspath(dst))
+        )
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as out:
+                for info in zf.infolist():
+                    data = patched.get(info.filename)
+                    out.writestr(info, data if data is not None else zf.read(info))
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    shutil.move(temp_path, dst)
+
+
+def _patch_sheet(xml_bytes, cells):
+    root = lxml.etree.fromstring(xml_bytes)
+    ns = root.nsmap.get(None, SPREADSHEET_NAMESPACE)
+    sheet_data = root.find(f"{{{ns}}}sheetData")
+    rows = {int(row.get("r")): row for row in sheet_data if row.get("r")}
+    row_cells = {}
+
+    for (_, row_num, col_num), value in sorted(cells.items(), key=lambda kv: kv[0][1:]):
+        row = rows.get(row_num)
+        if row is None:
+            row = lxml.etree.Element(f"{{{ns}}}row", r=str(row_num))
+            _insert_sorted(sheet_data, row, row_num, lambda e: int(e.get("r", 0)))
+            rows[row_num] = row
+
+        if row_num not in row_cells:
+            row_cells[row_num] = {c.get("r"): c for c in row if c.get("r")}
+        ref = f"{get_column_letter(col_num)}{row_num}"
+        cell = row_cells[row_num].get(ref)
+        if cell is None:
+            cell = lxml.etree.Element(f"{{{ns}}}c", r=ref)
+            _insert_sorted(
+                row,
+                cell,
+                col_num,
+                lambda e: column_index_from_string(re.sub(r"[0-9]", "", e.get("r", "A"))),
+            )
+            row_cells[row_num][ref] = cell
+
+        _set_cell_value(cell, value, ns)
+
+    return lxml.etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _insert_sorted(parent, elem, position, position_of):
+    for i, sibling in enumerate(parent):
+        if position_of(sibling) > position:
+            parent.insert(i, elem)
+            return
+    parent.append(elem)
+
+
+def _set_cell_value(cell, value, ns):
+    formula = cell.find(f"{{{ns}}}f")
+    for tag in ("v", "is"):
+        for child in cell.findall(f"{{{ns}}}{tag}"):
+            cell.remove(child)
+
+    if value is None:
+        cell.attrib.pop("t", None)
+        return
+
+    if isinstance(value, ExcelError):
+        cell_type, text = "e", value.code
+    elif isinstance(value, bool):
+        cell_type, text = "b", "1" if value else "0"
+    elif isinstance(value, (int, float)):
+        cell_type, text = None, repr(value) if isinstance(value, float) else str(value)
+    elif formula is not None:
+        cell_type, text = "str", str(value)
+    else:
+        cell.set("t", "inlineStr")
+        inline = lxml.etree.SubElement(cell, f"{{{ns}}}is")
+        t = lxml.etree.SubElement(inline, f"{{{ns}}}t")
+        t.text = str(value)
+        if t.text != t.text.strip():
+            t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+        return
+
+    if cell_type:
+        cell.set("t", cell_type)
+    else:
+        cell.attrib.pop("t", None)
+    v = lxml.etree.Element(f"{{{ns}}}v")
+    v.text = text
+    index = cell.index(formula) + 1 if formula is not None else 0
+    cell.insert(index, v)
+
+
+def apply_edits(filename, edits, output=None, timeout=30):
+    """Apply input edits and recalculate only the affected formulas.
+
+    edits maps "Sheet!A1" references to new values. Returns the same JSON
+    structure as recalc(), plus "engine" and "recalculated_cells".
+    """
+    output = output or filename
+    graph = FormulaGraph(filename)
+    for ref, value in edits.items():
+        graph.set_value(ref, value)
+    changed = graph.recalculate()
+    graph.save(output)
+
+    if graph.needs_fallback:
+        result = recalc(output, timeout)
+        result["engine"] = "libreoffice"
+        return result
+
+    result = check_workbook(output)
+    result["engine"] = "python"
+    result["recalculated_cells"] = len(changed)
+    return result
+
+
+def _parse_edit(text):
+    ref, sep, raw = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected SHEET!CELL=VALUE, got {text!r}")
+    if raw.upper() in ("TRUE", "FALSE"):
+        return ref, raw.upper() == "TRUE"
+    try:
+        number = float(raw)
+    except ValueError:
+        return ref, raw
+    return ref, int(number) if number.is_integer() and "." not in raw else number
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Edit input cells and recalculate dependent formulas in-process"
+    )
+    parser.add_argument("excel_file", help="Excel file to edit")
+    parser.add_argument(
+        "--set",
+        dest="edits",
+        action="append",
+        type=_parse_edit,
+        default=[],
+        metavar="SHEET!CELL=VALUE",
+        help="Input cell to change (repeatable)",
+    )
+    parser.add_argument("--output", help="Write to this file instead of in place")
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=30,
+        help="Timeout for the LibreOffice fallback in seconds (default: 30)",
+    )
+    args = parser.parse_args()
+
+    try:
+        result = apply_edits(args.excel_file, dict(args.edits), args.output, args.timeout)
+    except (ValueError, UnsupportedFormula) as e:
+        result = {"error": str(e)}
+    print(json.dumps(result, indent=2))
+    if "error" in result:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
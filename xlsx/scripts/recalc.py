@@ -3,21 +3,34 @@ Excel Formula Recalculation Script
 Recalculates all formulas in an Excel file using LibreOffice
 """
 
+import hashlib
 import json
 import os
 import platform
+import posixpath
 import subprocess
 import sys
+import tempfile
+import zipfile
 from pathlib import Path
 
+import defusedxml.ElementTree
 from office.soffice import get_soffice_env
 
-from openpyxl import load_workbook
-
 MACRO_DIR_MACOS = "~/Library/Application Support/LibreOffice/4/user/basic/Standard"
 MACRO_DIR_LINUX = "~/.config/libreoffice/4/user/basic/Standard"
 MACRO_FILENAME = "Module1.xba"
 
+EXCEL_ERRORS = (
+    "#VALUE!",
+    "#DIV/0!",
+    "#REF!",
+    "#NAME?",
+    "#NULL!",
+    "#NUM!",
+    "#N/A",
+)
+
 RECALCULATE_MACRO = """<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE script:module PUBLIC "-//OpenOffice.org//DTD OfficeDocument 1.0//EN" "module.dtd">
 <script:module xmlns:script="http://openoffice.org/2000/script" script:name="Module1" script:language="StarBasic">
@@ -26,6 +39,43 @@ RECALCULATE_MACRO = """<?xml version="1.0" encoding="UTF-8"?>
       ThisComponent.store()
       ThisComponent.close(True)
     End Sub
+
+    Sub RecalculateBatch()
+      Dim listPath As String, filePath As String
+      Dim listFile As Integer, statusFile As Integer
+      Dim doc As Object
+      Dim props(0) As New com.sun.star.beans.PropertyValue
+      props(0).Name = "Hidden"
+      props(0).Value = True
+
+      listPath = Environ("RECALC_BATCH_LIST")
+      listFile = FreeFile
+      Open listPath For Input As #listFile
+      statusFile = FreeFile
+      Open listPath &amp; ".status" For Output As #statusFile
+
+      Do While Not EOF(listFile)
+        Line Input #listFile, filePath
+        If filePath &lt;&gt; "" Then
+          On Error GoTo Failed
+          doc = StarDesktop.loadComponentFromURL(ConvertToURL(filePath), "_blank", 0, props())
+          doc.calculateAll()
+          doc.store()
+          doc.close(True)
+          Print #statusFile, "ok" &amp; Chr(9) &amp; filePath
+          GoTo NextFile
+Failed:
+          Print #statusFile, "error" &amp; Chr(9) &amp; filePath
+          Resume NextFile
+NextFile:
+          On Error GoTo 0
+        End If
+      Loop
+
+      Close #statusFile
+      Close #listFile
+      StarDesktop.terminate()
+    End Sub
 </script:module>"""
 
 
@@ -39,55 +89,83 @@ def has_gtimeout():
         return False
 
 
-def setup_libreoffice_macro():
-    macro_dir = os.path.expanduser(
-        MACRO_DIR_MACOS if platform.system() == "Darwin" else MACRO_DIR_LINUX
-    )
+_macros_installed = set()
+
+
+def setup_libreoffice_macro(profile_dir=None):
+    if profile_dir:
+        macro_dir = os.path.join(profile_dir, "user", "basic", "Standard")
+    else:
+        macro_dir = os.path.expanduser(
+            MACRO_DIR_MACOS if platform.system() == "Darwin" else MACRO_DIR_LINUX
+        )
     macro_file = os.path.join(macro_dir, MACRO_FILENAME)
+    if macro_file in _macros_installed:
+        return True
+
+    macro_bytes = RECALCULATE_MACRO.encode("utf-8")
 
-    if (
-        os.path.exists(macro_file)
-        and "RecalculateAndSave" in Path(macro_file).read_text()
-    ):
+    if os.path.exists(macro_file) and _file_sha256(macro_file) == hashlib.sha256(
+        macro_bytes
+    ).hexdigest():
+        _macros_installed.add(macro_file)
         return True
 
     if not os.path.exists(macro_dir):
-        subprocess.run(
-            ["soffice", "--headless", "--terminate_after_init"],
-            capture_output=True,
-            timeout=10,
-            env=get_soffice_env(),
-        )
+        try:
+            subprocess.run(
+                _soffice_cmd(profile_dir) + ["--terminate_after_init"],
+                capture_output=True,
+                timeout=10,
+                env=get_soffice_env(),
+            )
+        except subprocess.TimeoutExpired:
+            return False
         os.makedirs(macro_dir, exist_ok=True)
 
     try:
-        Path(macro_file).write_text(RECALCULATE_MACRO)
-        return True
+        Path(macro_file).write_bytes(macro_bytes)
     except Exception:
         return False
 
+    _macros_installed.add(macro_file)
+    return True
 
-def recalc(filename, timeout=30):
+
+def _file_sha256(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _soffice_cmd(profile_dir=None):
+    cmd = ["soffice", "--headless"]
+    if profile_dir:
+        cmd.append(f"-env:UserInstallation={Path(profile_dir).absolute().as_uri()}")
+    return cmd
+
+
+def _with_timeout(cmd, timeout):
+    if platform.system() == "Linux":
+        return ["timeout", str(timeout)] + cmd
+    if platform.system() == "Darwin" and has_gtimeout():
+        return ["gtimeout", str(timeout)] + cmd
+    return cmd
+
+
+def recalc(filename, timeout=30, profile_dir=None):
     if not Path(filename).exists():
         return {"error": f"File {filename} does not exist"}
 
     abs_path = str(Path(filename).absolute())
 
-    if not setup_libreoffice_macro():
+    if not setup_libreoffice_macro(profile_dir):
         return {"error": "Failed to setup LibreOffice macro"}
 
-    cmd = [
-        "soffice",
-        "--headless",
+    cmd = _soffice_cmd(profile_dir) + [
         "--norestore",
         "vnd.sun.star.script:Standard.Module1.RecalculateAndSave?language=Basic&location=application",
         abs_path,
     ]
-
-    if platform.system() == "Linux":
-        cmd = ["timeout", str(timeout)] + cmd
-    elif platform.system() == "Darwin" and has_gtimeout():
-        cmd = ["gtimeout", str(timeout)] + cmd
+    cmd = _with_timeout(cmd, timeout)
 
     result = subprocess.run(cmd, capture_output=True, text=True, env=get_soffice_env())
 
@@ -97,73 +175,205 @@ def recalc(filename, timeout=30):
             return {"error": "LibreOffice macro not configured properly"}
         return {"error": error_msg}
 
-    try:
-        wb = load_workbook(filename, data_only=True)
-
-        excel_errors = [
-            "#VALUE!",
-            "#DIV/0!",
-            "#REF!",
-            "#NAME?",
-            "#NULL!",
-            "#NUM!",
-            "#N/A",
-        ]
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
-
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
-
-        wb.close()
-
-        result = {
-            "status": "success" if total_errors == 0 else "errors_found",
-            "total_errors": total_errors,
-            "error_summary": {},
-        }
-
-        for err_type, locations in error_details.items():
-            if locations:
-                result["error_summary"][err_type] = {
-                    "count": len(locations),
-                    "locations": locations[:20],  
-                }
-
-        wb_formulas = load_workbook(filename, data_only=False)
-        formula_count = 0
-        for sheet_name in wb_formulas.sheetnames:
-            ws = wb_formulas[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if (
-                        cell.value
-                        and isinstance(cell.value, str)
-                        and cell.value.startswith("=")
-                    ):
-                        formula_count += 1
-        wb_formulas.close()
+    return check_workbook(filename)
+
+
+def recalc_many(filenames, timeout=None, profile_dir=None):
+    """Recalculate several workbooks in a single LibreOffice session.
+
+    Returns a dict mapping each input filename to the same JSON-style
+    result that recalc() produces for it.
+    """
+    results = {}
+    abs_paths = {}
+    for filename in filenames:
+        if not Path(filename).exists():
+            results[filename] = {"error": f"File {filename} does not exist"}
+        else:
+            abs_paths[filename] = str(Path(filename).absolute())
+
+    if not abs_paths:
+        return results
 
-        result["total_formulas"] = formula_count
+    if not setup_libreoffice_macro(profile_dir):
+        for filename in abs_paths:
+            results[filename] = {"error": "Failed to setup LibreOffice macro"}
+        return results
 
-        return result
+    if timeout is None:
+        timeout = 30 * len(abs_paths)
 
+    with tempfile.TemporaryDirectory() as temp_dir:
+        list_path = Path(temp_dir) / "batch.txt"
+        list_path.write_text("\n".join(abs_paths.values()) + "\n", encoding="utf-8")
+
+        env = get_soffice_env()
+        env["RECALC_BATCH_LIST"] = str(list_path)
+        cmd = _soffice_cmd(profile_dir) + [
+            "--norestore",
+            "vnd.sun.star.script:Standard.Module1.RecalculateBatch?language=Basic&location=application",
+        ]
+        result = subprocess.run(
+            _with_timeout(cmd, timeout), capture_output=True, text=True, env=env
+        )
+
+        status_path = Path(f"{list_path}.status")
+        statuses = {}
+        if status_path.exists():
+            for line in status_path.read_text(encoding="utf-8").splitlines():
+                state, _, path = line.partition("\t")
+                statuses[path] = state
+
+    for filename, abs_path in abs_paths.items():
+        state = statuses.get(abs_path)
+        if state == "ok":
+            results[filename] = check_workbook(filename)
+        elif state == "error":
+            results[filename] = {"error": "LibreOffice failed to recalculate file"}
+        elif result.returncode == 124:
+            results[filename] = {"error": f"Batch timed out after {timeout}s"}
+        else:
+            results[filename] = {
+                "error": result.stderr or "File was not processed by LibreOffice"
+            }
+
+    return results
+
+
+def check_workbook(filename):
+    try:
+        error_details, formula_count = scan_workbook(filename)
     except Exception as e:
         return {"error": str(e)}
 
+    total_errors = sum(len(locations) for locations in error_details.values())
+    result = {
+        "status": "success" if total_errors == 0 else "errors_found",
+        "total_errors": total_errors,
+        "error_summary": {},
+    }
+
+    for err_type, locations in error_details.items():
+        if locations:
+            result["error_summary"][err_type] = {
+                "count": len(locations),
+                "locations": locations[:20],  
+            }
+
+    result["total_formulas"] = formula_count
+
+    return result
+
+
+def scan_workbook(filename):
+    """Collect error cells and count formulas in one streaming pass.
+
+    Reads each worksheet's XML straight from the package, so memory use
+    stays flat regardless of workbook size.
+    """
+    error_details = {err: [] for err in EXCEL_ERRORS}
+    formula_count = 0
+
+    with zipfile.ZipFile(filename) as zf:
+        for sheet_name, sheet_part in worksheet_parts(zf):
+            with zf.open(sheet_part) as sheet_xml:
+                for coordinate, error, has_formula in _iter_cells(sheet_xml):
+                    if has_formula:
+                        formula_count += 1
+                    if error in error_details:
+                        error_details[error].append(f"{sheet_name}!{coordinate}")
+
+    return error_details, formula_count
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def worksheet_parts(zf):
+    rels_root = defusedxml.ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    for rel in rels_root:
+        if rel.get("Type", "").endswith("/worksheet"):
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                targets[rel.get("Id")] = target.lstrip("/")
+            else:
+                targets[rel.get("Id")] = posixpath.normpath(posixpath.join("xl", target))
+
+    workbook_root = defusedxml.ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    for elem in workbook_root.iter():
+        if _local_name(elem.tag) != "sheet":
+            continue
+        rid = next(
+            (value for key, value in elem.attrib.items() if _local_name(key) == "id"),
+            None,
+        )
+        if rid in targets:
+            yield elem.get("name"), targets[rid]
+
+
+def _iter_cells(sheet_xml):
+    sheet_data = None
+    row_num = 0
+    col_num = 0
+
+    for event, elem in defusedxml.ElementTree.iterparse(sheet_xml, events=("start", "end")):
+        name = _local_name(elem.tag)
+
+        if event == "start":
+            if name == "sheetData":
+                sheet_data = elem
+            elif name == "row":
+                row_num = int(elem.get("r") or row_num + 1)
+                col_num = 0
+            continue
+
+        if name == "c":
+            ref = elem.get("r")
+            if ref:
+                col_num = _column_index(ref)
+            else:
+                col_num += 1
+                ref = f"{_column_letter(col_num)}{row_num}"
+
+            has_formula = False
+            value = None
+            for child in elem:
+                child_name = _local_name(child.tag)
+                if child_name == "f":
+                    has_formula = True
+                elif child_name == "v":
+                    value = child.text
+
+            error = value if elem.get("t") == "e" else None
+            if has_formula or error:
+                yield ref, error, has_formula
+        elif name == "row" and sheet_data is not None:
+            sheet_data.clear()
+
+
+def _column_index(ref):
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index
+
+
+def _column_letter(index):
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
 
 def main():
     if len(sys.argv) < 2:
         print("Usage: python recalc.py <excel_file> [timeout_seconds]")
+        print("       python recalc.py --batch <excel_file> [<excel_file> ...]")
         print("\nRecalculates all formulas in an Excel file using LibreOffice")
         print("\nReturns JSON with error details:")
         print("  - status: 'success' or 'errors_found'")
@@ -171,8 +381,15 @@ def main():
         print("  - total_formulas: Number of formulas in the file")
         print("  - error_summary: Breakdown by error type with locations")
         print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
+        print("\nWith --batch, all files are recalculated in one LibreOffice")
+        print("session and the JSON maps each filename to its result")
         sys.exit(1)
 
+    if sys.argv[1] == "--batch":
+        result = recalc_many(sys.argv[2:])
+        print(json.dumps(result, indent=2))
+        return
+
     filename = sys.argv[1]
     timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
 
@@ -0,0 +1,158 @@
+"""
+Parallel Excel formula recalculation across isolated LibreOffice profiles.
+
+LibreOffice serializes everything that shares a user profile, so concurrent
+recalc.py runs on one host block each other. This scheduler gives each
+worker its own profile directory, runs up to K recalculations at once, and
+reports throughput and latency alongside the per-file results.
+
+Profiles live under the temp directory and are reused between runs. Each
+one is claimed with a file lock, so several schedulers (e.g. one per agent)
+can share a host without sharing a profile.
+
+Usage:
+    python recalc_pool.py [--workers K] [--timeout SECONDS] <excel_file> [<excel_file> ...]
+
+Example:
+    python recalc_pool.py --workers 4 reports/*.xlsx
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import queue
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from recalc import recalc
+
+PROFILE_ROOT = Path(tempfile.gettempdir()) / "recalc_profiles"
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class ProfilePool:
+    """A set of LibreOffice profile directories locked for this process."""
+
+    def __init__(self, size, root=PROFILE_ROOT):
+        self.size = size
+        self.root = Path(root)
+        self._locks = []
+        self._free = queue.Queue()
+
+    def __enter__(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        slot = 0
+        while len(self._locks) < self.size:
+            lock = open(self.root / f"worker-{slot}.lock", "w")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+            else:
+                self._locks.append(lock)
+                self._free.put(self.root / f"worker-{slot}")
+            slot += 1
+        return self
+
+    def __exit__(self, *exc):
+        for lock in self._locks:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+            lock.close()
+        self._locks.clear()
+
+    @contextmanager
+    def profile(self):
+        profile_dir = self._free.get()
+        try:
+            yield profile_dir
+        finally:
+            self._free.put(profile_dir)
+
+
+def recalc_parallel(filenames, workers=DEFAULT_WORKERS, timeout=30):
+    """Recalculate files concurrently, one LibreOffice profile per worker.
+
+    Returns {"results": {filename: recalc() result}, "metrics": {...}}.
+    """
+    workers = max(1, min(workers, len(filenames) or 1))
+    results = {}
+    latencies = []
+    start = time.perf_counter()
+
+    def run(pool, filename):
+        with pool.profile() as profile_dir:
+            job_start = time.perf_counter()
+            try:
+                result = recalc(filename, timeout, profile_dir=str(profile_dir))
+            except Exception as e:
+                # One bad file must not discard the results of the others
+                result = {"error": f"{type(e).__name__}: {e}"}
+            return filename, result, time.perf_counter() - job_start
+
+    with ProfilePool(workers) as pool, ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(run, pool, filename) for filename in filenames]
+        for future in futures:
+            filename, result, latency = future.result()
+            results[filename] = result
+            latencies.append(latency)
+
+    wall = time.perf_counter() - start
+    return {
+        "results": results,
+        "metrics": _metrics(results, latencies, workers, wall),
+    }
+
+
+def _metrics(results, latencies, workers, wall):
+    latencies = sorted(latencies)
+    return {
+        "files": len(latencies),
+        "failed": sum(1 for r in results.values() if "error" in r),
+        "workers": workers,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(len(latencies) / wall, 3) if wall else 0.0,
+        "latency_seconds": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recalculate Excel files in parallel with isolated LibreOffice profiles"
+    )
+    parser.add_argument("files", nargs="+", help="Excel files to recalculate")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent LibreOffice instances (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=30,
+        help="Timeout per file in seconds (default: 30)",
+    )
+    args = parser.parse_args()
+
+    result = recalc_parallel(args.files, args.workers, args.timeout)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()